@@ -6,21 +6,62 @@ to an Excel file and displayed on screen.
 """
 
 import base64
-import json
 import os
+import time
 import tkinter as tk
-from dataclasses import dataclass, field
-from io import BytesIO
+import uuid
 from tkinter import filedialog
 
 import pandas as pd
 import streamlit as st
-from openpyxl import load_workbook
 
+from recon_cache import default_cache, read_cached
+from recon_amounts import DEFAULT_SCALE, MAX_SCALE
+from recon_engine import (
+    BACKEND_ARROW,
+    BACKEND_PANDAS,
+    BACKEND_SQL,
+    ComparisonResult,
+    Measure,
+    align_frames,
+    evaluate_alignment,
+    preflight_merge,
+)
+from recon_export import (
+    FORMAT_ARROW,
+    FORMAT_CSV_GZ,
+    FORMAT_EXTENSIONS,
+    FORMAT_PARQUET,
+    FORMAT_XLSX,
+    start_export,
+)
+from recon_jobs import (
+    STATE_CANCELLED,
+    STATE_DONE,
+    STATE_QUEUED,
+    JobQueueFull,
+    forget_job,
+    get_job,
+    job_counts,
+    submit_job,
+)
+from recon_io import ENGINE_AUTO, ReadResult, available_engines, read_columns
+from recon_preflight import DEFAULT_MERGE_BUDGET_MB
+from recon_profiles import delete_profile, load_profiles, profile_columns, save_profile
+from recon_streaming import DEFAULT_MEMORY_BUDGET_MB, compare_streaming
+from recon_trace import Trace
+from recon_view import (
+    DEFAULT_PAGE_SIZE,
+    PAGE_SIZES,
+    STATUS_ALL,
+    STATUS_DIFFERENCES,
+    STATUS_FIRST_ONLY,
+    STATUS_MATCHES,
+    STATUS_SECOND_ONLY,
+    ResultView,
+)
 from utils import apply_global_styles, render_header
 
-PROFILES_FILE = "config_profiles.json"
-
 # ── Official Definian brand colors ──────────────────────────────────────── #
 _C = {
     "midnight":  "#02072D",
@@ -36,217 +77,43 @@ _C = {
 }
 
 
-@dataclass
-class ComparisonResult:
-    """Simple container for comparison output."""
-
-    merged: pd.DataFrame
-    summary_text: str
-    total_records: int = 0
-    matched_records: int = 0
-    match_percentage: float = 0.0
-
-
-def load_profiles() -> dict:
-    """Return all saved configuration profiles from disk."""
-    if not os.path.exists(PROFILES_FILE):
-        return {}
-    with open(PROFILES_FILE) as f:
-        return json.load(f)
-
-
-def save_profile(name: str, config: dict) -> None:
-    """Persist a named configuration profile to disk."""
-    profiles = load_profiles()
-    profiles[name] = config
-    with open(PROFILES_FILE, "w") as f:
-        json.dump(profiles, f, indent=2)
-
-
-def delete_profile(name: str) -> None:
-    """Remove a named configuration profile from disk."""
-    profiles = load_profiles()
-    profiles.pop(name, None)
-    with open(PROFILES_FILE, "w") as f:
-        json.dump(profiles, f, indent=2)
-
-
-def compare_data(
-    legacy: pd.DataFrame,
-    converted: pd.DataFrame,
-    pk_legacy: list[str],
-    pk_converted: list[str],
-    match_col_legacy: str,
-    match_col_converted: str,
-    output_file: str | None = None,
-    tolerance_type: str | None = None,
-    tolerance_value: float | None = None,
-    distinct_list: bool = True,
-) -> ComparisonResult:
-    """Compare two dataframes and return a summary."""
-
-    def _unique_key_name() -> str:
-        base = "_comparison_key"
-        key_name = base
-        counter = 1
-        while key_name in legacy.columns or key_name in converted.columns:
-            key_name = f"{base}_{counter}"
-            counter += 1
-        return key_name
-
-    def _build_comparison_key(data: pd.DataFrame, columns: list[str]) -> pd.Series:
-        parts = data[columns].fillna("").astype(str)
-        return parts.apply(lambda row: " | ".join(value.strip() for value in row), axis=1)
-
-    comparison_key = _unique_key_name()
-    legacy = legacy.copy()
-    converted = converted.copy()
-    legacy_columns = set(legacy.columns)
-    converted_columns = set(converted.columns)
-    legacy[comparison_key] = _build_comparison_key(legacy, pk_legacy)
-    converted[comparison_key] = _build_comparison_key(converted, pk_converted)
-
-    # Convert value columns to numeric now that key columns have been captured as strings
-    legacy[match_col_legacy] = pd.to_numeric(legacy[match_col_legacy], errors="coerce")
-    converted[match_col_converted] = pd.to_numeric(converted[match_col_converted], errors="coerce")
-
-    if distinct_list:
-        legacy = (
-            legacy.groupby(comparison_key, dropna=False)
-            .agg({match_col_legacy: "sum", **{col: "first" for col in pk_legacy}})
-            .reset_index()
-        )
-        converted = (
-            converted.groupby(comparison_key, dropna=False)
-            .agg({match_col_converted: "sum", **{col: "first" for col in pk_converted}})
-            .reset_index()
-        )
-
-    merged_df = pd.merge(
-        legacy,
-        converted,
-        on=comparison_key,
-        suffixes=("_legacy", "_converted"),
-        how="outer",
-    )
-    merged_df.rename(columns={comparison_key: "Comparison Key"}, inplace=True)
-
-    legacy_value_column = (
-        f"{match_col_legacy}_legacy" if f"{match_col_legacy}_legacy" in merged_df.columns else match_col_legacy
-    )
-    converted_value_column = (
-        f"{match_col_converted}_converted"
-        if f"{match_col_converted}_converted" in merged_df.columns
-        else match_col_converted
-    )
+# Download formats offered in the Results section, by label
+_EXPORT_FORMATS = {
+    "Excel (.xlsx)": FORMAT_XLSX,
+    "Parquet": FORMAT_PARQUET,
+    "Arrow IPC (.arrow)": FORMAT_ARROW,
+    "CSV (.csv.gz)": FORMAT_CSV_GZ,
+}
 
-    def _difference(row: pd.Series) -> bool:
-        legacy_val = row.get(legacy_value_column)
-        conv_val = row.get(converted_value_column)
-        if pd.isna(legacy_val) or pd.isna(conv_val):
-            return True
-        if tolerance_type == "Dollar ($)":
-            if tolerance_value is None:
-                return legacy_val != conv_val
-            return abs(legacy_val - conv_val) > tolerance_value
-        if tolerance_type == "Percentage (%)":
-            if tolerance_value is None or legacy_val == 0:
-                return legacy_val != conv_val
-            return abs((legacy_val - conv_val) / legacy_val) > tolerance_value / 100
-        return legacy_val != conv_val
-
-    merged_df["Difference"] = merged_df.apply(_difference, axis=1)
-    merged_df["Dollar Difference"] = merged_df.apply(
-        lambda row: (
-            (0 if pd.isna(row.get(legacy_value_column)) else row.get(legacy_value_column))
-            - (0 if pd.isna(row.get(converted_value_column)) else row.get(converted_value_column))
-        ),
-        axis=1,
-    )
-    merged_df["Percentage Difference"] = merged_df.apply(
-        lambda row: (
-            float("nan")
-            if pd.isna(row.get(legacy_value_column)) or pd.isna(row.get(converted_value_column))
-            else (
-                abs(row.get(legacy_value_column) - row.get(converted_value_column))
-                / abs(row.get(legacy_value_column))
-                if row.get(legacy_value_column) != 0
-                else float("nan")
-            )
-        ),
-        axis=1,
-    )
 
-    def _should_drop_match_column(column_name: str) -> bool:
-        if column_name in pk_legacy or column_name in pk_converted:
-            return True
-        if column_name.endswith("_legacy") and column_name[: -len("_legacy")] in pk_legacy:
-            return True
-        if column_name.endswith("_converted") and column_name[: -len("_converted")] in pk_converted:
-            return True
-        return False
-
-    drop_columns = [col for col in merged_df.columns if _should_drop_match_column(col)]
-    if drop_columns:
-        merged_df.drop(columns=drop_columns, inplace=True)
-
-    rename_columns: dict[str, str] = {}
-    for column in merged_df.columns:
-        if column in {"Comparison Key", "Difference", "Dollar Difference", "Percentage Difference"}:
-            continue
-        if column.endswith("_legacy"):
-            base = column[: -len("_legacy")]
-            rename_columns[column] = f"{base} (First)"
-        elif column.endswith("_converted"):
-            base = column[: -len("_converted")]
-            rename_columns[column] = f"{base} (Second)"
-        elif column in legacy_columns and column not in converted_columns:
-            rename_columns[column] = f"{column} (First)"
-        elif column in converted_columns and column not in legacy_columns:
-            rename_columns[column] = f"{column} (Second)"
-
-    if rename_columns:
-        merged_df.rename(columns=rename_columns, inplace=True)
-
-    total_records = len(merged_df)
-    matched_records = len(merged_df[~merged_df["Difference"]])
-    match_percentage = (matched_records / total_records) * 100 if total_records else 0
-
-    summary_lines = [
-        f"Total records: {total_records}",
-        f"Matched records: {matched_records}",
-        f"Match percentage: {match_percentage:.2f}%",
-    ]
-
-    if output_file:
-        merged_df.to_excel(output_file, index=False)
-        _format_output(output_file, merged_df)
-
-    return ComparisonResult(
-        merged_df,
-        "\n".join(summary_lines),
-        total_records=total_records,
-        matched_records=matched_records,
-        match_percentage=match_percentage,
-    )
+def _read_upload(
+    uploaded_file, low_memory: bool, engine: str = ENGINE_AUTO, usecols: list[str] | None = None
+) -> ReadResult:
+    """Parse an uploaded workbook, reusing the ingest cache for content seen before.
 
+    In low-memory mode only the header is read, since the comparison streams
+    the file itself. ``usecols`` limits loading to the columns a profile
+    needs. The result records which engine parsed the file (or ``"cache"``)
+    and how long loading took.
+    """
+    start = time.perf_counter()
+    if low_memory:
+        return ReadResult(pd.DataFrame(columns=read_columns(uploaded_file)), "header only", time.perf_counter() - start)
+    return read_cached(uploaded_file, usecols=usecols, engine=engine)
 
-def _format_output(output_file: str, merged_df: pd.DataFrame) -> None:
-    workbook = load_workbook(output_file)
-    worksheet = workbook.active
-    header_map = {header: idx + 1 for idx, header in enumerate(merged_df.columns)}
-    dollar_column = header_map.get("Dollar Difference")
-    percent_column = header_map.get("Percentage Difference")
 
-    if dollar_column:
-        for row_idx in range(2, worksheet.max_row + 1):
-            worksheet.cell(row=row_idx, column=dollar_column).number_format = "$#,##0.00"
+def _ingest_note(result: ReadResult) -> str:
+    if result.engine == "header only":
+        return f"header read in {result.seconds:.2f}s, rows are streamed when the comparison runs"
+    return f"{len(result.frame):,} rows in {result.seconds:.2f}s ({result.engine})"
 
-    if percent_column:
-        for row_idx in range(2, worksheet.max_row + 1):
-            worksheet.cell(row=row_idx, column=percent_column).number_format = "0.00%"
 
-    workbook.save(output_file)
+def _set_result(result: ComparisonResult | None) -> None:
+    """Make ``result`` the session's current one, dropping the previous result's download."""
+    st.session_state.result = result
+    st.session_state.result_id = uuid.uuid4().hex  # ids of freed results can be reused, so not id(result)
+    st.session_state.export = None
+    st.session_state.export_stages = []
 
 
 def _section_header(text: str) -> None:
@@ -274,9 +141,25 @@ def main():
     for key, default in [
         ("first_df", None),
         ("second_df", None),
+        ("first_ingest_key", None),
+        ("second_ingest_key", None),
+        ("first_ingest_note", ""),
+        ("second_ingest_note", ""),
+        ("first_ingest_trace", []),
+        ("second_ingest_trace", []),
+        ("alignment_trace", []),
+        ("session_id", uuid.uuid4().hex),  # for the per-session job queue limit
+        ("run_job", None),
         ("result", None),
+        ("alignment_key", None),
+        ("result_tolerance", None),
+        ("result_id", None),
+        ("export", None),
+        ("export_stages", []),
         ("pending_profile", None),
         ("show_save_form", False),
+        ("measure_rows", []),
+        ("preflight", None),
     ]:
         if key not in st.session_state:
             st.session_state[key] = default
@@ -343,6 +226,35 @@ def main():
         with col1:
             _section_header("Upload Files")
 
+            low_memory = st.checkbox(
+                "Low-memory mode",
+                key="low_memory_mode",
+                help="Stream files from disk in chunks instead of loading them whole. "
+                "Use for ledgers too large to fit in memory.",
+            )
+            memory_budget_mb = DEFAULT_MEMORY_BUDGET_MB
+            if low_memory:
+                memory_budget_mb = st.number_input(
+                    "Memory budget (MB)",
+                    min_value=64,
+                    value=DEFAULT_MEMORY_BUDGET_MB,
+                    step=64,
+                    key="memory_budget_mb",
+                )
+
+            ingest_cache = default_cache()  # shared by every session; configured by the server, not here
+            reader_engine = st.session_state.get("reader_engine", ENGINE_AUTO)
+
+            upload_profiles = load_profiles()
+            ingest_profile = st.selectbox(
+                "Load columns for",
+                ["All columns", *upload_profiles],
+                key="ingest_profile",
+                help="Read only the columns a saved profile uses (its match keys, compare column "
+                "and display columns) and apply the profile. Much faster for wide ledgers.",
+            )
+            ingest_cfg = upload_profiles.get(ingest_profile) if ingest_profile != "All columns" else None
+
             first_file = st.file_uploader(
                 "First file",
                 type=["xlsx", "xls"],
@@ -351,11 +263,24 @@ def main():
             )
             if first_file:
                 try:
-                    st.session_state.first_df = pd.read_excel(first_file, dtype=str)
-                    st.success(f"Loaded: {first_file.name}")
+                    usecols = profile_columns(ingest_cfg, "first") if ingest_cfg and not low_memory else None
+                    ingest_key = (first_file.file_id, low_memory, reader_engine, tuple(usecols or ()))
+                    if st.session_state.first_ingest_key != ingest_key or st.session_state.first_df is None:
+                        ingest_trace = Trace()
+                        with ingest_trace.stage("read first") as stage:
+                            loaded = _read_upload(first_file, low_memory, reader_engine, usecols)
+                            stage.stage, stage.rows = f"read first ({loaded.engine})", len(loaded.frame)
+                        st.session_state.first_ingest_trace = ingest_trace.stages
+                        st.session_state.first_df = loaded.frame
+                        st.session_state.first_ingest_note = _ingest_note(loaded)
+                        st.session_state.first_ingest_key = ingest_key
+                        if ingest_cfg:
+                            st.session_state.pending_profile = ingest_cfg
+                    st.success(f"Loaded: {first_file.name} — {st.session_state.first_ingest_note}")
                 except Exception as e:
                     st.error(f"Error reading first file: {e}")
                     st.session_state.first_df = None
+                    st.session_state.first_ingest_key = None
 
             second_file = st.file_uploader(
                 "Second file",
@@ -365,11 +290,50 @@ def main():
             )
             if second_file:
                 try:
-                    st.session_state.second_df = pd.read_excel(second_file, dtype=str)
-                    st.success(f"Loaded: {second_file.name}")
+                    usecols = profile_columns(ingest_cfg, "second") if ingest_cfg and not low_memory else None
+                    ingest_key = (second_file.file_id, low_memory, reader_engine, tuple(usecols or ()))
+                    if st.session_state.second_ingest_key != ingest_key or st.session_state.second_df is None:
+                        ingest_trace = Trace()
+                        with ingest_trace.stage("read second") as stage:
+                            loaded = _read_upload(second_file, low_memory, reader_engine, usecols)
+                            stage.stage, stage.rows = f"read second ({loaded.engine})", len(loaded.frame)
+                        st.session_state.second_ingest_trace = ingest_trace.stages
+                        st.session_state.second_df = loaded.frame
+                        st.session_state.second_ingest_note = _ingest_note(loaded)
+                        st.session_state.second_ingest_key = ingest_key
+                        if ingest_cfg:
+                            st.session_state.pending_profile = ingest_cfg
+                    st.success(f"Loaded: {second_file.name} — {st.session_state.second_ingest_note}")
                 except Exception as e:
                     st.error(f"Error reading second file: {e}")
                     st.session_state.second_df = None
+                    st.session_state.second_ingest_key = None
+
+            with st.expander("Ingest settings"):
+                st.selectbox(
+                    "Reader engine",
+                    available_engines(),
+                    key="reader_engine",
+                    help="'auto' uses calamine when installed, otherwise openpyxl (xlrd for .xls files).",
+                )
+                stats = ingest_cache.stats
+                st.caption(
+                    f"{stats.hits:,} hits · {stats.disk_hits:,} disk hits · {stats.misses:,} misses · "
+                    f"{stats.evictions:,} evictions · {stats.entries:,} files, "
+                    f"{stats.bytes_held / (1024 * 1024):,.1f} MB held"
+                )
+                st.caption(
+                    f"Cache limit {ingest_cache.memory_limit_bytes / (1024 * 1024):,.0f} MB, "
+                    + (
+                        f"parsed files kept in '{ingest_cache.cache_dir}'"
+                        if ingest_cache.cache_dir
+                        else "memory only"
+                    )
+                    + " (set with RECON_CACHE_MEMORY_MB / RECON_CACHE_DIR on the server)"
+                )
+                if st.button("Clear cache", key="clear_cache_btn"):
+                    ingest_cache.clear()
+                    st.rerun()
 
         # ── Configure ── #
         with col2:
@@ -408,12 +372,36 @@ def main():
                         st.session_state["compare_col_first"] = cfg["compare_col_first"]
                     if cfg.get("compare_col_second") in second_cols:
                         st.session_state["compare_col_second"] = cfg["compare_col_second"]
+                    st.session_state["display_cols_first"] = [
+                        c for c in cfg.get("display_cols_first", []) if c in first_cols
+                    ]
+                    st.session_state["display_cols_second"] = [
+                        c for c in cfg.get("display_cols_second", []) if c in second_cols
+                    ]
                     tolerance_options = ["None", "Dollar ($)", "Percentage (%)"]
                     saved_tol = cfg.get("tolerance_type", "None")
                     if saved_tol in tolerance_options:
                         st.session_state["tolerance_type_select"] = saved_tol
                     if cfg.get("tolerance_value") is not None:
                         st.session_state["tolerance_value_input"] = float(cfg["tolerance_value"])
+                    st.session_state["exact_amounts_check"] = cfg.get("exact_scale") is not None
+                    if cfg.get("exact_scale") is not None:
+                        st.session_state["exact_scale_input"] = int(cfg["exact_scale"])
+                    saved_backend = cfg.get("backend") or BACKEND_PANDAS
+                    st.session_state["backend_select"] = (
+                        saved_backend if saved_backend in (BACKEND_PANDAS, BACKEND_ARROW) else BACKEND_SQL
+                    )
+                    st.session_state.measure_rows = [
+                        {
+                            "First column": m.get("first"),
+                            "Second column": m.get("second"),
+                            "Tolerance type": m.get("tolerance_type") or "None",
+                            "Tolerance value": m.get("tolerance_value"),
+                        }
+                        for m in cfg.get("measures") or []
+                        if m.get("first") in first_cols and m.get("second") in second_cols
+                    ]
+                    st.session_state.pop("measures_editor", None)
                     st.session_state.pending_profile = None
 
                 match_keys_first = st.multiselect(
@@ -426,6 +414,8 @@ def main():
                     second_cols,
                     key="match_keys_second",
                 )
+                # Filled in once the compare and display columns below are known.
+                preflight_slot = st.empty()
 
                 cmp_col1, cmp_col2 = st.columns(2)
                 with cmp_col1:
@@ -441,6 +431,67 @@ def main():
                         key="compare_col_second",
                     )
 
+                disp_col1, disp_col2 = st.columns(2)
+                with disp_col1:
+                    display_cols_first = st.multiselect(
+                        "Display columns — first file",
+                        first_cols,
+                        key="display_cols_first",
+                        help="Extra columns carried into the results for context.",
+                    )
+                with disp_col2:
+                    display_cols_second = st.multiselect(
+                        "Display columns — second file",
+                        second_cols,
+                        key="display_cols_second",
+                        help="Extra columns carried into the results for context.",
+                    )
+
+                measure_table = st.data_editor(
+                    pd.DataFrame(
+                        st.session_state.measure_rows,
+                        columns=["First column", "Second column", "Tolerance type", "Tolerance value"],
+                    ),
+                    column_config={
+                        "First column": st.column_config.SelectboxColumn(options=first_cols, required=True),
+                        "Second column": st.column_config.SelectboxColumn(options=second_cols, required=True),
+                        "Tolerance type": st.column_config.SelectboxColumn(
+                            options=["None", "Dollar ($)", "Percentage (%)"], default="None"
+                        ),
+                        "Tolerance value": st.column_config.NumberColumn(min_value=0.0, format="%.2f"),
+                    },
+                    num_rows="dynamic",
+                    hide_index=True,
+                    use_container_width=True,
+                    key="measures_editor",
+                )
+                st.caption(
+                    "Additional measures — further column pairs compared on the same keys in the same run, "
+                    "each with its own tolerance (percentages as e.g. 10 for 10%)."
+                )
+                measures = [
+                    Measure(
+                        row["First column"],
+                        row["Second column"],
+                        None if row["Tolerance type"] in (None, "None") else row["Tolerance type"],
+                        None
+                        if row["Tolerance type"] in (None, "None") or pd.isna(row["Tolerance value"])
+                        else float(row["Tolerance value"]),
+                    )
+                    for row in measure_table.to_dict("records")
+                    if row["First column"] and row["Second column"]
+                ]
+                # Saved with the profile, from here or from the Save Profile panel.
+                st.session_state.measure_config = [
+                    {
+                        "first": m.first,
+                        "second": m.second,
+                        "tolerance_type": m.tolerance_type,
+                        "tolerance_value": m.tolerance_value,
+                    }
+                    for m in measures
+                ]
+
                 tol_col1, tol_col2 = st.columns(2)
                 with tol_col1:
                     tolerance_type = st.selectbox(
@@ -463,38 +514,275 @@ def main():
                             key="tolerance_value_input",
                         )
 
+                exact_col1, exact_col2 = st.columns(2)
+                with exact_col1:
+                    exact_amounts = st.checkbox(
+                        "Exact amounts",
+                        key="exact_amounts_check",
+                        help="Sum and compare amounts as whole cents (or the units set here) instead of "
+                        "floating point, so tight dollar tolerances are not tripped by rounding error.",
+                    )
+                with exact_col2:
+                    exact_scale = None
+                    if exact_amounts:
+                        exact_scale = int(
+                            st.number_input(
+                                "Decimal places",
+                                min_value=0,
+                                max_value=MAX_SCALE,
+                                value=DEFAULT_SCALE,
+                                step=1,
+                                key="exact_scale_input",
+                            )
+                        )
+
+                run_opt_col0, run_opt_col1, run_opt_col2 = st.columns(3)
+                with run_opt_col0:
+                    backend = st.selectbox(
+                        "Comparison engine",
+                        [BACKEND_PANDAS, BACKEND_ARROW, BACKEND_SQL],
+                        format_func={
+                            BACKEND_PANDAS: "In memory (pandas)",
+                            BACKEND_ARROW: "In memory, multithreaded (Arrow)",
+                            BACKEND_SQL: "SQL, spills to disk",
+                        }.get,
+                        help="The Arrow engine aggregates and joins on all cores with Arrow strings. "
+                        "The SQL engine does it in DuckDB (or SQLite) on disk, for merges larger than memory.",
+                        key="backend_select",
+                    )
+                with run_opt_col1:
+                    workers = st.number_input(
+                        "Parallel workers",
+                        min_value=1,
+                        max_value=os.cpu_count() or 1,
+                        value=1,
+                        step=1,
+                        help="Reconcile key partitions across this many CPU cores. "
+                        "Worth raising for files with hundreds of thousands of rows.",
+                        key="workers_input",
+                        disabled=backend != BACKEND_PANDAS,
+                    )
+                with run_opt_col2:
+                    merge_budget_mb = st.number_input(
+                        "Merge budget (MB)",
+                        min_value=64,
+                        value=DEFAULT_MERGE_BUDGET_MB,
+                        step=256,
+                        help="Refuse to run a comparison whose merged result is estimated to need more memory.",
+                        key="merge_budget_input",
+                        disabled=backend != BACKEND_PANDAS,
+                    )
+
+                # Key statistics and merged size, from the key codes alone;
+                # recomputed only when the keys or result columns change.
+                if match_keys_first and match_keys_second and not low_memory:
+                    columns_first = [compare_col_first, *(m.first for m in measures), *display_cols_first]
+                    columns_second = [compare_col_second, *(m.second for m in measures), *display_cols_second]
+                    preflight_key = (
+                        st.session_state.first_ingest_key,
+                        st.session_state.second_ingest_key,
+                        tuple(match_keys_first),
+                        tuple(match_keys_second),
+                        tuple(columns_first),
+                        tuple(columns_second),
+                    )
+                    if st.session_state.preflight is None or st.session_state.preflight[0] != preflight_key:
+                        try:
+                            estimate = preflight_merge(
+                                st.session_state.first_df,
+                                st.session_state.second_df,
+                                match_keys_first,
+                                match_keys_second,
+                                columns_first,
+                                columns_second,
+                            )
+                        except Exception:
+                            estimate = None
+                        st.session_state.preflight = (preflight_key, estimate)
+                    estimate = st.session_state.preflight[1]
+                    if estimate is not None:
+                        estimate_text = estimate.text().replace("\n", "  \n")
+                        if estimate.merged_mb > merge_budget_mb and backend == BACKEND_PANDAS:
+                            preflight_slot.warning(f"{estimate_text}  \nThis is over the merge budget.")
+                        else:
+                            preflight_slot.caption(estimate_text)
+
+                # Everything but the tolerance decides the alignment, which is
+                # kept so a tolerance change only re-evaluates the differences.
+                tolerance = (
+                    None if tolerance_type == "None" else tolerance_type,
+                    tolerance_value if tolerance_type != "None" else None,
+                    tuple((m.tolerance_type, m.tolerance_value) for m in measures),
+                )
+                alignment_key = (
+                    st.session_state.first_ingest_key,
+                    st.session_state.second_ingest_key,
+                    tuple(match_keys_first),
+                    tuple(match_keys_second),
+                    compare_col_first,
+                    compare_col_second,
+                    tuple(display_cols_first),
+                    tuple(display_cols_second),
+                    exact_scale,
+                    tuple((m.first, m.second) for m in measures),
+                    backend,
+                )
+                current = st.session_state.result
+                alignment = None
+                if current is not None and st.session_state.alignment_key == alignment_key:
+                    alignment = current.alignment
+                if alignment is not None and st.session_state.result_tolerance != tolerance:
+                    start = time.perf_counter()
+                    trace = Trace()
+                    trace.extend(st.session_state.alignment_trace)
+                    with trace.stage("evaluate", rows=len(alignment.merged)):
+                        updated = evaluate_alignment(alignment, *tolerance)
+                    with trace.stage("filter indexes"):
+                        # Assigned, since Streamlit magic would display a bare expression.
+                        _ = updated.index  # reuses the key index, only the status arrays are rebuilt
+                    updated.trace = trace
+                    _set_result(updated)
+                    st.session_state.result_tolerance = tolerance
+                    elapsed_ms = (time.perf_counter() - start) * 1000
+                    st.caption(f"Results updated for the new tolerance in {elapsed_ms:.0f} ms")
+
                 st.markdown("<div style='margin-top:8px'></div>", unsafe_allow_html=True)
                 run_col, save_col = st.columns(2)
+                run_job = get_job(st.session_state.run_job["id"]) if st.session_state.run_job else None
                 with run_col:
-                    if st.button("Run Comparison", use_container_width=True, key="run_btn"):
+                    if st.button(
+                        "Run Comparison", use_container_width=True, key="run_btn", disabled=run_job is not None
+                    ):
                         if not match_keys_first or not match_keys_second:
                             st.error("Please select match key columns for both files.")
                         elif not compare_col_first or not compare_col_second:
                             st.error("Please select compare columns for both files.")
+                        elif measures and low_memory and alignment is None:
+                            st.error("Additional measures need the in-memory engine; turn off low-memory mode.")
+                        elif alignment is not None:
+                            # Only the tolerance changed: re-evaluating takes milliseconds, so it runs here.
+                            trace = Trace()
+                            trace.extend(st.session_state.alignment_trace)
+                            with trace.stage("evaluate", rows=len(alignment.merged)):
+                                result = evaluate_alignment(alignment, *tolerance)
+                            with trace.stage("filter indexes"):
+                                _ = result.index
+                            result.trace = trace
+                            _set_result(result)
+                            st.session_state.result_tolerance = tolerance
+                            st.success("Comparison complete!")
                         else:
+                            # Runs on the shared job executor; it only sees the values captured here.
+                            first_df, second_df = st.session_state.first_df, st.session_state.second_df
+                            ingest_stages = st.session_state.first_ingest_trace + st.session_state.second_ingest_trace
+
+                            def _compare(trace):
+                                trace.extend(ingest_stages)
+                                if low_memory:
+                                    with trace.stage("read + compare (streaming)") as stage:
+                                        result = compare_streaming(
+                                            first_file,
+                                            second_file,
+                                            match_keys_first,
+                                            match_keys_second,
+                                            compare_col_first,
+                                            compare_col_second,
+                                            output_file=None,
+                                            tolerance_type=tolerance[0],
+                                            tolerance_value=tolerance[1],
+                                            memory_budget_mb=memory_budget_mb,
+                                            exact_scale=exact_scale,
+                                        )
+                                        stage.rows = result.total_records
+                                    alignment_stages = None
+                                else:
+                                    with trace.stage("align") as stage:
+                                        aligned = align_frames(
+                                            first_df,
+                                            second_df,
+                                            match_keys_first,
+                                            match_keys_second,
+                                            compare_col_first,
+                                            compare_col_second,
+                                            distinct_list=True,
+                                            workers=int(workers) if backend == BACKEND_PANDAS else 1,
+                                            display_legacy=display_cols_first,
+                                            display_converted=display_cols_second,
+                                            exact_scale=exact_scale,
+                                            measures=measures,
+                                            merge_budget_mb=merge_budget_mb if backend == BACKEND_PANDAS else None,
+                                            trace=trace,
+                                            backend=backend,
+                                        )
+                                        stage.rows = len(aligned.merged)
+                                    # Stages up to the alignment are kept for tolerance re-evaluations.
+                                    alignment_stages = list(trace.stages)
+                                    with trace.stage("evaluate", rows=len(aligned.merged)):
+                                        result = evaluate_alignment(aligned, *tolerance)
+                                with trace.stage("filter indexes"):
+                                    _ = result.index  # build the filter indexes before the result is shown
+                                return result, alignment_stages
+
                             try:
-                                with st.spinner("Running comparison..."):
-                                    result = compare_data(
-                                        st.session_state.first_df,
-                                        st.session_state.second_df,
-                                        match_keys_first,
-                                        match_keys_second,
-                                        compare_col_first,
-                                        compare_col_second,
-                                        output_file=None,
-                                        tolerance_type=None if tolerance_type == "None" else tolerance_type,
-                                        tolerance_value=tolerance_value if tolerance_type != "None" else None,
-                                        distinct_list=True,
-                                    )
-                                    st.session_state.result = result
-                                    st.success("Comparison complete!")
-                            except Exception as e:
-                                st.error(f"Error during comparison: {e}")
-                                st.session_state.result = None
+                                job = submit_job(_compare, session=st.session_state.session_id)
+                            except JobQueueFull as exc:
+                                st.error(str(exc))
+                            else:
+                                st.session_state.run_job = {
+                                    "id": job.job_id,
+                                    "alignment_key": alignment_key,
+                                    "tolerance": tolerance,
+                                }
+                                st.rerun()
                 with save_col:
                     if st.button("Save Configuration", use_container_width=True, key="open_save_btn"):
                         st.session_state.show_save_form = not st.session_state.show_save_form
 
+                # The running comparison: live stages, cancel, and its result once it finishes.
+                if st.session_state.run_job and run_job is None:
+                    st.session_state.run_job = None  # no longer known to this server process
+                elif run_job is not None and not run_job.done:
+
+                    @st.fragment(run_every=0.5)
+                    def _run_progress() -> None:
+                        if run_job.done:
+                            st.rerun()
+                        if run_job.state == STATE_QUEUED:
+                            running, queued = job_counts()
+                            st.info(
+                                f"Waiting for a free slot: {running} comparison(s) running, "
+                                f"{run_job.queue_position} queued ahead of this one."
+                            )
+                        else:
+                            st.caption(
+                                f"Running comparison — {run_job.current_stage or 'starting'}, "
+                                f"{run_job.elapsed_seconds:.0f}s"
+                            )
+                            st.dataframe(run_job.trace.to_frame(), use_container_width=True, hide_index=True)
+                        if st.button("Cancel comparison", key="cancel_run_btn"):
+                            run_job.cancel()
+                            st.rerun()
+
+                    _run_progress()
+                elif run_job is not None:
+                    if run_job.state == STATE_DONE:
+                        result, alignment_stages = run_job.result
+                        result.trace = Trace()
+                        result.trace.extend(run_job.trace.stages)
+                        if alignment_stages is not None:
+                            st.session_state.alignment_trace = alignment_stages
+                        _set_result(result)
+                        st.session_state.alignment_key = st.session_state.run_job["alignment_key"]
+                        st.session_state.result_tolerance = st.session_state.run_job["tolerance"]
+                        st.success(f"Comparison complete in {run_job.elapsed_seconds:.1f}s!")
+                    elif run_job.state == STATE_CANCELLED:
+                        st.info("Comparison cancelled.")
+                    else:
+                        st.error(f"Error during comparison: {run_job.error}")
+                        _set_result(None)
+                    forget_job(run_job.job_id)
+                    st.session_state.run_job = None
+
                 # Inline save form
                 if st.session_state.show_save_form:
                     st.markdown(
@@ -527,8 +815,13 @@ def main():
                                         "match_keys_second": match_keys_second,
                                         "compare_col_first": compare_col_first,
                                         "compare_col_second": compare_col_second,
+                                        "display_cols_first": display_cols_first,
+                                        "display_cols_second": display_cols_second,
                                         "tolerance_type": tolerance_type,
                                         "tolerance_value": tolerance_value,
+                                        "exact_scale": exact_scale,
+                                        "measures": st.session_state.measure_config,
+                                        "backend": backend,
                                     },
                                 )
                                 st.success(f"\u2018{save_name}\u2019 saved.")
@@ -592,56 +885,208 @@ def main():
                 """,
                 unsafe_allow_html=True,
             )
+            if result.measures:
+                st.dataframe(
+                    pd.DataFrame(
+                        {
+                            "Measure": [m.label for m in result.measures],
+                            "Matched": [m.matched_records for m in result.measures],
+                            "Unmatched": [m.unmatched_records for m in result.measures],
+                        }
+                    ),
+                    hide_index=True,
+                    use_container_width=True,
+                )
+
+            # Filter — status, key and dollar-band filters read the result's
+            # precomputed index; the view keeps the result server-side and
+            # only the visible page is sent.
+            view = st.session_state.get("result_view")
+            if view is None or view.merged is not result.merged:
+                view = st.session_state.result_view = ResultView(result.merged, result.index)
+            index = result.index
+            status_counts = {
+                STATUS_ALL: len(result.merged),
+                STATUS_DIFFERENCES: len(index.unmatched),
+                STATUS_MATCHES: len(index.matched),
+                STATUS_FIRST_ONLY: len(index.first_only),
+                STATUS_SECOND_ONLY: len(index.second_only),
+            }
+            status_labels = {
+                STATUS_ALL: "All rows",
+                STATUS_DIFFERENCES: "Differences only",
+                STATUS_MATCHES: "Matches only",
+                STATUS_FIRST_ONLY: "Only in first file",
+                STATUS_SECOND_ONLY: "Only in second file",
+            }
+            bucket_labels = index.bucket_labels()
 
-            # Filter
             _section_header("Filter")
             filter_col1, filter_col2 = st.columns(2)
             with filter_col1:
-                show_differences_only = st.checkbox("Show differences only", value=False)
+                status = st.selectbox(
+                    "Show",
+                    list(status_labels),
+                    format_func=lambda option: f"{status_labels[option]} ({status_counts[option]:,})",
+                    key="preview_status",
+                )
             with filter_col2:
-                show_matches_only = st.checkbox("Show matches only", value=False)
-
-            filtered_df = result.merged.copy()
-            if show_differences_only and not show_matches_only:
-                filtered_df = filtered_df[filtered_df["Difference"]]
-            elif show_matches_only and not show_differences_only:
-                filtered_df = filtered_df[~filtered_df["Difference"]]
-
-            _section_header(f"Preview — {len(filtered_df):,} rows")
-            st.dataframe(filtered_df, use_container_width=True, height=550)
-
-            # Download
-            output_buffer = BytesIO()
-            filtered_df.to_excel(output_buffer, index=False)
-            output_buffer.seek(0)
+                bucket = st.selectbox(
+                    "Dollar difference",
+                    [None, *range(len(bucket_labels))],
+                    format_func=lambda option: "Any"
+                    if option is None
+                    else f"{bucket_labels[option]} ({len(index.bucket_positions[option]):,})",
+                    key="preview_bucket",
+                )
+            key_search = st.text_input(
+                "Search comparison key",
+                key="preview_key_search",
+                placeholder="Start of a key, e.g. US001 | 1000",
+            )
+            result_columns = list(result.merged.columns)
 
-            temp_filename = "temp_reconciliation_results.xlsx"
-            with open(temp_filename, "wb") as f:
-                f.write(output_buffer.getvalue())
-            _format_output(temp_filename, filtered_df)
+            colfilter_col1, colfilter_col2 = st.columns(2)
+            with colfilter_col1:
+                filter_column = st.selectbox(
+                    "Filter column", ["(none)", *result_columns], key="preview_filter_column"
+                )
+            with colfilter_col2:
+                filter_value = st.text_input(
+                    "Filter value",
+                    key="preview_filter_value",
+                    placeholder="e.g. >100, <=0, 10..20, true, or text",
+                    disabled=filter_column == "(none)",
+                )
+            sort_col1, sort_col2 = st.columns([3, 1])
+            with sort_col1:
+                sort_by = st.selectbox("Sort by", ["(original order)", *result_columns], key="preview_sort_by")
+            with sort_col2:
+                st.markdown("<div style='margin-top:28px'></div>", unsafe_allow_html=True)
+                sort_descending = st.checkbox("Descending", key="preview_sort_desc")
+
+            query = {
+                "status": status,
+                "column": None if filter_column == "(none)" else filter_column,
+                "expression": filter_value if filter_column != "(none)" else "",
+                "sort_by": None if sort_by == "(original order)" else sort_by,
+                "descending": sort_descending,
+                "key": key_search,
+                "bucket": bucket,
+            }
+            try:
+                positions = view.positions(**query)
+            except ValueError as exc:
+                st.warning(str(exc))
+                query["column"], query["expression"] = None, ""
+                positions = view.positions(**query)
+
+            _section_header(f"Preview — {len(positions):,} rows")
+            page_col1, page_col2 = st.columns(2)
+            with page_col1:
+                page_size = st.selectbox(
+                    "Rows per page",
+                    PAGE_SIZES,
+                    index=PAGE_SIZES.index(DEFAULT_PAGE_SIZE),
+                    key="preview_page_size",
+                )
+            page_count = max(1, -(-len(positions) // page_size))
+            if st.session_state.get("preview_page", 1) > page_count:
+                st.session_state.preview_page = page_count
+            with page_col2:
+                page = st.number_input("Page", min_value=1, max_value=page_count, value=1, key="preview_page")
+            st.dataframe(view.page(positions, int(page), page_size), use_container_width=True, height=550)
+            first_row = (int(page) - 1) * page_size
+            st.caption(
+                f"Rows {min(first_row + 1, len(positions)):,}–{min(first_row + page_size, len(positions)):,} "
+                f"of {len(positions):,} · page {int(page):,} of {page_count:,}"
+            )
 
-            with open(temp_filename, "rb") as f:
-                excel_data = f.read()
+            # Download — the file is built on request in the background. Only
+            # the latest one is kept, and only until it has been saved.
+            export_label = st.selectbox(
+                "Download format",
+                list(_EXPORT_FORMATS),
+                key="export_format",
+                help="Parquet and Arrow are far smaller and faster than Excel, have no row limit, "
+                "and carry the summary as file metadata.",
+            )
+            export_format = _EXPORT_FORMATS[export_label]
+            export_extension = FORMAT_EXTENSIONS[export_format]
+            export_key = (st.session_state.result_id, tuple(query.values()), export_format)
+            export = st.session_state.export
+            export_job = export["job"] if export is not None and export["key"] == export_key else None
+            if export_job is None:
+                if st.button("Prepare Download", key="prepare_download_btn"):
+                    metadata = {**result.metadata(), "exported_rows": len(positions)}
+                    if len(positions) != len(result.merged) or query["sort_by"]:
+                        metadata["view"] = {
+                            key: bucket_labels[value] if key == "bucket" else value
+                            for key, value in query.items()
+                            if value not in (None, "", False)
+                        }
+                    export_df = view.rows(positions)
+                    export_job = start_export(export_df, export_format, metadata)
+                    st.session_state.export = {"key": export_key, "job": export_job}
+                    st.rerun()
+            elif not export_job.done:
+
+                @st.fragment(run_every=0.5)
+                def _export_progress() -> None:
+                    if export_job.done:
+                        st.rerun()
+                    st.progress(
+                        export_job.progress,
+                        text=f"Preparing download — {export_job.rows_written:,} of {export_job.total_rows:,} rows",
+                    )
 
-            if st.button("Download Results", key="download_results_btn"):
+                _export_progress()
+            elif export_job.error:
+                st.error(f"Could not prepare the download: {export_job.error}")
+                st.session_state.export = None
+            elif st.button("Download Results", key="download_results_btn"):
                 root = tk.Tk()
                 root.withdraw()
                 root.wm_attributes("-topmost", True)
                 save_path = filedialog.asksaveasfilename(
-                    defaultextension=".xlsx",
-                    filetypes=[("Excel files", "*.xlsx")],
-                    initialfile="reconciliation_results.xlsx",
+                    defaultextension=export_extension,
+                    filetypes=[(f"{export_label} files", f"*{export_extension}")],
+                    initialfile=f"reconciliation_results{export_extension}",
                     title="Save reconciliation results",
                 )
                 root.destroy()
                 if save_path:
                     try:
                         with open(save_path, "wb") as f:
-                            f.write(excel_data)
+                            f.write(export_job.data)
                         st.success(f"Saved to {save_path}")
+                        st.session_state.export_stages = list(export_job.trace.stages)
+                        st.session_state.export = None  # saved, so its bytes are not needed any more
                     except Exception as exc:
                         st.error(f"Could not save file: {exc}")
 
+            # Where the time and memory went, including finished downloads.
+            if result.trace is not None:
+                with st.expander("Performance"):
+                    performance = Trace()
+                    performance.extend(result.trace.stages)
+                    performance.extend(st.session_state.export_stages)
+                    if export_job is not None and export_job.done and not export_job.error:
+                        performance.extend(export_job.trace.stages)
+                    st.dataframe(performance.to_frame(), use_container_width=True, hide_index=True)
+                    st.caption(
+                        "Wall and CPU seconds per stage; indented stages run within the one above. "
+                        "The comparison's CPU seconds are its own thread's; the rest are the whole process's. "
+                        "Peak RSS is the process's memory high-water mark when the stage ended."
+                    )
+                    st.download_button(
+                        "Download trace (JSON)",
+                        performance.to_json(),
+                        file_name="reconciliation_trace.json",
+                        mime="application/json",
+                        key="download_trace_btn",
+                    )
+
     # ══════════════════════════════════════════════════════════════════════ #
     #  TAB 2 — Manage Configuration
     # ══════════════════════════════════════════════════════════════════════ #
@@ -673,8 +1118,17 @@ def main():
                                 "match_keys_second": st.session_state.get("match_keys_second", []),
                                 "compare_col_first": st.session_state.get("compare_col_first"),
                                 "compare_col_second": st.session_state.get("compare_col_second"),
+                                "display_cols_first": st.session_state.get("display_cols_first", []),
+                                "display_cols_second": st.session_state.get("display_cols_second", []),
                                 "tolerance_type": st.session_state.get("tolerance_type_select", "None"),
                                 "tolerance_value": st.session_state.get("tolerance_value_input"),
+                                "exact_scale": (
+                                    st.session_state.get("exact_scale_input", DEFAULT_SCALE)
+                                    if st.session_state.get("exact_amounts_check")
+                                    else None
+                                ),
+                                "measures": st.session_state.get("measure_config", []),
+                                "backend": st.session_state.get("backend_select", BACKEND_PANDAS),
                             },
                         )
                         st.success(f"Profile \u2018{profile_name}\u2019 saved.")
@@ -691,6 +1145,7 @@ def main():
                 st.info("No profiles saved yet.")
             else:
                 for pname, pcfg in profiles.items():
+                    display_cols = pcfg.get("display_cols_first", []) + pcfg.get("display_cols_second", [])
                     with st.container():
                         st.markdown(
                             f"""<div style="background:{_C['panel']}; border:1px solid {_C['border']};
@@ -705,6 +1160,7 @@ def main():
                                         Match keys (first): {', '.join(pcfg.get('match_keys_first', [])) or '—'}<br>
                                         Match keys (second): {', '.join(pcfg.get('match_keys_second', [])) or '—'}<br>
                                         Compare: {pcfg.get('compare_col_first', '—')} / {pcfg.get('compare_col_second', '—')}<br>
+                                        {f"Display: {', '.join(display_cols)}<br>" if display_cols else ""}
                                         Tolerance: {pcfg.get('tolerance_type', 'None')}
                                         {f" @ {pcfg.get('tolerance_value')}" if pcfg.get('tolerance_value') else ""}
                                     </div>
@@ -30,10 +30,26 @@ if os.path.isdir(_tcl_dir):
 
 # ── Your application's own files ────────────────────────────────────────────
 app_datas = [
-    ("GL_Recon.py",  "."),
-    ("utils.py",     "."),
-    ("pages",        "pages"),
-    ("assets",       "assets"),
+    ("GL_Recon.py",        "."),
+    ("recon_engine.py",    "."),
+    ("recon_io.py",        "."),
+    ("recon_streaming.py", "."),
+    ("recon_cache.py",     "."),
+    ("recon_profiles.py",  "."),
+    ("recon_export.py",    "."),
+    ("recon_view.py",      "."),
+    ("recon_index.py",     "."),
+    ("recon_delta.py",     "."),
+    ("recon_memory.py",    "."),
+    ("recon_amounts.py",   "."),
+    ("recon_preflight.py", "."),
+    ("recon_trace.py",     "."),
+    ("recon_sql.py",       "."),
+    ("recon_arrow.py",     "."),
+    ("recon_jobs.py",      "."),
+    ("utils.py",           "."),
+    ("pages",              "pages"),
+    ("assets",             "assets"),
 ]
 
 a = Analysis(
@@ -92,6 +108,8 @@ a = Analysis(
             "openpyxl.worksheet",
             "et_xmlfile",
             "xlrd",
+            "xlsxwriter",
+            "python_calamine",  # optional faster Excel reader, loaded lazily by pandas
             # Tkinter
             "tkinter",
             "tkinter.filedialog",
@@ -0,0 +1,666 @@
+"""Performance benchmarks for the reconciliation engine.
+
+Usage:
+    python benchmark.py differences --sizes 100000 1000000 5000000
+    python benchmark.py keys --sizes 100000 1000000
+    python benchmark.py parallel --sizes 1000000 --workers 1 2 4 8
+    python benchmark.py backends --sizes 1000000 --backends pandas arrow sql
+    python benchmark.py ingest --sizes 50000 200000
+    python benchmark.py export --sizes 100000 1000000
+    python benchmark.py suite --sizes 10000 100000 1000000 10000000 --output before.json
+    python benchmark.py diff before.json after.json
+
+Each benchmark prints rows/sec for the columnar engine. Where a row-wise
+reference implementation exists it is timed too (up to ``--rowwise-max``
+rows, since it is slow) and its output is checked for parity.
+
+``suite`` generates a synthetic GL pair shaped like each saved profile
+(its key, compare, measure and display columns) at every size, writes
+both files, and times ingest, ``compare_data`` stage by stage and export
+of the result. The rates of duplicate keys, mismatched amounts,
+one-sided keys and blank amounts are configurable. Each case runs in a
+fresh process so its peak memory is its own, and the results are written
+as JSON; ``diff`` compares two such files stage by stage. ``--backend``
+runs the suite on another comparison engine, so a suite per engine can be
+diffed, and ``backends`` times the engines against each other directly.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from recon_engine import (
+    BACKEND_ARROW,
+    BACKEND_PANDAS,
+    BACKENDS,
+    TOLERANCE_DOLLAR,
+    TOLERANCE_PERCENTAGE,
+    compare_data,
+    evaluate_differences,
+    factorize_comparison_keys,
+    worker_pool,
+)
+from recon_export import EXCEL_MAX_ROWS, FORMAT_EXTENSIONS, FORMAT_PARQUET, FORMAT_XLSX, write_excel, write_result
+from recon_io import ENGINE_AUTO, available_engines, read_frame
+from recon_profiles import PROFILES_FILE, load_profiles, profile_columns, profile_measures
+from recon_trace import Trace, peak_rss_bytes
+
+DEFAULT_SIZES = [100_000, 1_000_000, 5_000_000]
+SUITE_SIZES = [10_000, 100_000, 1_000_000, 10_000_000]
+SUITE_EXPORT_FORMATS = [FORMAT_PARQUET, FORMAT_XLSX]
+# The shape used when no saved profile is available.
+SYNTHETIC_PROFILE = {
+    "match_keys_first": ["BUSINESS_UNIT", "LOCATION", "ACCOUNT", "DEPTID"],
+    "match_keys_second": ["BUSINESS_UNIT", "LOCATION", "ACCOUNT", "DEPTID"],
+    "compare_col_first": "CREDIT",
+    "compare_col_second": "CREDIT",
+    "tolerance_type": "Dollar ($)",
+    "tolerance_value": 0.01,
+}
+TOLERANCE_CASES = [
+    (None, None),
+    (TOLERANCE_DOLLAR, None),
+    (TOLERANCE_DOLLAR, 100.0),
+    (TOLERANCE_PERCENTAGE, None),
+    (TOLERANCE_PERCENTAGE, 5.0),
+]
+
+
+def _synthetic_values(rows: int, seed: int = 0) -> pd.DataFrame:
+    """Return paired value columns with NaNs, zeros and small/large deltas."""
+    rng = np.random.default_rng(seed)
+    first = rng.normal(10_000, 5_000, rows).round(2)
+    second = first + rng.choice([0.0, 0.01, 50.0, 500.0], rows, p=[0.7, 0.1, 0.1, 0.1])
+    first[rng.random(rows) < 0.02] = 0.0
+    first[rng.random(rows) < 0.03] = np.nan
+    second[rng.random(rows) < 0.03] = np.nan
+    return pd.DataFrame({"first": first, "second": second})
+
+
+def _synthetic_keys(rows: int, seed: int = 0) -> pd.DataFrame:
+    """Return BUSINESS_UNIT / LOCATION / ACCOUNT / DEPTID string key columns."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "BUSINESS_UNIT": rng.choice([f"US{i:03d}" for i in range(200)], rows),
+            "LOCATION": rng.choice([f" LOC{i:02d}" for i in range(50)] + [None], rows),
+            "ACCOUNT": rng.integers(100000, 110000, rows).astype(str),
+            "DEPTID": rng.choice([f"D{i:04d} " for i in range(500)], rows),
+        },
+        dtype=object,
+    )
+
+
+def _synthetic_ledger(rows: int, seed: int = 0) -> pd.DataFrame:
+    """Return a string-typed GL extract with four key columns and a CREDIT amount."""
+    ledger = _synthetic_keys(rows, seed)
+    ledger["CREDIT"] = _synthetic_values(rows, seed)["first"].astype(str)
+    return ledger
+
+
+@dataclass
+class SyntheticSpec:
+    """The shape of a synthetic GL pair.
+
+    ``key_cardinality`` is the number of distinct values in each key column
+    but the last, which makes the keys unique. ``duplicate_rate`` is the
+    share of rows repeating another row's key, ``one_sided_rate`` the share
+    of keys present in one file only, ``mismatch_rate`` the share of rows
+    whose amounts differ between the files and ``nan_rate`` the share of
+    blank amounts on each side.
+    """
+
+    rows: int
+    key_cardinality: int = 200
+    duplicate_rate: float = 0.1
+    mismatch_rate: float = 0.05
+    one_sided_rate: float = 0.02
+    nan_rate: float = 0.01
+    seed: int = 0
+
+
+def _synthetic_pair(profile: dict, spec: SyntheticSpec) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Return a first and second GL extract with the columns ``profile`` reads.
+
+    Rows with keys present in both files are generated once and shared, so
+    both files have the same duplicates per key; the second file then has
+    ``mismatch_rate`` of its amounts moved and both are shuffled separately.
+    """
+    rng = np.random.default_rng(spec.seed)
+    distinct = max(1, spec.rows - round(spec.rows * spec.duplicate_rate))
+    one_sided = round(distinct * spec.one_sided_rate)
+    shared = distinct - one_sided
+    shared_rows = round(spec.rows * shared / distinct)
+
+    def _ids(start: int, count: int, rows: int) -> np.ndarray:
+        ids = np.arange(start, start + count)
+        repeats = rng.integers(start, start + count, max(rows - count, 0)) if count else ids[:0]
+        return np.concatenate([ids, repeats])
+
+    shared_ids = _ids(0, shared, shared_rows)
+    ids = {
+        "first": np.concatenate([shared_ids, _ids(shared, one_sided, spec.rows - shared_rows)]),
+        "second": np.concatenate([shared_ids, _ids(shared + one_sided, one_sided, spec.rows - shared_rows)]),
+    }
+    values = [profile["compare_col_first"], *(measure["first"] for measure in profile.get("measures") or [])]
+    amounts = {"first": {}, "second": {}}
+    for position in range(len(values)):
+        base = rng.normal(10_000, 5_000, len(shared_ids)).round(2)
+        moved = base + np.where(
+            rng.random(len(base)) < spec.mismatch_rate, rng.choice([0.01, 50.0, 500.0, -1_000.0], len(base)), 0.0
+        )
+        for side, shared_amounts in (("first", base), ("second", moved)):
+            side_amounts = np.concatenate(
+                [shared_amounts, rng.normal(10_000, 5_000, len(ids[side]) - len(base)).round(2)]
+            )
+            side_amounts[rng.random(len(side_amounts)) < spec.nan_rate] = np.nan
+            amounts[side][position] = side_amounts
+
+    frames = []
+    for side in ("first", "second"):
+        keys = profile[f"match_keys_{side}"]
+        value_columns = [
+            profile[f"compare_col_{side}"],
+            *(measure[side] for measure in profile.get("measures") or []),
+        ]
+        columns = {}
+        # Key values are labelled after the first file's columns so they match across files.
+        for position, (column, prefix) in enumerate(zip(keys, profile["match_keys_first"])):
+            if position == len(keys) - 1:
+                columns[column] = pd.Series(ids[side]).astype(str).str.zfill(9).radd(prefix[:3])
+            else:
+                labels = [f"{prefix[:3]}{value:04d}" for value in range(spec.key_cardinality)]
+                columns[column] = pd.Categorical.from_codes(
+                    (ids[side] * (2 * position + 7)) % spec.key_cardinality, labels
+                )
+        for position, column in enumerate(value_columns):
+            columns.setdefault(column, amounts[side][position])
+        for column in profile.get(f"display_cols_{side}", []):
+            labels = [f"{column} {value}" for value in range(1_000)]
+            columns.setdefault(column, pd.Categorical.from_codes(rng.integers(0, 1_000, len(ids[side])), labels))
+        frame = pd.DataFrame(columns)
+        frames.append(frame.iloc[rng.permutation(len(frame))].reset_index(drop=True))
+    return frames[0], frames[1]
+
+
+def _rowwise_keys(keys: pd.DataFrame) -> pd.Series:
+    """Reference row-wise key builder the factorized keys replaced."""
+    parts = keys.fillna("").astype(str)
+    return parts.apply(lambda row: " | ".join(value.strip() for value in row), axis=1)
+
+
+def _rowwise_differences(
+    frame: pd.DataFrame, tolerance_type: str | None, tolerance_value: float | None
+) -> tuple[pd.Series, pd.Series, pd.Series]:
+    """Reference row-wise implementation the columnar engine replaced."""
+
+    def _difference(row: pd.Series) -> bool:
+        legacy_val = row.get("first")
+        conv_val = row.get("second")
+        if pd.isna(legacy_val) or pd.isna(conv_val):
+            return True
+        if tolerance_type == TOLERANCE_DOLLAR:
+            if tolerance_value is None:
+                return legacy_val != conv_val
+            return abs(legacy_val - conv_val) > tolerance_value
+        if tolerance_type == TOLERANCE_PERCENTAGE:
+            if tolerance_value is None or legacy_val == 0:
+                return legacy_val != conv_val
+            return abs((legacy_val - conv_val) / legacy_val) > tolerance_value / 100
+        return legacy_val != conv_val
+
+    difference = frame.apply(_difference, axis=1)
+    dollar = frame.apply(
+        lambda row: (0 if pd.isna(row.get("first")) else row.get("first"))
+        - (0 if pd.isna(row.get("second")) else row.get("second")),
+        axis=1,
+    )
+    percentage = frame.apply(
+        lambda row: (
+            float("nan")
+            if pd.isna(row.get("first")) or pd.isna(row.get("second"))
+            else (
+                abs(row.get("first") - row.get("second")) / abs(row.get("first"))
+                if row.get("first") != 0
+                else float("nan")
+            )
+        ),
+        axis=1,
+    )
+    return difference, dollar, percentage
+
+
+def _reformat_reference(merged: pd.DataFrame, path: str) -> None:
+    """Reference writer the single-pass one replaced: to_excel, then reopen and format cell by cell."""
+    from openpyxl import load_workbook
+
+    merged.to_excel(path, index=False)
+    workbook = load_workbook(path)
+    worksheet = workbook.active
+    for position, column in enumerate(merged.columns, start=1):
+        number_format = {"Dollar Difference": "$#,##0.00", "Percentage Difference": "0.00%"}.get(column)
+        if number_format:
+            for row in range(2, worksheet.max_row + 1):
+                worksheet.cell(row=row, column=position).number_format = number_format
+    workbook.save(path)
+
+
+def _timed(func, *args):
+    start = time.perf_counter()
+    output = func(*args)
+    return output, time.perf_counter() - start
+
+
+def bench_differences(sizes: list[int], rowwise_max: int) -> None:
+    """Time the difference engine and check parity with the row-wise version."""
+    print(f"{'rows':>10}  {'tolerance':<22} {'columnar rows/s':>16} {'row-wise rows/s':>16}  parity")
+    for rows in sizes:
+        frame = _synthetic_values(rows)
+        for tolerance_type, tolerance_value in TOLERANCE_CASES:
+            label = f"{tolerance_type or 'None'} @ {tolerance_value}"
+            columnar, elapsed = _timed(
+                evaluate_differences, frame["first"], frame["second"], tolerance_type, tolerance_value
+            )
+            rowwise_rate = parity = "-"
+            if rows <= rowwise_max:
+                reference, rowwise_elapsed = _timed(_rowwise_differences, frame, tolerance_type, tolerance_value)
+                rowwise_rate = f"{rows / rowwise_elapsed:,.0f}"
+                parity = "ok" if all(
+                    np.array_equal(np.asarray(ref, dtype=float), got, equal_nan=True)
+                    for ref, got in zip(reference, columnar)
+                ) else "MISMATCH"
+            print(f"{rows:>10,}  {label:<22} {rows / elapsed:>16,.0f} {rowwise_rate:>16}  {parity}")
+
+
+def bench_keys(sizes: list[int], rowwise_max: int) -> None:
+    """Time composite-key construction and check the keys partition rows identically."""
+    print(f"{'rows':>10}  {'factorized rows/s':>18} {'row-wise rows/s':>16}  parity")
+    for rows in sizes:
+        first, second = _synthetic_keys(rows, seed=1), _synthetic_keys(rows, seed=2)
+
+        def _factorized():
+            keys = factorize_comparison_keys(first, second)
+            keys.text(keys.unique_codes)
+            return keys.legacy_codes, keys.converted_codes
+
+        (first_codes, second_codes), elapsed = _timed(_factorized)
+        rowwise_rate = parity = "-"
+        if rows <= rowwise_max:
+            (first_text, second_text), rowwise_elapsed = _timed(lambda: (_rowwise_keys(first), _rowwise_keys(second)))
+            rowwise_rate = f"{2 * rows / rowwise_elapsed:,.0f}"
+            codes = np.concatenate([first_codes, second_codes])
+            text_codes = pd.factorize(pd.concat([first_text, second_text], ignore_index=True))[0]
+            same_partition = len(set(zip(codes, text_codes))) == len(set(codes)) == len(set(text_codes))
+            parity = "ok" if same_partition else "MISMATCH"
+        print(f"{rows:>10,}  {2 * rows / elapsed:>18,.0f} {rowwise_rate:>16}  {parity}")
+
+
+def bench_parallel(sizes: list[int], workers: list[int]) -> None:
+    """Time compare_data end to end at each worker count and report the speed-up."""
+    keys = ["BUSINESS_UNIT", "LOCATION", "ACCOUNT", "DEPTID"]
+    print(f"{'rows':>10}  {'workers':>7} {'seconds':>8} {'rows/s':>12} {'speed-up':>8}")
+    for rows in sizes:
+        first, second = _synthetic_ledger(rows, seed=1), _synthetic_ledger(rows, seed=2)
+        baseline = None
+        for count in workers:
+            if count > 1:
+                worker_pool(count).submit(abs, 0).result()  # start the pool outside the timing
+            _, elapsed = _timed(lambda: compare_data(first, second, keys, keys, "CREDIT", "CREDIT", workers=count))
+            baseline = baseline or elapsed
+            print(f"{rows:>10,}  {count:>7} {elapsed:>8.2f} {2 * rows / elapsed:>12,.0f} {baseline / elapsed:>7.2f}x")
+
+
+def bench_backends(sizes: list[int], backends: list[str]) -> None:
+    """Time compare_data on each backend and check its result against the first backend's."""
+    keys = ["BUSINESS_UNIT", "LOCATION", "ACCOUNT", "DEPTID"]
+    print(f"{'rows':>10}  {'backend':<7} {'seconds':>8} {'rows/s':>12} {'speed-up':>8}  parity")
+    for rows in sizes:
+        first, second = _synthetic_ledger(rows, seed=1), _synthetic_ledger(rows, seed=2)
+        baseline = reference = None
+        for backend in backends:
+            result, elapsed = _timed(
+                lambda: compare_data(
+                    first,
+                    second,
+                    keys,
+                    keys,
+                    "CREDIT",
+                    "CREDIT",
+                    tolerance_type=TOLERANCE_DOLLAR,
+                    tolerance_value=0.01,
+                    backend=backend,
+                )
+            )
+            baseline = baseline or elapsed
+            reference = reference or result
+            # Every engine must give the same keys in the same order and the same number of matches.
+            parity = (
+                reference.merged["Comparison Key"].tolist() == result.merged["Comparison Key"].tolist()
+                and reference.matched_records == result.matched_records
+            )
+            print(
+                f"{rows:>10,}  {backend:<7} {elapsed:>8.2f} {2 * rows / elapsed:>12,.0f}"
+                f" {baseline / elapsed:>7.2f}x  {'ok' if parity else 'MISMATCH'}"
+            )
+
+
+def bench_ingest(sizes: list[int]) -> None:
+    """Time each workbook reader on a synthetic extract, with and without column projection."""
+    usecols = ["BUSINESS_UNIT", "ACCOUNT", "CREDIT"]
+    print(f"{'rows':>10}  {'reader':<18} {'columns':<8} {'seconds':>8} {'rows/s':>12}  parity")
+    for rows in sizes:
+        ledger = _synthetic_ledger(rows)
+        for i in range(8):  # pad to a realistically wide extract
+            ledger[f"ATTRIBUTE_{i}"] = ledger["DEPTID"]
+        with tempfile.TemporaryDirectory() as workdir:
+            path = os.path.join(workdir, "ledger.xlsx")
+            ledger.to_excel(path, index=False)
+            reference, elapsed = _timed(lambda: pd.read_excel(path, dtype=str))
+            print(f"{rows:>10,}  {'pandas read_excel':<18} {'all':<8} {elapsed:>8.2f} {rows / elapsed:>12,.0f}  -")
+            for engine in (e for e in available_engines() if e != ENGINE_AUTO):
+                for columns in (None, usecols):
+                    result = read_frame(path, usecols=columns, engine=engine)
+                    expected = reference[columns] if columns else reference
+                    parity = "ok" if result.frame.astype(object).equals(expected.astype(object)) else "MISMATCH"
+                    label = "all" if columns is None else "usecols"
+                    print(
+                        f"{rows:>10,}  {engine:<18} {label:<8} {result.seconds:>8.2f} "
+                        f"{rows / result.seconds:>12,.0f}  {parity}"
+                    )
+
+
+def bench_export(sizes: list[int], rowwise_max: int) -> None:
+    """Time the single-pass Excel writer against the write-reload-format cycle."""
+    keys = ["BUSINESS_UNIT", "LOCATION", "ACCOUNT", "DEPTID"]
+    print(f"{'rows':>10}  {'single-pass rows/s':>18} {'reformat rows/s':>16}  parity")
+    for rows in sizes:
+        first, second = _synthetic_ledger(rows // 2, seed=1), _synthetic_ledger(rows // 2, seed=2)
+        merged = compare_data(first, second, keys, keys, "CREDIT", "CREDIT").merged
+        with tempfile.TemporaryDirectory() as workdir:
+            fast_path, slow_path = os.path.join(workdir, "fast.xlsx"), os.path.join(workdir, "slow.xlsx")
+            _, elapsed = _timed(write_excel, merged, fast_path)
+            reference_rate = parity = "-"
+            if len(merged) <= rowwise_max:
+                _, reference_elapsed = _timed(_reformat_reference, merged, slow_path)
+                reference_rate = f"{len(merged) / reference_elapsed:,.0f}"
+                parity = "ok" if pd.read_excel(fast_path).equals(pd.read_excel(slow_path)) else "MISMATCH"
+        print(f"{len(merged):>10,}  {len(merged) / elapsed:>18,.0f} {reference_rate:>16}  {parity}")
+
+
+def _write_input(frame: pd.DataFrame, path: str) -> None:
+    if path.endswith(".xlsx"):
+        write_excel(frame, path)
+    else:
+        frame.to_csv(path, index=False)
+
+
+def _run_case(
+    name: str,
+    profile: dict,
+    spec: SyntheticSpec,
+    ingest_format: str,
+    export_formats: list[str],
+    backend: str = BACKEND_PANDAS,
+) -> dict:
+    """Generate, write, read, compare and export one synthetic pair; return the case as a JSON-ready dict."""
+    start = time.perf_counter()
+    first, second = _synthetic_pair(profile, spec)
+    generate_seconds = time.perf_counter() - start
+    tolerance_type = profile.get("tolerance_type")
+    tolerance = (None, None) if tolerance_type in (None, "None") else (tolerance_type, profile.get("tolerance_value"))
+    trace = Trace()
+    skipped = []
+    with tempfile.TemporaryDirectory() as workdir:
+        paths = {}
+        for side, frame in (("first", first), ("second", second)):
+            paths[side] = os.path.join(workdir, f"{side}.{ingest_format}")
+            _write_input(frame, paths[side])
+        del first, second
+        frames = {}
+        for side, path in paths.items():
+            with trace.stage(f"ingest {side}") as stage:
+                read = read_frame(path, usecols=profile_columns(profile, side))
+                frames[side] = read.frame
+                stage.stage, stage.rows = f"ingest {side} ({read.engine})", len(read.frame)
+        with trace.stage("compare") as stage:
+            result = compare_data(
+                frames["first"],
+                frames["second"],
+                profile["match_keys_first"],
+                profile["match_keys_second"],
+                profile["compare_col_first"],
+                profile["compare_col_second"],
+                tolerance_type=tolerance[0],
+                tolerance_value=tolerance[1],
+                display_legacy=profile.get("display_cols_first"),
+                display_converted=profile.get("display_cols_second"),
+                exact_scale=profile.get("exact_scale"),
+                measures=profile_measures(profile),
+                trace=trace,
+                backend=backend,
+            )
+            stage.rows = result.total_records
+        for output_format in export_formats:
+            if output_format == FORMAT_XLSX and result.total_records >= EXCEL_MAX_ROWS:
+                skipped.append(output_format)  # would spill onto extra sheets; not a realistic export
+                continue
+            path = os.path.join(workdir, f"result{FORMAT_EXTENSIONS[output_format]}")
+            with trace.stage(f"export {output_format}", rows=result.total_records):
+                write_result(result.merged, path, output_format, metadata=result.metadata())
+    peak = peak_rss_bytes()
+    return {
+        "profile": name,
+        "spec": asdict(spec),
+        "ingest_format": ingest_format,
+        "backend": backend,
+        "generate_seconds": generate_seconds,
+        "total_records": result.total_records,
+        "matched_records": result.matched_records,
+        "skipped_exports": skipped,
+        "peak_rss_mb": None if peak is None else peak / (1024 * 1024),
+        "stages": trace.to_dict()["stages"],
+    }
+
+
+def _git_revision() -> str | None:
+    try:
+        completed = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return completed.stdout.strip()
+
+
+def _stage_seconds(case: dict, prefix: str) -> float:
+    return sum(
+        stage["wall_seconds"] for stage in case["stages"] if stage["depth"] == 0 and stage["stage"].startswith(prefix)
+    )
+
+
+def bench_suite(
+    sizes: list[int],
+    profiles: dict,
+    spec: SyntheticSpec,
+    ingest_format: str,
+    export_formats: list[str],
+    output: str,
+    backend: str = BACKEND_PANDAS,
+) -> None:
+    """Time ingest, compare and export of synthetic pairs for every profile and size; write the results as JSON."""
+    report = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "revision": _git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "backend": backend,
+        "cases": [],
+    }
+    print(
+        f"{'rows':>10}  {'profile':<16} {'ingest':<6} {'ingest s':>9} {'compare s':>9} {'export s':>9}"
+        f" {'rows/s':>11} {'peak MB':>9}"
+    )
+    context = multiprocessing.get_context("spawn")
+    for rows in sizes:
+        case_format = ingest_format
+        if case_format == "auto":
+            case_format = "xlsx" if rows < EXCEL_MAX_ROWS else "csv"
+        for name, profile in profiles.items():
+            case_spec = SyntheticSpec(**{**asdict(spec), "rows": rows})
+            # A fresh process per case keeps the peak memory of earlier, larger cases out of its figures.
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                case = pool.submit(_run_case, name, profile, case_spec, case_format, export_formats, backend).result()
+            report["cases"].append(case)
+            compare_seconds = _stage_seconds(case, "compare")
+            print(
+                f"{rows:>10,}  {name[:16]:<16} {case_format:<6} {_stage_seconds(case, 'ingest'):>9.2f}"
+                f" {compare_seconds:>9.2f} {_stage_seconds(case, 'export'):>9.2f}"
+                f" {2 * rows / compare_seconds:>11,.0f} {case['peak_rss_mb'] or 0:>9,.0f}"
+            )
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}")
+
+
+def diff_suites(before_path: str, after_path: str) -> None:
+    """Print the wall time of each stage in two suite result files side by side."""
+    with open(before_path, encoding="utf-8") as f:
+        before = json.load(f)
+    with open(after_path, encoding="utf-8") as f:
+        after = json.load(f)
+
+    def _key(case: dict) -> tuple:
+        return case["profile"], case["spec"]["rows"], case["ingest_format"]
+
+    earlier = {_key(case): case for case in before["cases"]}
+    for label, report in (("before", before), ("after", after)):
+        backend = report.get("backend", BACKEND_PANDAS)
+        print(f"{label}: revision {report.get('revision') or '?'}, {backend} backend, {report['created']}")
+    print(f"  {'stage':<36} {'before s':>9} {'after s':>9} {'change':>7}")
+    for case in after["cases"]:
+        previous = earlier.get(_key(case))
+        if previous is None:
+            continue
+        print(f"\n{case['profile']} · {case['spec']['rows']:,} rows · {case['ingest_format']}")
+        seconds = {(stage["depth"], stage["stage"]): stage["wall_seconds"] for stage in previous["stages"]}
+        for stage in case["stages"]:
+            old = seconds.get((stage["depth"], stage["stage"]))
+            new = stage["wall_seconds"]
+            change = f"{new / old:6.2f}x" if old else "      -"
+            old_text = f"{old:9.2f}" if old is not None else f"{'-':>9}"
+            print(f"  {'  ' * stage['depth'] + stage['stage']:<36} {old_text} {new:9.2f} {change}")
+        old_peak, new_peak = previous.get("peak_rss_mb"), case.get("peak_rss_mb")
+        if old_peak and new_peak:
+            print(f"  {'peak RSS MB':<36} {old_peak:9,.0f} {new_peak:9,.0f} {new_peak / old_peak:6.2f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        "benchmark", choices=["differences", "keys", "parallel", "backends", "ingest", "export", "suite", "diff"]
+    )
+    parser.add_argument("files", nargs="*", help="For 'diff': the earlier and the later suite result file")
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        help=f"Row counts (default: {DEFAULT_SIZES}; {SUITE_SIZES} for 'suite')",
+    )
+    parser.add_argument(
+        "--rowwise-max",
+        type=int,
+        default=100_000,
+        help="Largest size at which to also time the row-wise reference (0 disables it)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        nargs="+",
+        default=[1, 2, 4, os.cpu_count() or 1],
+        help="Worker counts to compare for the 'parallel' benchmark",
+    )
+    parser.add_argument(
+        "--backends",
+        nargs="+",
+        choices=BACKENDS,
+        default=[BACKEND_PANDAS, BACKEND_ARROW],
+        help="Comparison engines to compare for the 'backends' benchmark, the first being the reference",
+    )
+    suite = parser.add_argument_group("suite options")
+    suite.add_argument("--profiles-file", default=PROFILES_FILE, help="Profiles to shape the data after")
+    suite.add_argument("--profile", nargs="+", help="Profiles to run (default: all, or a generic GL shape)")
+    suite.add_argument("--key-cardinality", type=int, default=SyntheticSpec.key_cardinality)
+    suite.add_argument("--duplicate-rate", type=float, default=SyntheticSpec.duplicate_rate)
+    suite.add_argument("--mismatch-rate", type=float, default=SyntheticSpec.mismatch_rate)
+    suite.add_argument("--one-sided-rate", type=float, default=SyntheticSpec.one_sided_rate)
+    suite.add_argument("--nan-rate", type=float, default=SyntheticSpec.nan_rate)
+    suite.add_argument("--seed", type=int, default=SyntheticSpec.seed)
+    suite.add_argument(
+        "--ingest-format",
+        choices=["auto", "xlsx", "csv"],
+        default="auto",
+        help="Input file format (default: xlsx while it fits one sheet, csv beyond)",
+    )
+    suite.add_argument(
+        "--export-formats", nargs="*", choices=list(FORMAT_EXTENSIONS), default=SUITE_EXPORT_FORMATS
+    )
+    suite.add_argument("--backend", choices=BACKENDS, default=BACKEND_PANDAS, help="Comparison engine to time")
+    suite.add_argument("--output", default="benchmark_suite.json", help="Where to write the suite results")
+    args = parser.parse_args()
+    sizes = args.sizes or (SUITE_SIZES if args.benchmark == "suite" else DEFAULT_SIZES)
+
+    if args.benchmark == "suite":
+        profiles = load_profiles(args.profiles_file) or {"synthetic": SYNTHETIC_PROFILE}
+        if args.profile:
+            missing = [name for name in args.profile if name not in profiles]
+            if missing:
+                parser.error(f"profiles not found in {args.profiles_file}: {', '.join(missing)}")
+            profiles = {name: profiles[name] for name in args.profile}
+        spec = SyntheticSpec(
+            0,
+            key_cardinality=args.key_cardinality,
+            duplicate_rate=args.duplicate_rate,
+            mismatch_rate=args.mismatch_rate,
+            one_sided_rate=args.one_sided_rate,
+            nan_rate=args.nan_rate,
+            seed=args.seed,
+        )
+        bench_suite(sizes, profiles, spec, args.ingest_format, args.export_formats, args.output, args.backend)
+    elif args.benchmark == "diff":
+        if len(args.files) != 2:
+            parser.error("diff needs two suite result files")
+        diff_suites(*args.files)
+    elif args.benchmark == "differences":
+        bench_differences(sizes, args.rowwise_max)
+    elif args.benchmark == "keys":
+        bench_keys(sizes, args.rowwise_max)
+    elif args.benchmark == "parallel":
+        bench_parallel(sizes, args.workers)
+    elif args.benchmark == "backends":
+        bench_backends(sizes, args.backends)
+    elif args.benchmark == "ingest":
+        bench_ingest(sizes)
+    elif args.benchmark == "export":
+        bench_export(sizes, args.rowwise_max)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,7 @@ Usage:
 Output: build/exe.win-amd64-3.x/
 """
 
+import importlib.util
 import os
 import sys
 
@@ -26,10 +27,26 @@ _tcl_dir = os.path.join(sys.prefix, "tcl")   # contains tcl8.6/ and tk8.6/
 # ── Files and folders to copy into the build directory ──────────────────────
 include_files = [
     # Application source files (Streamlit loads these by absolute path at runtime)
-    ("GL_Recon.py", "GL_Recon.py"),
-    ("utils.py",    "utils.py"),
-    ("pages",       "pages"),
-    ("assets",      "assets"),
+    ("GL_Recon.py",        "GL_Recon.py"),
+    ("recon_engine.py",    "recon_engine.py"),
+    ("recon_io.py",        "recon_io.py"),
+    ("recon_streaming.py", "recon_streaming.py"),
+    ("recon_cache.py",     "recon_cache.py"),
+    ("recon_profiles.py",  "recon_profiles.py"),
+    ("recon_export.py",    "recon_export.py"),
+    ("recon_view.py",      "recon_view.py"),
+    ("recon_index.py",     "recon_index.py"),
+    ("recon_delta.py",     "recon_delta.py"),
+    ("recon_memory.py",    "recon_memory.py"),
+    ("recon_amounts.py",   "recon_amounts.py"),
+    ("recon_preflight.py", "recon_preflight.py"),
+    ("recon_trace.py",     "recon_trace.py"),
+    ("recon_sql.py",       "recon_sql.py"),
+    ("recon_arrow.py",     "recon_arrow.py"),
+    ("recon_jobs.py",      "recon_jobs.py"),
+    ("utils.py",           "utils.py"),
+    ("pages",              "pages"),
+    ("assets",             "assets"),
     # Streamlit frontend
     (_streamlit_static, "streamlit/static"),
     # Tkinter pure-Python package
@@ -71,6 +88,7 @@ build_exe_options = {
         "altair",
         "et_xmlfile",
         "xlrd",
+        "xlsxwriter",
         # Tkinter
         "tkinter",
         "tkinter.filedialog",
@@ -101,6 +119,10 @@ build_exe_options = {
     "include_msvcr": True,       # bundle the Visual C++ runtime
 }
 
+# python-calamine is an optional, faster Excel reader that pandas loads lazily.
+if importlib.util.find_spec("python_calamine"):
+    build_exe_options["packages"].append("python_calamine")
+
 executables = [
     Executable(
         "launcher.py",
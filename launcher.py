@@ -6,6 +6,7 @@ This script sets up the correct working directory and asset paths, then
 launches the Streamlit server in-process via bootstrap.run().
 """
 
+import multiprocessing
 import os
 import sys
 
@@ -65,4 +66,7 @@ def main() -> None:
 
 
 if __name__ == "__main__":
+    # Parallel comparisons start worker processes by re-running this exe;
+    # freeze_support() turns those launches into workers instead of servers.
+    multiprocessing.freeze_support()
     main()
@@ -0,0 +1,84 @@
+"""Exact fixed-point amounts for the compare column.
+
+In exact mode amounts are parsed straight into int64 counts of
+``10 ** -scale`` units (cents for scale 2), so sums and differences are
+integer arithmetic: exact, and cheaper than float or ``Decimal`` objects.
+Missing or unparseable amounts become ``<NA>`` in a nullable ``Int64``
+column. Most text is parsed with the float parser and rounded, which is
+exact for amounts with at most ``scale`` decimals well inside float
+precision; the few other values go through ``Decimal`` and are rounded
+half away from zero. This module must not import Streamlit or tkinter.
+"""
+
+import math
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_SCALE = 2
+MAX_SCALE = 9
+# Below this many units, rounding the float parse of a decimal with at most ``scale`` places is exact.
+_FLOAT_EXACT_UNITS = 2.0**50
+_INT64_MAX = np.iinfo(np.int64).max
+
+
+def validate_scale(scale: int) -> int:
+    """Return ``scale`` as an int, or raise ``ValueError`` if it is not 0 to ``MAX_SCALE`` decimal places."""
+    if isinstance(scale, bool) or not float(scale).is_integer() or not 0 <= scale <= MAX_SCALE:
+        raise ValueError(f"Exact amounts need 0 to {MAX_SCALE} decimal places, got {scale!r}")
+    return int(scale)
+
+
+def _decimal_units(text, unit: Decimal) -> int | None:
+    try:
+        value = Decimal(str(text).strip())
+    except InvalidOperation:
+        return None
+    if not value.is_finite():
+        return None
+    units = int((value * unit).to_integral_value(rounding=ROUND_HALF_UP))
+    if abs(units) > _INT64_MAX:
+        raise ValueError(f"Amount {text!r} is too large for exact amounts")
+    return units
+
+
+def scaled_amounts(values: pd.Series, scale: int = DEFAULT_SCALE) -> pd.Series:
+    """Parse a column of amounts into ``Int64`` units of ``10 ** -scale``.
+
+    Text is parsed like ``pd.to_numeric(errors="coerce")``; numeric columns
+    are rounded to the nearest unit. Raises ``ValueError`` for an amount
+    that does not fit in int64 units.
+    """
+    scale = validate_scale(scale)
+    if values.empty:
+        return pd.Series(pd.array([], dtype="Int64"), index=values.index, name=values.name)
+    unit = 10**scale
+    floats = pd.to_numeric(values, errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+    with np.errstate(invalid="ignore", over="ignore"):
+        scaled = floats * unit
+        missing = ~np.isfinite(scaled)
+        inexact = ~missing & (np.abs(scaled) >= _FLOAT_EXACT_UNITS)
+    if not pd.api.types.is_numeric_dtype(values.dtype):
+        text = values.astype("str").str.strip()
+        dot = text.str.find(".").to_numpy(dtype="float64", na_value=-1)
+        decimals = np.where(dot >= 0, text.str.len().to_numpy(dtype="float64", na_value=0) - dot - 1, 0)
+        exponent = text.str.contains("e", case=False, regex=False).to_numpy(dtype=bool, na_value=False)
+        inexact |= ~missing & ((decimals > scale) | exponent)
+    elif np.abs(np.nan_to_num(scaled)).max(initial=0) > _INT64_MAX:
+        raise ValueError("Amounts are too large for exact amounts")
+
+    units = np.round(np.where(missing | inexact, 0, scaled)).astype(np.int64)
+    if inexact.any():
+        decimal_unit = Decimal(unit)
+        source = values.to_numpy(dtype=object)
+        for position in np.flatnonzero(inexact):
+            exact = _decimal_units(source[position], decimal_unit)
+            units[position] = exact or 0
+            missing[position] = exact is None
+    return pd.Series(pd.arrays.IntegerArray(units, missing), index=values.index, name=values.name)
+
+
+def units_threshold(amount: float, scale: int) -> int:
+    """Return the largest whole number of units not exceeding ``amount``, read as the decimal it prints as."""
+    return math.floor(Decimal(repr(float(amount))) * 10**scale)
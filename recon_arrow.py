@@ -0,0 +1,243 @@
+"""Multithreaded reconciliation on Arrow tables.
+
+``align_arrow`` does the key normalization, the per-key sums and the full
+outer join with PyArrow compute, whose hash aggregation and hash join run
+on all cores. Keys and display columns stay Arrow strings, and each key
+part is dictionary-encoded into integer codes that sort like its text, so
+the aggregation, join and sort compare integers. Only the joined result,
+one row per key, becomes a pandas frame, which
+``recon_engine.finish_alignment`` finishes, so it has the same columns,
+``attrs`` and alignment as the pandas engine and is evaluated by
+``evaluate_alignment`` like any other.
+
+The pipeline is not Arrow-native end to end: the conversion to pandas
+happens right after the join, not at the UI boundary, and the tolerance,
+column drops and renames run in pandas. They touch one row per key rather
+than one per input row, they are shared by every engine, and a new
+tolerance is applied to the alignment in pandas without a new join.
+
+Key parts are stripped of the same whitespace ``str.strip`` removes, and
+sides with a different number of key columns are joined on the
+``"a | b"`` key text, as in the pandas engine. Only ``distinct_list=True``
+is supported. Float sums are added in whatever order the threads reach
+them, so like the pandas engine's they may differ in the last bit from a
+sum in row order; exact amounts are summed as integers. Display columns
+come back as text. It needs pyarrow 14 or later (see requirements.txt).
+This module must not import Streamlit or tkinter.
+"""
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from recon_amounts import scaled_amounts, validate_scale
+from recon_engine import (
+    KEY_SEPARATOR,
+    Alignment,
+    Measure,
+    finish_alignment,
+    plan_columns,
+)
+from recon_trace import Trace, traced
+
+# Everything str.strip() removes, so keys normalize exactly as in the pandas engine.
+_WHITESPACE = "".join(character for character in map(chr, range(0x3001)) if character.isspace())
+_SEPARATOR = pa.scalar(KEY_SEPARATOR, pa.large_string())
+_EMPTY = pa.scalar("", pa.large_string())
+_SUM = pc.ScalarAggregateOptions(skip_nulls=True, min_count=0)  # an all-blank key sums to 0, as in pandas
+
+
+def _text(part: pd.Series) -> pa.Array:
+    """Return a column as Arrow strings, missing values as nulls."""
+    if isinstance(part.dtype, pd.CategoricalDtype):
+        # Convert each category once and look rows up by code.
+        codes = part.cat.codes.to_numpy()
+        return _text(pd.Series(part.cat.categories)).take(pa.array(codes, mask=codes < 0))
+    if part.dtype == object:
+        codes, uniques = pd.factorize(part)  # mixed Python objects: convert each distinct value once
+        text = pa.array([str(value) for value in uniques], type=pa.large_string())
+        return text.take(pa.array(codes, mask=codes < 0))
+    if not pd.api.types.is_string_dtype(part.dtype):
+        part = part.astype(str).where(part.notna())
+    text = pa.array(part, from_pandas=True).cast(pa.large_string())
+    return text.combine_chunks() if isinstance(text, pa.ChunkedArray) else text
+
+
+def _key_parts(frame: pd.DataFrame, pk: list[str], joined: bool) -> list[pa.Array]:
+    """Return the stripped key parts of one side, or their ``"a | b"`` text when ``joined``."""
+    parts = [pc.utf8_trim(pc.fill_null(_text(frame[column]), ""), _WHITESPACE) for column in pk]
+    if joined:
+        parts = [pc.binary_join_element_wise(*parts, _SEPARATOR) if parts else pa.repeat(_EMPTY, len(frame))]
+    return parts
+
+
+def _key_codes(
+    legacy_part: pa.Array, converted_part: pa.Array, followed: bool = False
+) -> tuple[pa.Array, pa.Array, pa.Array]:
+    """Encode one key part of both sides as shared ``int32`` codes that sort like the key text.
+
+    Returns both sides' codes and the sorted labels they index, so the
+    aggregation, join and sort work on integers rather than strings. A part
+    ``followed`` by another sorts with the separator appended, as within the
+    joined key text.
+    """
+    encoded = pc.dictionary_encode(pa.concat_arrays([legacy_part, converted_part]))
+    labels = pc.binary_join_element_wise(encoded.dictionary, _EMPTY, _SEPARATOR) if followed else encoded.dictionary
+    order = pc.sort_indices(labels).to_numpy()
+    rank = np.empty(len(order), dtype=np.int32)
+    rank[order] = np.arange(len(order), dtype=np.int32)
+    codes = pa.array(rank[encoded.indices.to_numpy(zero_copy_only=False)])
+    return codes[: len(legacy_part)], codes[len(legacy_part) :], encoded.dictionary.take(order)
+
+
+def _side_table(
+    frame: pd.DataFrame, codes: list[pa.Array], values: list[str], display: list[str], exact_scale: int | None
+) -> pa.Table:
+    """Return one side with its key codes ``p*``, parsed values ``v*``, display ``d*`` and their rows ``r*``."""
+    columns = {f"p{position}": part for position, part in enumerate(codes)}
+    for position, column in enumerate(values):
+        if exact_scale is None:
+            parsed = pd.to_numeric(frame[column], errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+            columns[f"v{position}"] = pa.array(parsed, from_pandas=True)
+        else:
+            columns[f"v{position}"] = pa.array(scaled_amounts(frame[column], exact_scale), type=pa.int64())
+    rid = pa.array(np.arange(len(frame), dtype=np.int64))
+    for position, column in enumerate(display):
+        columns[f"d{position}"] = _text(frame[column])
+        # The row number where the display value is present, so the first one per key is the minimum.
+        columns[f"r{position}"] = pc.if_else(pc.is_valid(columns[f"d{position}"]), rid, pa.scalar(None, pa.int64()))
+    return pa.table(columns)
+
+
+def _key_order(merged: pa.Table, keys: list[str], labels: list[pa.Array]) -> np.ndarray:
+    """Return the row order sorting ``merged`` by its key codes.
+
+    The codes are combined into one ``int64`` per row, which sorts far
+    faster than several columns; the combined codes are re-densified
+    before the product of the label counts could overflow.
+    """
+    combined = np.zeros(merged.num_rows, dtype=np.int64)
+    cardinality = 1
+    for key, label in zip(keys, labels):
+        if cardinality > np.iinfo(np.int64).max // max(len(label), 1):
+            combined = np.unique(combined, return_inverse=True)[1].astype(np.int64)
+            cardinality = int(combined.max(initial=0)) + 1
+        combined = combined * len(label) + merged[key].to_numpy()
+        cardinality *= max(len(label), 1)
+    return np.argsort(combined)
+
+
+def _aggregate(table: pa.Table, parts: int, values: int, display: int, prefix: str) -> pa.Table:
+    """Return one row per key: its parts, summed values and the rows of its first display values."""
+    keys = [f"p{position}" for position in range(parts)]
+    grouped = table.group_by(keys, use_threads=True).aggregate(
+        [
+            *((f"v{position}", "sum", _SUM) for position in range(values)),
+            *((f"r{position}", "min") for position in range(display)),
+        ]
+    )
+    return pa.table(
+        {
+            **{key: grouped[key] for key in keys},
+            **{f"{prefix}v{position}": grouped[f"v{position}_sum"] for position in range(values)},
+            **{f"{prefix}r{position}": grouped[f"r{position}_min"] for position in range(display)},
+        }
+    )
+
+
+def align_arrow(
+    legacy: pd.DataFrame,
+    converted: pd.DataFrame,
+    pk_legacy: list[str],
+    pk_converted: list[str],
+    match_col_legacy: str,
+    match_col_converted: str,
+    display_legacy: list[str] | None = None,
+    display_converted: list[str] | None = None,
+    exact_scale: int | None = None,
+    measures: list[Measure] | None = None,
+    legacy_columns: set[str] | None = None,
+    converted_columns: set[str] | None = None,
+    trace: Trace | None = None,
+) -> Alignment:
+    """Align two dataframes with Arrow compute; the result matches ``recon_engine.align_frames``.
+
+    ``legacy_columns`` / ``converted_columns`` are as for ``align_frames``.
+    """
+    if exact_scale is not None:
+        exact_scale = validate_scale(exact_scale)
+    plan = plan_columns(
+        legacy.columns,
+        converted.columns,
+        pk_legacy,
+        pk_converted,
+        match_col_legacy,
+        match_col_converted,
+        display_legacy,
+        display_converted,
+        measures,
+    )
+    legacy_result = list(dict.fromkeys([*plan.value_legacy, *plan.display_legacy]))
+    converted_result = list(dict.fromkeys([*plan.value_converted, *plan.display_converted]))
+    joined = len(pk_legacy) != len(pk_converted) or not pk_legacy
+    parts = 1 if joined else len(pk_legacy)
+
+    sides = (
+        ("first", legacy, pk_legacy, plan.value_legacy, plan.display_legacy, "a_"),
+        ("second", converted, pk_converted, plan.value_converted, plan.display_converted, "b_"),
+    )
+    with traced(trace, "build keys", rows=len(legacy) + len(converted)):
+        encoded = [
+            _key_codes(legacy_part, converted_part, followed=position < parts - 1)
+            for position, (legacy_part, converted_part) in enumerate(
+                zip(_key_parts(legacy, pk_legacy, joined), _key_parts(converted, pk_converted, joined))
+            )
+        ]
+        codes = {"first": [code for code, _, _ in encoded], "second": [code for _, code, _ in encoded]}
+        labels = [label for _, _, label in encoded]
+    tables, aggregates = {}, {}
+    for side, frame, pk, values, display, prefix in sides:
+        with traced(trace, f"load {side} (arrow)", rows=len(frame)):
+            tables[side] = _side_table(frame, codes[side], values, display, exact_scale)
+        with traced(trace, f"aggregate {side}") as stage:
+            aggregates[side] = _aggregate(tables[side], parts, len(values), len(display), prefix)
+            stage.rows = aggregates[side].num_rows
+
+    with traced(trace, "join") as stage:
+        keys = [f"p{position}" for position in range(parts)]
+        merged = aggregates["first"].join(
+            aggregates["second"], keys, join_type="full outer", coalesce_keys=True, use_threads=True
+        )
+        merged = merged.take(_key_order(merged, keys, labels))
+        key_text = [label.take(merged[key]) for label, key in zip(labels, keys)]
+        columns = {"Comparison Key": pc.binary_join_element_wise(*key_text, _SEPARATOR)}
+
+        # Output names follow pd.merge: names both sides carry get a side suffix.
+        for (side, _, _, values, _, prefix), result, other, suffix in (
+            (sides[0], legacy_result, converted_result, "_legacy"),
+            (sides[1], converted_result, legacy_result, "_converted"),
+        ):
+            for column in result:
+                name = column + suffix if column in other else column
+                if column in values:
+                    columns[name] = merged[f"{prefix}v{values.index(column)}"]
+                else:
+                    position = result.index(column) - len(values)
+                    columns[name] = tables[side][f"d{position}"].take(merged[f"{prefix}r{position}"])
+        merged_df = pa.table(columns).to_pandas(
+            types_mapper={pa.int64(): pd.Int64Dtype()}.get if exact_scale is not None else None
+        )
+        stage.rows = len(merged_df)
+    del tables, aggregates, merged
+
+    return finish_alignment(
+        merged_df,
+        plan,
+        pk_legacy,
+        pk_converted,
+        set(legacy.columns) if legacy_columns is None else legacy_columns,
+        set(converted.columns) if converted_columns is None else converted_columns,
+        exact_scale,
+        trace,
+    )
@@ -0,0 +1,242 @@
+"""Reconcile many file pairs from a manifest in one run.
+
+A manifest is a CSV (columns ``first``, ``second``, ``profile`` and an
+optional ``name``) or a JSON list of objects with the same keys. Relative
+paths are resolved against the manifest's directory, and an empty profile
+falls back to the batch default.
+
+The batch runs in two phases on the shared ``worker_pool``. First every
+distinct file is parsed once, reading the union of the columns its pairs
+need, into the ingest cache. Then each pair is reconciled from the cache and
+its result written to the output directory. Parsed frames reach the worker
+processes through the cache's Feather directory: each task gets a copy of
+the batch's cache that starts empty and is dropped with the task, so no
+worker keeps frames once the batch is done. A file or pair that fails
+is recorded with its error and the rest of the batch carries on. This module
+must not import Streamlit or tkinter.
+"""
+
+import csv
+import json
+import os
+import tempfile
+import time
+from collections.abc import Callable
+from concurrent.futures import Future, as_completed
+from dataclasses import asdict, dataclass
+
+import pandas as pd
+
+from recon_cache import IngestCache, read_cached
+from recon_engine import BACKEND_PANDAS, compare_data, worker_pool
+from recon_export import write_result
+from recon_io import ENGINE_AUTO
+from recon_profiles import profile_columns, profile_measures
+
+SUMMARY_FILE = "batch_summary.csv"
+STATUS_OK = "ok"
+STATUS_ERROR = "error"
+
+
+@dataclass
+class BatchPair:
+    """One reconciliation listed in a manifest."""
+
+    name: str
+    first: str
+    second: str
+    profile: str
+
+
+@dataclass
+class PairOutcome:
+    """What happened to one pair, as reported in the batch summary."""
+
+    name: str
+    first: str
+    second: str
+    profile: str
+    status: str
+    total_records: int = 0
+    matched_records: int = 0
+    match_percentage: float = 0.0
+    seconds: float = 0.0
+    output: str = ""
+    error: str = ""
+
+
+def _pair_name(first: str, second: str) -> str:
+    def stem(path: str) -> str:
+        return os.path.splitext(os.path.basename(path))[0]
+
+    return f"{stem(first)}__{stem(second)}"
+
+
+def load_manifest(path: str, default_profile: str | None = None) -> list[BatchPair]:
+    """Read a CSV or JSON manifest into batch pairs with unique names."""
+    if path.lower().endswith(".json"):
+        with open(path) as f:
+            rows = json.load(f)
+    else:
+        with open(path, newline="") as f:
+            rows = list(csv.DictReader(f))
+
+    base_dir = os.path.dirname(os.path.abspath(path))
+    pairs: list[BatchPair] = []
+    seen: dict[str, int] = {}
+    for number, row in enumerate(rows, start=1):
+        first, second = (row.get("first") or "").strip(), (row.get("second") or "").strip()
+        profile = (row.get("profile") or "").strip() or default_profile
+        if not first or not second or not profile:
+            raise ValueError(f"Manifest row {number} needs 'first', 'second' and 'profile'")
+        first, second = (os.path.normpath(os.path.join(base_dir, p)) for p in (first, second))
+        name = (row.get("name") or "").strip() or _pair_name(first, second)
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}-{seen[name]}"
+        seen.setdefault(name, 1)
+        pairs.append(BatchPair(name, first, second, profile))
+    return pairs
+
+
+def _parse_file(path: str, usecols: list[str], engine: str, cache: IngestCache) -> tuple[int, float]:
+    """Parse one file into the cache and return its row count and parse time."""
+    result = read_cached(path, usecols=usecols, engine=engine, cache=cache)
+    return len(result.frame), result.seconds
+
+
+def _reconcile_pair(
+    pair: BatchPair,
+    profile: dict,
+    columns: dict[str, list[str]],
+    output: str,
+    engine: str,
+    cache: IngestCache,
+) -> PairOutcome:
+    """Reconcile one pair from the cache and write its result. Never raises."""
+    start = time.perf_counter()
+    outcome = PairOutcome(pair.name, pair.first, pair.second, pair.profile, STATUS_OK, output=output)
+    try:
+        first = read_cached(pair.first, usecols=columns[pair.first], engine=engine, cache=cache).frame
+        second = read_cached(pair.second, usecols=columns[pair.second], engine=engine, cache=cache).frame
+        tolerance_type = profile.get("tolerance_type")
+        tolerance_type = None if tolerance_type in (None, "None") else tolerance_type
+        result = compare_data(
+            first[profile_columns(profile, "first")],
+            second[profile_columns(profile, "second")],
+            profile["match_keys_first"],
+            profile["match_keys_second"],
+            profile["compare_col_first"],
+            profile["compare_col_second"],
+            tolerance_type=tolerance_type,
+            tolerance_value=profile.get("tolerance_value") if tolerance_type else None,
+            display_legacy=profile.get("display_cols_first"),
+            display_converted=profile.get("display_cols_second"),
+            exact_scale=profile.get("exact_scale"),
+            measures=profile_measures(profile),
+            backend=profile.get("backend") or BACKEND_PANDAS,
+        )
+        write_result(result.merged, output, metadata=result.metadata())
+        outcome.total_records = result.total_records
+        outcome.matched_records = result.matched_records
+        outcome.match_percentage = round(result.match_percentage, 4)
+    except Exception as exc:
+        outcome.status, outcome.output, outcome.error = STATUS_ERROR, "", f"{type(exc).__name__}: {exc}"
+    outcome.seconds = round(time.perf_counter() - start, 3)
+    return outcome
+
+
+def _failed(pair: BatchPair, error: str) -> PairOutcome:
+    return PairOutcome(pair.name, pair.first, pair.second, pair.profile, STATUS_ERROR, error=error)
+
+
+def run_batch(
+    pairs: list[BatchPair],
+    profiles: dict,
+    out_dir: str,
+    output_format: str = ".xlsx",
+    workers: int = 1,
+    engine: str = ENGINE_AUTO,
+    cache_dir: str | None = None,
+    on_result: Callable[[PairOutcome], None] | None = None,
+) -> list[PairOutcome]:
+    """Reconcile every pair and write per-pair results plus ``batch_summary.csv`` to ``out_dir``.
+
+    Outcomes are returned in manifest order; ``on_result`` is called as each
+    pair finishes. Parsed files are kept in ``cache_dir`` (a temporary
+    directory if not given), so no file is parsed twice however large the
+    batch.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    with tempfile.TemporaryDirectory(prefix="recon-batch-") as scratch:
+        cache = IngestCache(cache_dir=cache_dir or scratch)
+        outcomes = _run_pairs(pairs, profiles, out_dir, output_format, workers, engine, cache, on_result)
+
+    summary = pd.DataFrame([asdict(outcome) for outcome in outcomes], columns=list(PairOutcome.__annotations__))
+    summary.to_csv(os.path.join(out_dir, SUMMARY_FILE), index=False)
+    return outcomes
+
+
+def _run_pairs(
+    pairs: list[BatchPair],
+    profiles: dict,
+    out_dir: str,
+    output_format: str,
+    workers: int,
+    engine: str,
+    cache: IngestCache,
+    on_result: Callable[[PairOutcome], None] | None,
+) -> list[PairOutcome]:
+    def _submit(func, *args) -> Future:
+        if workers > 1:
+            return worker_pool(workers).submit(func, *args)
+        future: Future = Future()
+        try:
+            future.set_result(func(*args))
+        except Exception as exc:
+            future.set_exception(exc)
+        return future
+
+    outcomes: dict[str, PairOutcome] = {}
+
+    def _finish(outcome: PairOutcome) -> None:
+        outcomes[outcome.name] = outcome
+        if on_result:
+            on_result(outcome)
+
+    # Every file is read once with the union of the columns its pairs need.
+    columns: dict[str, list[str]] = {}
+    runnable: list[BatchPair] = []
+    for pair in pairs:
+        profile = profiles.get(pair.profile)
+        if profile is None:
+            _finish(_failed(pair, f"Profile '{pair.profile}' not found"))
+            continue
+        for path, side in ((pair.first, "first"), (pair.second, "second")):
+            columns[path] = list(dict.fromkeys([*columns.get(path, []), *profile_columns(profile, side)]))
+        runnable.append(pair)
+
+    parse_futures = {path: _submit(_parse_file, path, cols, engine, cache) for path, cols in columns.items()}
+    file_errors: dict[str, str] = {}
+    for path, future in parse_futures.items():
+        try:
+            future.result()
+        except Exception as exc:
+            file_errors[path] = f"{os.path.basename(path)}: {type(exc).__name__}: {exc}"
+
+    pair_futures: dict[Future, BatchPair] = {}
+    for pair in runnable:
+        errors = [file_errors[path] for path in (pair.first, pair.second) if path in file_errors]
+        if errors:
+            _finish(_failed(pair, "; ".join(errors)))
+            continue
+        output = os.path.join(out_dir, f"{pair.name}{output_format}")
+        args = (pair, profiles[pair.profile], columns, output, engine, cache)
+        pair_futures[_submit(_reconcile_pair, *args)] = pair
+    for future in as_completed(pair_futures):
+        try:
+            _finish(future.result())
+        except Exception as exc:  # e.g. a worker process died
+            _finish(_failed(pair_futures[future], f"{type(exc).__name__}: {exc}"))
+
+    return [outcomes[pair.name] for pair in pairs]
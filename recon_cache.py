@@ -0,0 +1,232 @@
+"""Content-addressed cache of parsed ledger extracts.
+
+Parsing a large workbook is by far the slowest part of loading it, and the
+Streamlit script re-runs on every widget change. ``IngestCache`` keys parsed
+frames by a hash of the uploaded bytes (plus the read options), keeps recently
+used frames in memory up to a size cap, and can persist them to a cache
+directory as Feather files so the same file loads instantly after a restart.
+``default_cache`` is one cache shared by every session of the process, so
+its memory cap and cache directory are process settings, read from the
+``RECON_CACHE_MEMORY_MB`` / ``RECON_CACHE_DIR`` environment variables
+(no directory: memory only), never from one session's widgets.
+This module must not import Streamlit or tkinter.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass, replace
+
+import pandas as pd
+
+from recon_io import ENGINE_AUTO, ReadResult, read_frame
+
+DEFAULT_MEMORY_LIMIT_MB = 1024
+DEFAULT_DISK_LIMIT_MB = 4096
+DEFAULT_CACHE_DIR = ".recon_cache"
+
+
+@dataclass
+class CacheStats:
+    """Counters describing ingest cache activity since start-up."""
+
+    hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    entries: int = 0
+    bytes_held: int = 0
+
+
+def content_key(data: bytes, variant: str = "") -> str:
+    """Return the cache key for ``data`` read with the options named by ``variant``."""
+    digest = hashlib.blake2b(data, digest_size=20)
+    digest.update(variant.encode())
+    return digest.hexdigest()
+
+
+def _frame_bytes(frame: pd.DataFrame) -> int:
+    return int(frame.memory_usage(index=True, deep=True).sum())
+
+
+class IngestCache:
+    """LRU cache of parsed DataFrames keyed by content hash, with optional disk persistence."""
+
+    def __init__(
+        self,
+        memory_limit_mb: int = DEFAULT_MEMORY_LIMIT_MB,
+        cache_dir: str | None = None,
+        disk_limit_mb: int = DEFAULT_DISK_LIMIT_MB,
+    ) -> None:
+        self.memory_limit_bytes = memory_limit_mb * 1024 * 1024
+        self.cache_dir = cache_dir
+        self.disk_limit_bytes = disk_limit_mb * 1024 * 1024
+        self._frames: OrderedDict[str, tuple[pd.DataFrame, int]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = CacheStats()
+
+    def __getstate__(self) -> dict:
+        """Pickle only the settings: a cache sent to another process starts empty, on the same directory."""
+        return {
+            "memory_limit_bytes": self.memory_limit_bytes,
+            "cache_dir": self.cache_dir,
+            "disk_limit_bytes": self.disk_limit_bytes,
+        }
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._frames = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = CacheStats()
+
+    @property
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return replace(self._stats)
+
+    def configure(self, memory_limit_mb: int, cache_dir: str | None) -> None:
+        """Change the memory cap and disk directory, evicting if the cap shrank."""
+        with self._lock:
+            self.memory_limit_bytes = memory_limit_mb * 1024 * 1024
+            self.cache_dir = cache_dir
+            self._evict()
+
+    def clear(self) -> None:
+        """Drop every in-memory entry. Files already on disk are kept."""
+        with self._lock:
+            self._frames.clear()
+            self._stats.entries = self._stats.bytes_held = 0
+
+    def load(self, data: bytes, loader: Callable[[], pd.DataFrame], variant: str = "") -> pd.DataFrame:
+        """Return the parsed frame for ``data``, calling ``loader`` only on a cache miss.
+
+        Callers must treat the returned frame as read-only, since it is
+        shared with every later hit.
+        """
+        key = content_key(data, variant)
+        with self._lock:
+            if key in self._frames:
+                self._frames.move_to_end(key)
+                self._stats.hits += 1
+                return self._frames[key][0]
+
+        frame = self._read_disk(key)
+        if frame is not None:
+            with self._lock:
+                self._stats.disk_hits += 1
+        else:
+            frame = loader()
+            with self._lock:
+                self._stats.misses += 1
+            self._write_disk(key, frame)
+
+        with self._lock:
+            self._store(key, frame)
+        return frame
+
+    def _store(self, key: str, frame: pd.DataFrame) -> None:
+        size = _frame_bytes(frame)
+        if key in self._frames:
+            self._stats.bytes_held -= self._frames.pop(key)[1]
+        self._frames[key] = (frame, size)
+        self._stats.bytes_held += size
+        self._evict()
+        self._stats.entries = len(self._frames)
+
+    def _evict(self) -> None:
+        # Always keep the most recent entry, even if it alone exceeds the cap.
+        while self._stats.bytes_held > self.memory_limit_bytes and len(self._frames) > 1:
+            _, (_, size) = self._frames.popitem(last=False)
+            self._stats.bytes_held -= size
+            self._stats.evictions += 1
+        self._stats.entries = len(self._frames)
+
+    def _disk_path(self, key: str) -> str | None:
+        return os.path.join(self.cache_dir, f"{key}.feather") if self.cache_dir else None
+
+    def _read_disk(self, key: str) -> pd.DataFrame | None:
+        path = self._disk_path(key)
+        if not path or not os.path.exists(path):
+            return None
+        try:
+            frame = pd.read_feather(path)
+        except Exception:
+            return None
+        os.utime(path)  # mark as recently used for disk trimming
+        return frame
+
+    def _write_disk(self, key: str, frame: pd.DataFrame) -> None:
+        """Persist a frame, skipping frames Feather cannot store (e.g. non-string headers)."""
+        path = self._disk_path(key)
+        if not path or not all(isinstance(column, str) for column in frame.columns):
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            frame.reset_index(drop=True).to_feather(path + ".tmp")
+            os.replace(path + ".tmp", path)
+        except Exception:
+            if os.path.exists(path + ".tmp"):
+                os.remove(path + ".tmp")
+            return
+        self._trim_disk()
+
+    def _trim_disk(self) -> None:
+        """Delete the least recently used cache files until the directory fits its cap."""
+        entries = [
+            entry for entry in os.scandir(self.cache_dir) if entry.is_file() and entry.name.endswith(".feather")
+        ]
+        entries.sort(key=lambda entry: entry.stat().st_mtime)
+        total = sum(entry.stat().st_size for entry in entries)
+        for entry in entries[:-1]:
+            if total <= self.disk_limit_bytes:
+                break
+            total -= entry.stat().st_size
+            os.remove(entry.path)
+
+
+_default_cache = IngestCache(
+    int(os.environ.get("RECON_CACHE_MEMORY_MB", DEFAULT_MEMORY_LIMIT_MB)),
+    os.environ.get("RECON_CACHE_DIR") or None,
+)
+
+
+def default_cache() -> IngestCache:
+    """Return the process-wide ingest cache shared by every session."""
+    return _default_cache
+
+
+def _source_bytes(source) -> bytes:
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            return f.read()
+    if hasattr(source, "getvalue"):
+        return source.getvalue()
+    source.seek(0)
+    data = source.read()
+    source.seek(0)
+    return data
+
+
+def read_cached(
+    source, usecols: list[str] | None = None, engine: str = ENGINE_AUTO, cache: IngestCache | None = None
+) -> ReadResult:
+    """Read a path or file-like source with ``read_frame``, going through the ingest cache.
+
+    The result's engine is ``"cache"`` when the frame was not parsed again.
+    The requested engine is part of the cache key, since engines disagree on
+    some cells (blank and whitespace-only ones).
+    """
+    start = time.perf_counter()
+    parsed: list[ReadResult] = []
+
+    def _parse() -> pd.DataFrame:
+        parsed.append(read_frame(source, usecols=usecols, engine=engine))
+        return parsed[0].frame
+
+    variant = f"read_frame:dtype=str:engine={engine}:usecols={json.dumps(usecols)}"
+    frame = (cache or default_cache()).load(_source_bytes(source), _parse, variant=variant)
+    return parsed[0] if parsed else ReadResult(frame, "cache", time.perf_counter() - start)
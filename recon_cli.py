@@ -0,0 +1,328 @@
+"""Command-line reconciliation without the web UI.
+
+Usage:
+    python -m recon_cli run --profile Test2 --first a.xlsx --second b.xlsx --out result.parquet
+    python -m recon_cli run --profile Test2 --first a.xlsx --second b.xlsx --delta --changes-out changes.csv
+    python -m recon_cli batch --manifest pairs.csv --out-dir results --workers 4
+    python -m recon_cli profiles
+
+``run`` reads only the columns the saved profile uses, reconciles them with
+``compare_data`` (or the bounded-memory streaming engine with
+``--low-memory``) and prints the summary with the wall time, CPU time,
+peak memory and rows of each stage (see ``recon_trace``), which
+``--trace-out`` also writes as JSON. The result
+is written as Excel, Parquet, Arrow IPC or (gzip) CSV depending on the
+``--out`` extension, with the summary embedded as file metadata.
+``--memory-report`` prints the memory held after each stage of the
+comparison next to the same stages without compact dtypes, and
+``--merge-budget-mb`` refuses a comparison whose merged result is
+estimated (from the key counts, before merging) to exceed that size.
+``--backend sql`` (or the profile's ``backend``) aligns in an embedded
+database that spills to disk (see ``recon_sql``), ``--backend arrow`` with
+multithreaded Arrow compute (see ``recon_arrow``). With
+``--delta`` the run is reconciled against the profile's previous run (see
+``recon_delta``): an unchanged file is not parsed, only changed keys are
+re-aligned, and the added / removed / changed keys are reported and can be
+written with ``--changes-out``.
+``batch`` reconciles every pair in a manifest (see ``recon_batch``) and
+prints the consolidated summary.
+
+pandas and the engine modules are imported inside ``run`` so that ``--help``
+and ``profiles`` start instantly. This module must not import Streamlit or
+tkinter.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from recon_profiles import PROFILES_FILE, load_profiles, profile_columns, profile_measures
+from recon_trace import Trace
+
+OUTPUT_FORMATS = (".xlsx", ".parquet", ".arrow", ".feather", ".csv", ".csv.gz")
+EXIT_DIFFERENCES = 3
+
+
+def _tolerance(profile: dict) -> tuple[str | None, float | None]:
+    """Return the profile's tolerance as ``compare_data`` arguments."""
+    tolerance_type = profile.get("tolerance_type")
+    if tolerance_type in (None, "None"):
+        return None, None
+    return tolerance_type, profile.get("tolerance_value")
+
+
+def _run(args: argparse.Namespace, parser: argparse.ArgumentParser, started: float) -> int:
+    profiles = load_profiles(args.profiles_file)
+    if args.profile not in profiles:
+        parser.error(f"profile '{args.profile}' not found in {args.profiles_file}")
+    for option, path in (("--out", args.out), ("--changes-out", args.changes_out)):
+        if path and not path.lower().endswith(OUTPUT_FORMATS):
+            parser.error(f"{option} must end in one of {', '.join(OUTPUT_FORMATS)}")
+    if args.delta and args.low_memory:
+        parser.error("--delta cannot be combined with --low-memory")
+    if args.memory_report and (args.delta or args.low_memory):
+        parser.error("--memory-report needs the in-memory engine (no --delta or --low-memory)")
+    profile = profiles[args.profile]
+    backend = args.backend or profile.get("backend") or "pandas"
+    if backend != "pandas" and (args.delta or args.low_memory or args.memory_report):
+        parser.error(f"the {backend} backend cannot be combined with --delta, --low-memory or --memory-report")
+    if profile.get("measures") and (args.delta or args.low_memory):
+        parser.error(f"profile '{args.profile}' compares several measures, which needs the in-memory engine")
+    tolerance_type, tolerance_value = _tolerance(profile)
+
+    trace = Trace()
+    with trace.stage("import"):
+        from recon_engine import align_frames, compare_data
+        from recon_export import write_result
+        from recon_io import read_frame
+        from recon_memory import MemoryReport
+
+    report = None
+    report_text = ""
+    if args.delta:
+        from recon_cache import content_key
+        from recon_delta import DEFAULT_SNAPSHOT_DIR, reconcile_delta
+
+        def _fingerprint(path: str, side: str) -> str:
+            with open(path, "rb") as f:
+                return content_key(f.read(), f"{args.engine}|{','.join(profile_columns(profile, side))}")
+
+        def _loader(path: str, side: str):
+            def _load():
+                with trace.stage(f"read {side}") as stage:
+                    read = read_frame(path, usecols=profile_columns(profile, side), engine=args.engine)
+                    stage.stage, stage.rows = f"read {side} ({read.engine})", len(read.frame)
+                return read.frame
+
+            return _load
+
+        with trace.stage("read + compare (delta)") as stage:
+            delta = reconcile_delta(
+                args.profile,
+                profile,
+                _loader(args.first, "first"),
+                _loader(args.second, "second"),
+                first_fingerprint=_fingerprint(args.first, "first"),
+                second_fingerprint=_fingerprint(args.second, "second"),
+                snapshot_dir=args.snapshot_dir or DEFAULT_SNAPSHOT_DIR,
+            )
+            stage.rows = delta.result.total_records
+        result, report = delta.result, delta.report
+    elif args.low_memory:
+        from recon_streaming import compare_streaming
+
+        with trace.stage("read + compare (streaming)") as stage:
+            result = compare_streaming(
+                args.first,
+                args.second,
+                profile["match_keys_first"],
+                profile["match_keys_second"],
+                profile["compare_col_first"],
+                profile["compare_col_second"],
+                tolerance_type=tolerance_type,
+                tolerance_value=tolerance_value,
+                memory_budget_mb=args.memory_budget_mb,
+                exact_scale=profile.get("exact_scale"),
+            )
+            stage.rows = result.total_records
+    else:
+        reads = {}
+        for side, path in (("first", args.first), ("second", args.second)):
+            with trace.stage(f"read {side}") as stage:
+                reads[side] = read_frame(path, usecols=profile_columns(profile, side), engine=args.engine)
+                stage.stage, stage.rows = f"read {side} ({reads[side].engine})", len(reads[side].frame)
+        first, second = reads["first"], reads["second"]
+
+        memory = MemoryReport() if args.memory_report else None
+        with trace.stage("compare") as stage:
+            result = compare_data(
+                first.frame,
+                second.frame,
+                profile["match_keys_first"],
+                profile["match_keys_second"],
+                profile["compare_col_first"],
+                profile["compare_col_second"],
+                tolerance_type=tolerance_type,
+                tolerance_value=tolerance_value,
+                distinct_list=True,
+                workers=args.workers,
+                display_legacy=profile.get("display_cols_first"),
+                display_converted=profile.get("display_cols_second"),
+                memory_report=memory,
+                exact_scale=profile.get("exact_scale"),
+                measures=profile_measures(profile),
+                merge_budget_mb=args.merge_budget_mb,
+                trace=trace,
+                backend=backend,
+            )
+            stage.rows = result.total_records
+        if memory is not None:
+            # Align once more with the dtypes as read, for the "before" column of the report.
+            baseline = MemoryReport()
+            align_frames(
+                first.frame,
+                second.frame,
+                profile["match_keys_first"],
+                profile["match_keys_second"],
+                profile["compare_col_first"],
+                profile["compare_col_second"],
+                display_legacy=profile.get("display_cols_first"),
+                display_converted=profile.get("display_cols_second"),
+                compact=False,
+                memory_report=baseline,
+                exact_scale=profile.get("exact_scale"),
+                measures=profile_measures(profile),
+            )
+            report_text = f"\nMemory by stage:\n{memory.text(baseline)}"
+
+    if args.out:
+        with trace.stage(f"write {args.out}", rows=len(result.merged)):
+            write_result(result.merged, args.out, metadata=result.metadata())
+    if report is not None and report.changes is not None and args.changes_out:
+        with trace.stage(f"write {args.changes_out}", rows=len(report.changes)):
+            write_result(report.changes, args.changes_out)
+    if args.trace_out:
+        with open(args.trace_out, "w", encoding="utf-8") as f:
+            f.write(trace.to_json())
+
+    print(result.summary_text)
+    if report is not None:
+        print(f"\n{report.summary_text()}")
+    if report_text:
+        print(report_text)
+    if not args.quiet:
+        print(f"\nStages:\n{trace.text()}")
+        print(f"\nTotal: {time.perf_counter() - started:.2f}s")
+
+    if args.fail_on_differences and result.matched_records < result.total_records:
+        return EXIT_DIFFERENCES
+    return 0
+
+
+def _batch(args: argparse.Namespace, started: float) -> int:
+    from recon_batch import STATUS_OK, SUMMARY_FILE, load_manifest, run_batch
+
+    pairs = load_manifest(args.manifest, default_profile=args.profile)
+    done = 0
+
+    def _progress(outcome) -> None:
+        nonlocal done
+        done += 1
+        if not args.quiet:
+            detail = f"{outcome.match_percentage:.2f}% matched" if outcome.status == STATUS_OK else outcome.error
+            print(f"[{done}/{len(pairs)}] {outcome.name}: {outcome.status} in {outcome.seconds:.2f}s, {detail}")
+
+    outcomes = run_batch(
+        pairs,
+        load_profiles(args.profiles_file),
+        args.out_dir,
+        output_format=f".{args.format}",
+        workers=args.workers,
+        engine=args.engine,
+        cache_dir=args.cache_dir,
+        on_result=_progress,
+    )
+
+    failed = [outcome for outcome in outcomes if outcome.status != STATUS_OK]
+    total = sum(outcome.total_records for outcome in outcomes)
+    matched = sum(outcome.matched_records for outcome in outcomes)
+    print(f"Pairs: {len(outcomes) - len(failed)} reconciled, {len(failed)} failed")
+    print(f"Total records: {total}")
+    print(f"Matched records: {matched}")
+    print(f"Match percentage: {matched / total * 100 if total else 0:.2f}%")
+    print(f"Summary: {os.path.join(args.out_dir, SUMMARY_FILE)}")
+    print(f"Wall time: {time.perf_counter() - started:.2f}s")
+
+    if failed:
+        return 1
+    if args.fail_on_differences and matched < total:
+        return EXIT_DIFFERENCES
+    return 0
+
+
+def _list_profiles(args: argparse.Namespace) -> int:
+    for name, profile in load_profiles(args.profiles_file).items():
+        keys = ", ".join(profile.get("match_keys_first", []))
+        pairs = [(profile.get("compare_col_first"), profile.get("compare_col_second"))]
+        pairs += [(measure.get("first"), measure.get("second")) for measure in profile.get("measures") or []]
+        compare = ", ".join(f"{first} / {second}" for first, second in pairs)
+        print(f"{name}: keys [{keys}], compare {compare}")
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    started = time.perf_counter()
+    parser = argparse.ArgumentParser(
+        prog="python -m recon_cli", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--profiles-file", default=PROFILES_FILE, help="Profile store (default: %(default)s)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Reconcile two files with a saved profile")
+    run.add_argument("--profile", required=True, help="Name of a saved profile")
+    run.add_argument("--first", required=True, help="First file (.xlsx, .xls or .csv)")
+    run.add_argument("--second", required=True, help="Second file (.xlsx, .xls or .csv)")
+    run.add_argument("--out", help=f"Write the result here ({', '.join(OUTPUT_FORMATS)})")
+    run.add_argument("--workers", type=int, default=1, help="Parallel worker processes (default: 1)")
+    run.add_argument("--engine", choices=["auto", "calamine", "openpyxl"], default="auto", help="Workbook reader")
+    run.add_argument("--low-memory", action="store_true", help="Stream both files within a memory budget")
+    run.add_argument("--memory-budget-mb", type=int, default=512, help="Budget for --low-memory (default: 512)")
+    run.add_argument("--delta", action="store_true", help="Reconcile only what changed since the profile's last run")
+    run.add_argument("--snapshot-dir", help="Where --delta keeps snapshots (default: .recon_snapshots)")
+    run.add_argument("--changes-out", help="With --delta, write the changed keys here")
+    run.add_argument(
+        "--fail-on-differences",
+        action="store_true",
+        help=f"Exit with status {EXIT_DIFFERENCES} when any record differs",
+    )
+    run.add_argument(
+        "--memory-report", action="store_true", help="Print memory per stage, with and without compact dtypes"
+    )
+    run.add_argument(
+        "--merge-budget-mb",
+        type=float,
+        help="Refuse to compare when the merged result is estimated to need more memory than this",
+    )
+    run.add_argument(
+        "--backend",
+        choices=["pandas", "arrow", "sql", "duckdb", "sqlite"],
+        help="Comparison engine; arrow is multithreaded, sql spills to disk (DuckDB if installed, else SQLite). "
+        "Default: the profile's",
+    )
+    run.add_argument("--trace-out", help="Write the per-stage timings and memory as JSON here")
+    run.add_argument("--quiet", action="store_true", help="Print only the summary, without timings")
+
+    batch = commands.add_parser("batch", help="Reconcile every pair listed in a manifest")
+    batch.add_argument("--manifest", required=True, help="CSV or JSON with first, second, profile[, name]")
+    batch.add_argument("--out-dir", required=True, help="Directory for per-pair results and batch_summary.csv")
+    batch.add_argument("--profile", help="Profile for manifest rows that do not name one")
+    batch.add_argument(
+        "--format", choices=["xlsx", "parquet", "arrow", "csv", "csv.gz"], default="xlsx", help="Per-pair result format"
+    )
+    batch.add_argument("--workers", type=int, default=1, help="Pairs reconciled in parallel (default: 1)")
+    batch.add_argument("--engine", choices=["auto", "calamine", "openpyxl"], default="auto", help="Workbook reader")
+    batch.add_argument("--cache-dir", help="Keep parsed files here between runs (default: a temporary directory)")
+    batch.add_argument(
+        "--fail-on-differences",
+        action="store_true",
+        help=f"Exit with status {EXIT_DIFFERENCES} when any record differs",
+    )
+    batch.add_argument("--quiet", action="store_true", help="Do not print a line per finished pair")
+
+    commands.add_parser("profiles", help="List saved profiles")
+
+    args = parser.parse_args(argv)
+    if args.command == "profiles":
+        return _list_profiles(args)
+    try:
+        if args.command == "batch":
+            return _batch(args, started)
+        return _run(args, parser, started)
+    except (OSError, KeyError, ValueError) as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
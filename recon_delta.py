@@ -0,0 +1,431 @@
+"""Delta reconciliation of successive extracts of the same ledger.
+
+After each run a profile's snapshot keeps both sides' per-key aggregates
+(key parts, summed compare column and display columns, with hashes per
+key) and the result, as Feather files under ``.recon_snapshots``. The next
+run with the same profile aggregates the new files, finds the keys whose
+aggregates changed by comparing hashes, aligns only those keys and patches
+them into the previous result, which is kept sorted by key text. A side
+whose file fingerprint is unchanged is not even parsed. The run also
+reports which keys were added, removed or changed and which flipped
+between matched and unmatched.
+
+Delta results are ordered by comparison key text, like the streaming
+engine's. This module must not import Streamlit or tkinter.
+"""
+
+import hashlib
+import json
+import os
+import re
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from recon_amounts import scaled_amounts
+from recon_engine import (
+    VALUE_COLUMNS_ATTR,
+    ComparisonResult,
+    align_frames,
+    alignment_of,
+    evaluate_alignment,
+    factorize_comparison_keys,
+)
+
+DEFAULT_SNAPSHOT_DIR = ".recon_snapshots"
+KEY_COLUMN = "__comparison_key__"  # key text column of a snapshot's side aggregates
+KEY_HASH_COLUMN = "__key_hash__"  # hash of the key alone
+HASH_COLUMN = "__hash__"  # hash of the key and its aggregated values
+_MISSING_HASH = np.uint64(0x9E3779B97F4A7C15)
+_HASH_MULTIPLIER = np.uint64(0x100000001B3)
+_SNAPSHOT_META = "snapshot.json"
+_SIDES = ("first", "second")
+_STATUS_LABELS = {-1: "Absent", 0: "Matched", 1: "Unmatched"}
+
+
+def _side_config(profile: dict, side: str) -> tuple[list[str], str, list[str]]:
+    """Return a profile's match keys, compare column and display columns for one side."""
+    pk = list(profile[f"match_keys_{side}"])
+    value_col = profile[f"compare_col_{side}"]
+    reserved = {*profile["match_keys_first"], *profile["match_keys_second"]}
+    reserved |= {profile["compare_col_first"], profile["compare_col_second"]}
+    display = [col for col in dict.fromkeys(profile.get(f"display_cols_{side}") or []) if col not in reserved]
+    return pk, value_col, display
+
+
+def _combine(hashes: np.ndarray, values: np.ndarray) -> np.ndarray:
+    return (hashes * _HASH_MULTIPLIER) ^ values  # uint64 arithmetic wraps around
+
+
+def _label_hashes(column) -> np.ndarray:
+    """Hash a column through its distinct values, with one hash for missing values."""
+    codes, uniques = pd.factorize(column)
+    return np.append(pd.util.hash_array(np.asarray(uniques, dtype=object)), _MISSING_HASH)[codes]
+
+
+def side_aggregates(
+    frame: pd.DataFrame, pk: list[str], value_col: str, display_cols: list[str], exact_scale: int | None = None
+) -> pd.DataFrame:
+    """Reduce one side to a row per comparison key.
+
+    Keys are normalized and values summed exactly as ``compare_frames``
+    does with ``distinct_list`` (in integer units with ``exact_scale``, then
+    stored in currency units), and display columns keep their first
+    non-null value. ``KEY_COLUMN`` holds the key text, ``KEY_HASH_COLUMN``
+    a hash of the key and ``HASH_COLUMN`` a hash of the whole row, which
+    changes whenever the key's aggregate does. Key hashes are built from
+    the ``"a | b"`` key text, so a key hashes alike on both sides even when
+    they have a different number of key columns.
+    """
+    missing = [col for col in [*pk, value_col, *display_cols] if col not in frame.columns]
+    if missing:
+        raise ValueError(f"Columns not found: {', '.join(missing)}")
+    keys = factorize_comparison_keys(frame[pk], frame[pk].iloc[:0])
+    if exact_scale is None:
+        values = {value_col: pd.to_numeric(frame[value_col], errors="coerce")}
+    else:
+        values = {value_col: scaled_amounts(frame[value_col], exact_scale)}
+    values.update({col: frame[col] for col in display_cols})
+    grouped = pd.DataFrame(values).groupby(keys.legacy_codes, dropna=False)
+    aggregated = grouped.agg({value_col: "sum", **dict.fromkeys(display_cols, "first")})
+
+    codes = aggregated.index.to_numpy()
+    positions = np.searchsorted(keys.unique_codes, codes)
+    columns = {KEY_COLUMN: keys.text(codes)}
+    for col, labels, part in zip(pk, keys.part_labels, keys.part_codes):
+        columns[col] = labels[part[positions]]
+    key_hash = pd.util.hash_array(np.asarray(columns[KEY_COLUMN], dtype=object))
+    columns[value_col] = aggregated[value_col].to_numpy(dtype="float64") / 10 ** (exact_scale or 0)
+    row_hash = _combine(key_hash, pd.util.hash_array(columns[value_col]))
+    for col in display_cols:
+        column = aggregated[col].astype(object)
+        columns[col] = column.where(column.notna(), None).to_numpy()
+        row_hash = _combine(row_hash, _label_hashes(columns[col]))
+    columns[KEY_HASH_COLUMN] = key_hash
+    columns[HASH_COLUMN] = row_hash
+    return pd.DataFrame(columns)
+
+
+def snapshot_path(snapshot_dir: str, profile_name: str) -> str:
+    """Return the directory holding a profile's snapshot."""
+    slug = re.sub(r"[^\w.-]+", "_", profile_name).strip("._") or "profile"
+    digest = hashlib.blake2b(profile_name.encode(), digest_size=4).hexdigest()
+    return os.path.join(snapshot_dir, f"{slug}-{digest}")
+
+
+def _signature(profile: dict) -> dict:
+    """The profile settings a snapshot depends on (everything but the tolerance)."""
+    signature = {
+        side: dict(zip(("match_keys", "compare_col", "display_cols"), _side_config(profile, side))) for side in _SIDES
+    }
+    signature["exact_scale"] = profile.get("exact_scale")
+    return signature
+
+
+@dataclass
+class Snapshot:
+    """A profile's previous run: both sides' aggregates and its result."""
+
+    meta: dict
+    aggregates: dict[str, pd.DataFrame]
+    result: pd.DataFrame
+
+
+def load_snapshot(snapshot_dir: str, profile_name: str) -> Snapshot | None:
+    """Return a profile's snapshot, or ``None`` if there is none or it is incomplete."""
+    directory = snapshot_path(snapshot_dir, profile_name)
+    try:
+        with open(os.path.join(directory, _SNAPSHOT_META)) as f:
+            meta = json.load(f)
+        aggregates = {side: pd.read_feather(os.path.join(directory, f"{side}.feather")) for side in _SIDES}
+        result = pd.read_feather(os.path.join(directory, "result.feather"))
+    except (OSError, ValueError):
+        return None
+    result.attrs[VALUE_COLUMNS_ATTR] = tuple(meta["value_columns"])
+    return Snapshot(meta, aggregates, result)
+
+
+def save_snapshot(snapshot_dir: str, profile_name: str, snapshot: Snapshot) -> None:
+    """Write a profile's snapshot, replacing any previous one.
+
+    The metadata file is written last, so an interrupted save leaves a
+    snapshot that ``load_snapshot`` ignores or the previous one intact.
+    """
+    directory = snapshot_path(snapshot_dir, profile_name)
+    os.makedirs(directory, exist_ok=True)
+    meta_path = os.path.join(directory, _SNAPSHOT_META)
+    if os.path.exists(meta_path):
+        os.remove(meta_path)
+    frames = {**{f"{side}.feather": snapshot.aggregates[side] for side in _SIDES}, "result.feather": snapshot.result}
+    for name, frame in frames.items():
+        path = os.path.join(directory, name)
+        frame.reset_index(drop=True).to_feather(path + ".tmp")
+        os.replace(path + ".tmp", path)
+    with open(meta_path + ".tmp", "w") as f:
+        json.dump(snapshot.meta, f, indent=2)
+    os.replace(meta_path + ".tmp", meta_path)
+
+
+@dataclass
+class DeltaReport:
+    """What changed since a profile's previous run.
+
+    ``changes`` has a row per key that was added, removed or changed on
+    either side, plus unchanged keys whose status flipped because the
+    tolerance changed.
+    """
+
+    profile: str
+    previous_run: str | None
+    keys_added: int = 0
+    keys_removed: int = 0
+    keys_changed: int = 0
+    newly_matched: int = 0
+    newly_unmatched: int = 0
+    reused_sides: tuple[str, ...] = ()
+    changes: pd.DataFrame | None = None
+
+    @property
+    def baseline(self) -> bool:
+        """Whether there was no usable previous run, so everything was reconciled."""
+        return self.previous_run is None
+
+    def summary_text(self) -> str:
+        if self.baseline:
+            return f"No previous run of profile '{self.profile}' to compare with; this run is the new baseline."
+        lines = [
+            f"Changes since the run of {self.previous_run}:",
+            f"Keys added: {self.keys_added}",
+            f"Keys removed: {self.keys_removed}",
+            f"Keys changed: {self.keys_changed}",
+            f"Newly matched: {self.newly_matched}",
+            f"Newly unmatched: {self.newly_unmatched}",
+        ]
+        if self.reused_sides:
+            lines.append(f"Unchanged files not re-read: {', '.join(self.reused_sides)}")
+        return "\n".join(lines)
+
+
+@dataclass
+class DeltaResult:
+    """A delta reconciliation: the full, patched result and the change report."""
+
+    result: ComparisonResult
+    report: DeltaReport
+
+
+def _align_aggregates(
+    aggregates: dict[str, pd.DataFrame], profile: dict, columns: dict[str, list[str]]
+) -> pd.DataFrame:
+    """Align side aggregates into result rows (without difference columns), sorted by key text."""
+    (pk_first, value_first, display_first), (pk_second, value_second, display_second) = (
+        _side_config(profile, side) for side in _SIDES
+    )
+    alignment = align_frames(
+        aggregates["first"][list(dict.fromkeys([*pk_first, value_first, *display_first]))],
+        aggregates["second"][list(dict.fromkeys([*pk_second, value_second, *display_second]))],
+        pk_first,
+        pk_second,
+        value_first,
+        value_second,
+        distinct_list=True,
+        legacy_columns=set(columns["first"]),
+        converted_columns=set(columns["second"]),
+        display_legacy=display_first,
+        display_converted=display_second,
+        exact_scale=profile.get("exact_scale"),
+    )
+    merged = alignment.merged
+    if not all(column in merged.columns for column in merged.attrs[VALUE_COLUMNS_ATTR]):
+        raise ValueError("Delta reconciliation needs compare columns that are not also match keys")
+    order = merged["Comparison Key"].astype("str").argsort(kind="stable").to_numpy()
+    sorted_merged = merged.iloc[order].reset_index(drop=True)
+    sorted_merged.attrs = dict(merged.attrs)
+    return sorted_merged
+
+
+def _changed_key_hashes(previous: pd.DataFrame, current: pd.DataFrame) -> np.ndarray:
+    """Return the key hashes whose aggregate row differs between two side aggregates."""
+    gone = ~pd.Series(previous[HASH_COLUMN].to_numpy()).isin(current[HASH_COLUMN].to_numpy()).to_numpy()
+    new = ~pd.Series(current[HASH_COLUMN].to_numpy()).isin(previous[HASH_COLUMN].to_numpy()).to_numpy()
+    return np.concatenate([previous[KEY_HASH_COLUMN].to_numpy()[gone], current[KEY_HASH_COLUMN].to_numpy()[new]])
+
+
+def _status(difference: np.ndarray) -> np.ndarray:
+    return np.where(difference, 1, 0).astype(np.int8)
+
+
+def reconcile_delta(
+    profile_name: str,
+    profile: dict,
+    load_first: Callable[[], pd.DataFrame],
+    load_second: Callable[[], pd.DataFrame],
+    first_fingerprint: str | None = None,
+    second_fingerprint: str | None = None,
+    snapshot_dir: str = DEFAULT_SNAPSHOT_DIR,
+) -> DeltaResult:
+    """Reconcile a profile's files against its previous run and save the new snapshot.
+
+    ``load_first`` / ``load_second`` return the parsed files and are only
+    called for a side whose fingerprint (e.g. ``recon_cache.content_key``
+    of the file bytes) differs from the snapshot's. Without a usable
+    snapshot, for instance after the profile's keys or columns changed,
+    every key is reconciled and the run becomes the new baseline. The
+    result equals ``compare_data`` on the same files, ordered by key text.
+    Profiles with additional ``measures`` are not supported.
+    """
+    if profile.get("measures"):
+        raise ValueError(f"Profile '{profile_name}' compares several measures; delta runs support one")
+    tolerance_type = profile.get("tolerance_type")
+    tolerance_type = None if tolerance_type in (None, "None") else tolerance_type
+    tolerance_value = profile.get("tolerance_value") if tolerance_type else None
+    signature = _signature(profile)
+
+    snapshot = load_snapshot(snapshot_dir, profile_name)
+    if snapshot is not None and snapshot.meta.get("signature") != signature:
+        snapshot = None
+
+    loaders = {"first": load_first, "second": load_second}
+    fingerprints = {"first": first_fingerprint, "second": second_fingerprint}
+    aggregates: dict[str, pd.DataFrame] = {}
+    columns: dict[str, list[str]] = {}
+    reused: list[str] = []
+    for side in _SIDES:
+        if snapshot is not None and fingerprints[side] and snapshot.meta["fingerprints"][side] == fingerprints[side]:
+            aggregates[side] = snapshot.aggregates[side]
+            columns[side] = snapshot.meta["columns"][side]
+            reused.append(side)
+            continue
+        frame = loaders[side]()
+        aggregates[side] = side_aggregates(frame, *_side_config(profile, side), profile.get("exact_scale"))
+        columns[side] = [str(column) for column in frame.columns]
+    if snapshot is not None and snapshot.meta["columns"] != columns:
+        snapshot = None  # result columns are named from the file headers, so patching could misalign them
+
+    report = DeltaReport(profile_name, None if snapshot is None else snapshot.meta["generated_at"])
+    report.reused_sides = tuple(reused)
+    if snapshot is None:
+        merged = _align_aggregates(aggregates, profile, columns)
+    else:
+        merged, previous_position, realigned = _patch(snapshot, aggregates, profile, columns)
+
+    result = evaluate_alignment(alignment_of(merged), tolerance_type, tolerance_value)
+    if snapshot is not None:
+        _report_changes(snapshot, result, previous_position, realigned, report)
+
+    meta = {
+        "profile": profile_name,
+        "signature": signature,
+        "fingerprints": fingerprints,
+        "columns": columns,
+        "value_columns": list(merged.attrs[VALUE_COLUMNS_ATTR]),
+        "generated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+    save_snapshot(snapshot_dir, profile_name, Snapshot(meta, aggregates, result.merged))
+    return DeltaResult(result, report)
+
+
+def _patch(
+    snapshot: Snapshot,
+    aggregates: dict[str, pd.DataFrame],
+    profile: dict,
+    columns: dict[str, list[str]],
+) -> tuple[pd.DataFrame, np.ndarray, np.ndarray]:
+    """Replace the previous result's rows for changed keys with freshly aligned ones.
+
+    Returns the patched rows, each row's position in the previous result
+    (-1 for a new key) and whether it was aligned again.
+    """
+    changed = pd.unique(
+        np.concatenate([_changed_key_hashes(snapshot.aggregates[side], aggregates[side]) for side in _SIDES])
+    )
+    subset = {side: frame[frame[KEY_HASH_COLUMN].isin(changed)] for side, frame in aggregates.items()}
+    previous_subset = [frame[frame[KEY_HASH_COLUMN].isin(changed)] for frame in snapshot.aggregates.values()]
+    changed_keys = np.unique(np.concatenate([frame[KEY_COLUMN].to_numpy(dtype=object) for frame in previous_subset]))
+
+    # The previous result is sorted by key text, so changed keys are found by binary search.
+    previous_keys = snapshot.result["Comparison Key"].to_numpy(dtype=object)
+    dropped = _positions(previous_keys, changed_keys)
+    keep = np.ones(len(previous_keys), dtype=bool)
+    keep[dropped] = False
+    kept_positions = np.flatnonzero(keep)
+    kept = snapshot.result.iloc[kept_positions].drop(
+        columns=["Difference", "Dollar Difference", "Percentage Difference"]
+    )
+
+    fresh = _align_aggregates(subset, profile, columns)
+    fresh_keys = fresh["Comparison Key"].to_numpy(dtype=object)
+    fresh_previous = _positions(previous_keys, fresh_keys, missing=-1)
+
+    # Both parts are sorted by key text and share no keys, so interleave them by rank.
+    ranks = np.concatenate([2 * np.arange(len(kept)) + 1, 2 * np.searchsorted(previous_keys[keep], fresh_keys)])
+    order = np.argsort(ranks, kind="stable")
+    merged = pd.concat([kept, fresh], ignore_index=True).iloc[order].reset_index(drop=True)
+    merged.attrs = dict(fresh.attrs)
+    previous_position = np.concatenate([kept_positions, fresh_previous])[order]
+    realigned = np.concatenate([np.zeros(len(kept), dtype=bool), np.ones(len(fresh), dtype=bool)])[order]
+    return merged, previous_position, realigned
+
+
+def _positions(sorted_keys: np.ndarray, keys: np.ndarray, missing: int | None = None) -> np.ndarray:
+    """Return where ``keys`` occur in ``sorted_keys``: dropping absent ones, or as ``missing``."""
+    positions = np.searchsorted(sorted_keys, keys)
+    found = positions < len(sorted_keys)
+    found[found] = sorted_keys[positions[found]] == keys[found]
+    if missing is None:
+        return positions[found]
+    return np.where(found, positions, missing)
+
+
+def _report_changes(
+    snapshot: Snapshot,
+    result: ComparisonResult,
+    previous_position: np.ndarray,
+    realigned: np.ndarray,
+    report: DeltaReport,
+) -> None:
+    """Fill the report by comparing each key's status with the previous run's."""
+    previous = snapshot.result
+    previous_difference = previous["Difference"].to_numpy(dtype=bool)
+    previous_dollars = previous["Dollar Difference"].to_numpy(dtype=float)
+    found = previous_position >= 0
+    previous_status = np.full(len(previous_position), -1, dtype=np.int8)
+    previous_status[found] = _status(previous_difference[previous_position[found]])
+    current_status = _status(result.merged["Difference"].to_numpy(dtype=bool))
+    removed = np.ones(len(previous), dtype=bool)
+    removed[previous_position[found]] = False
+
+    report.keys_added = int((~found).sum())
+    report.keys_removed = int(removed.sum())
+    report.keys_changed = int((realigned & found).sum())
+    report.newly_matched = int(((previous_status == 1) & (current_status == 0)).sum())
+    report.newly_unmatched = int(((previous_status == 0) & (current_status == 1)).sum())
+
+    # Unchanged keys are only listed when a tolerance change flipped their status.
+    listed = realigned | (previous_status != current_status)
+    change = np.where(~found, "added", np.where(realigned, "changed", "tolerance"))[listed]
+    listed_previous = np.where(found, previous_position, 0)[listed]
+    report.changes = pd.DataFrame(
+        {
+            "Comparison Key": np.concatenate(
+                [
+                    result.merged["Comparison Key"].to_numpy(dtype=object)[listed],
+                    previous["Comparison Key"].to_numpy(dtype=object)[removed],
+                ]
+            ),
+            "Change": np.concatenate([change, np.full(report.keys_removed, "removed")]),
+            "Previous Status": np.concatenate([previous_status[listed], _status(previous_difference[removed])]),
+            "Current Status": np.concatenate([current_status[listed], np.full(report.keys_removed, -1, np.int8)]),
+            "Previous Dollar Difference": np.concatenate(
+                [np.where(found[listed], previous_dollars[listed_previous], np.nan), previous_dollars[removed]]
+            ),
+            "Dollar Difference": np.concatenate(
+                [result.merged["Dollar Difference"].to_numpy(dtype=float)[listed], np.full(report.keys_removed, np.nan)]
+            ),
+        }
+    )
+    for column in ("Previous Status", "Current Status"):
+        report.changes[column] = report.changes[column].map(_STATUS_LABELS)
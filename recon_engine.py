@@ -0,0 +1,1103 @@
+"""Columnar reconciliation engine shared by the UI and offline tooling.
+
+Everything here operates on whole NumPy arrays / pandas columns so that the
+cost of a comparison scales with the number of columns rather than the number
+of rows. This module must not import Streamlit or tkinter.
+"""
+
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import astuple, dataclass, field
+from datetime import datetime, timezone
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+
+from recon_amounts import scaled_amounts, units_threshold, validate_scale
+from recon_export import resolve_format, write_result
+from recon_index import ResultIndex, build_result_index
+from recon_memory import MemoryReport, compact_frame, row_bytes
+from recon_preflight import MergeEstimate, check_merge_budget, estimate_merge
+from recon_trace import Trace, traced
+
+TOLERANCE_DOLLAR = "Dollar ($)"
+TOLERANCE_PERCENTAGE = "Percentage (%)"
+KEY_SEPARATOR = " | "
+RESULT_COLUMNS = {"Comparison Key", "Difference", "Dollar Difference", "Percentage Difference"}
+DIFFERENCE_ROW_BYTES = 17  # the bool and two float64 difference columns
+VALUE_COLUMNS_ATTR = "value_columns"  # result ``attrs`` entry naming the (first, second) compared columns
+EXACT_SCALE_ATTR = "exact_scale"  # result ``attrs`` entry holding the decimal places of exact amounts
+MEASURES_ATTR = "measures"  # result ``attrs`` entry describing each compared pair, see ``measure_columns``
+BACKEND_PANDAS = "pandas"
+BACKEND_SQL = "sql"  # DuckDB when installed, SQLite otherwise; see ``recon_sql``
+BACKEND_ARROW = "arrow"  # multithreaded PyArrow compute; see ``recon_arrow``
+BACKENDS = (BACKEND_PANDAS, BACKEND_ARROW, BACKEND_SQL, "duckdb", "sqlite")
+
+
+@dataclass(frozen=True)
+class Measure:
+    """A pair of columns compared per key, with the tolerance that applies to it."""
+
+    first: str
+    second: str
+    tolerance_type: str | None = None
+    tolerance_value: float | None = None
+
+    @property
+    def label(self) -> str:
+        """The name the measure's result columns start with."""
+        return self.first if self.first == self.second else f"{self.first}/{self.second}"
+
+
+@dataclass
+class Alignment:
+    """The tolerance-independent part of a comparison, from ``align_frames``.
+
+    ``merged`` is the result frame without the difference columns, and
+    ``legacy_values`` / ``converted_values`` are the compared values row by
+    row, as ``Int64`` units of ``10 ** -scale`` when ``scale`` is set (exact
+    amounts). ``measure_values`` holds the same for each additional
+    measure. ``key_index`` holds the tolerance-independent parts of the
+    first result index built from it, so re-evaluated results reuse them.
+    """
+
+    merged: pd.DataFrame
+    legacy_values: pd.Series = field(repr=False)
+    converted_values: pd.Series = field(repr=False)
+    key_index: ResultIndex | None = field(default=None, repr=False)
+    scale: int | None = None
+    measure_values: list[tuple[pd.Series, pd.Series]] = field(default_factory=list, repr=False)
+
+    @property
+    def measures(self) -> list[Measure]:
+        """The measures compared besides the main compare columns, with their default tolerances."""
+        return [measure for measure, _, _ in measure_columns(self.merged)[1:]]
+
+
+@dataclass
+class MeasureSummary:
+    """Match counts of one measure of a multi-measure comparison."""
+
+    label: str
+    matched_records: int
+    unmatched_records: int
+
+
+@dataclass
+class ComparisonResult:
+    """Simple container for comparison output."""
+
+    merged: pd.DataFrame
+    summary_text: str
+    total_records: int = 0
+    matched_records: int = 0
+    match_percentage: float = 0.0
+    alignment: Alignment | None = field(default=None, repr=False)
+    measures: list[MeasureSummary] = field(default_factory=list)
+    trace: Trace | None = field(default=None, repr=False)
+
+    def metadata(self) -> dict:
+        """Return the summary as embedded in exported result files."""
+        metadata = {
+            "total_records": self.total_records,
+            "matched_records": self.matched_records,
+            "unmatched_records": self.total_records - self.matched_records,
+            "match_percentage": round(self.match_percentage, 4),
+            "generated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        }
+        for measure in self.measures:
+            metadata[f"{measure.label} matched_records"] = measure.matched_records
+            metadata[f"{measure.label} unmatched_records"] = measure.unmatched_records
+        return metadata
+
+    @cached_property
+    def index(self) -> ResultIndex:
+        """Row indexes for status, key and dollar-band filtering, built on first use."""
+        value_columns = self.merged.attrs.get(VALUE_COLUMNS_ATTR)
+        if self.alignment is None:
+            return build_result_index(self.merged, value_columns)
+        index = build_result_index(self.merged, value_columns, reuse=self.alignment.key_index)
+        self.alignment.key_index = index
+        return index
+
+
+def _as_numeric_array(values: pd.Series) -> np.ndarray:
+    """Return a column as a plain NumPy array with missing values as NaN."""
+    if values.dtype.kind in "iuf":
+        return values.to_numpy()
+    return values.to_numpy(dtype="float64", na_value=np.nan)
+
+
+def evaluate_differences(
+    legacy_values: pd.Series,
+    converted_values: pd.Series,
+    tolerance_type: str | None = None,
+    tolerance_value: float | None = None,
+    scale: int | None = None,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return the ``Difference``, ``Dollar Difference`` and ``Percentage Difference`` arrays.
+
+    Semantics match the original row-wise rules:
+
+    * a row with a missing value on either side is always a difference;
+    * ``Dollar ($)`` flags rows whose absolute delta exceeds the tolerance;
+    * ``Percentage (%)`` flags rows whose delta relative to the first value
+      exceeds the tolerance, falling back to exact equality when the first
+      value is zero;
+    * with no tolerance (or no tolerance value) values must be exactly equal.
+
+    The dollar difference treats missing values as zero; the percentage
+    difference is NaN when either side is missing or the first value is zero.
+
+    With ``scale`` the values are integer units of ``10 ** -scale`` and
+    deltas, equality and the dollar tolerance are exact integer arithmetic;
+    the dollar difference is returned in whole currency units.
+    """
+    difference, dollar_difference, percentage_difference = evaluate_measures(
+        [legacy_values], [converted_values], [(tolerance_type, tolerance_value)], scale
+    )
+    return difference[0], dollar_difference[0], percentage_difference[0]
+
+
+def evaluate_measures(
+    legacy_values: list[pd.Series],
+    converted_values: list[pd.Series],
+    tolerances: list[tuple[str | None, float | None]],
+    scale: int | None = None,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """``evaluate_differences`` for several measures at once.
+
+    The ``i``-th measure compares ``legacy_values[i]`` with
+    ``converted_values[i]`` under ``tolerances[i]``, a ``(type, value)``
+    pair. The measures are stacked into one array per side and evaluated in
+    a single pass; row ``i`` of each returned 2-D array belongs to measure
+    ``i``.
+    """
+    dollar = np.array([kind == TOLERANCE_DOLLAR and value is not None for kind, value in tolerances])[:, None]
+    percentage = np.array([kind == TOLERANCE_PERCENTAGE and value is not None for kind, value in tolerances])
+    percentage = percentage[:, None]
+    percentage_limit = np.array([(value or 0) / 100 for _, value in tolerances], dtype="float64")[:, None]
+    if scale is not None:
+        return _evaluate_units(legacy_values, converted_values, tolerances, dollar, percentage, percentage_limit, scale)
+    dollar_limit = np.array([value or 0 for _, value in tolerances], dtype="float64")[:, None]
+    legacy = np.stack([_as_numeric_array(values) for values in legacy_values]).astype("float64", copy=False)
+    converted = np.stack([_as_numeric_array(values) for values in converted_values]).astype("float64", copy=False)
+    legacy_missing = np.isnan(legacy)
+    converted_missing = np.isnan(converted)
+    missing = legacy_missing | converted_missing
+    nonzero = legacy != 0
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        delta = legacy - converted
+        relative = np.abs(delta / np.where(nonzero, legacy, 1))
+        unequal = legacy != converted
+        difference = np.where(
+            dollar,
+            np.abs(delta) > dollar_limit,
+            np.where(percentage & nonzero, relative > percentage_limit, unequal),
+        )
+        difference = difference | missing
+
+        dollar_difference = np.where(legacy_missing, 0, legacy) - np.where(converted_missing, 0, converted)
+
+        percentage_difference = np.abs(delta) / np.abs(legacy)
+        percentage_difference = np.where(missing | ~nonzero, np.nan, percentage_difference)
+
+    return difference.astype(bool), dollar_difference, percentage_difference.astype("float64")
+
+
+def _evaluate_units(
+    legacy_values: list[pd.Series],
+    converted_values: list[pd.Series],
+    tolerances: list[tuple[str | None, float | None]],
+    dollar: np.ndarray,
+    percentage: np.ndarray,
+    percentage_limit: np.ndarray,
+    scale: int,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """``evaluate_measures`` for integer units, with the same semantics."""
+    dollar_limit = np.array(
+        [units_threshold(value, scale) if value is not None else 0 for _, value in tolerances], dtype=np.int64
+    )[:, None]
+    missing = np.stack([values.isna().to_numpy() for values in legacy_values])
+    missing |= np.stack([values.isna().to_numpy() for values in converted_values])
+    legacy = np.stack([values.to_numpy(dtype=np.int64, na_value=0) for values in legacy_values])
+    converted = np.stack([values.to_numpy(dtype=np.int64, na_value=0) for values in converted_values])
+    nonzero = legacy != 0
+    delta = legacy - converted  # missing values count as zero, as in the dollar difference
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        relative = np.abs(delta) / np.abs(legacy)
+        difference = np.where(
+            dollar,
+            np.abs(delta) > dollar_limit,
+            np.where(percentage & nonzero, relative > percentage_limit, delta != 0),
+        )
+        difference = difference | missing
+        percentage_difference = np.where(missing | ~nonzero, np.nan, relative)
+
+    return difference.astype(bool), delta / 10**scale, percentage_difference.astype("float64")
+
+
+def comparison_key_text(keys: pd.DataFrame) -> pd.Series:
+    """Return the readable ``"a | b | c"`` key for each row, built column-wise."""
+    parts = [keys.iloc[:, i].fillna("").astype(str).str.strip() for i in range(keys.shape[1])]
+    if not parts:
+        return pd.Series("", index=keys.index, dtype=object)
+    return parts[0].str.cat(parts[1:], sep=KEY_SEPARATOR)
+
+
+def _factorize_key_part(
+    legacy_part: pd.Series, converted_part: pd.Series, followed: bool = False
+) -> tuple[np.ndarray, np.ndarray]:
+    """Factorize one key column pair into codes shared by both sides.
+
+    Each side is factorized on its own (categoricals on their codes alone)
+    and only the distinct raw values are stripped, so the normalization cost
+    does not grow with the row count. Missing values map to the empty label,
+    and codes index into the returned, sorted label array. A part
+    ``followed`` by another is sorted with the separator appended, as it
+    sorts within the joined key text (``"a | z"`` after ``"a b | c"``).
+    """
+    legacy_codes, legacy_uniques = pd.factorize(legacy_part)
+    converted_codes, converted_uniques = pd.factorize(converted_part)
+    uniques = np.concatenate([np.asarray(legacy_uniques, dtype=object), np.asarray(converted_uniques, dtype=object)])
+    labels = [str(value).strip() for value in uniques]
+    labels.append("")  # raw code -1 (missing) indexes this last entry
+    label_codes, label_uniques = pd.factorize(np.array(labels, dtype=object))
+    label_uniques = np.asarray(label_uniques, dtype=object)
+    order = np.argsort(label_uniques + KEY_SEPARATOR if followed else label_uniques, kind="stable")
+    rank = np.empty(len(order), dtype=np.int64)
+    rank[order] = np.arange(len(order))
+    raw_codes = np.concatenate([legacy_codes, np.where(converted_codes < 0, -1, converted_codes + len(legacy_uniques))])
+    return rank[label_codes[raw_codes]], label_uniques[order]
+
+
+@dataclass
+class ComparisonKeys:
+    """Comparison keys for both sides, factorized into shared int64 codes.
+
+    ``legacy_codes`` / ``converted_codes`` hold one code per input row, and
+    ``legacy_ids`` / ``converted_ids`` the position of that code in
+    ``unique_codes``, a dense key number. The readable key text is not
+    stored; ``text()`` renders it from the stripped per-column labels for
+    just the codes that are asked for.
+    """
+
+    legacy_codes: np.ndarray
+    converted_codes: np.ndarray
+    legacy_ids: np.ndarray = field(repr=False)
+    converted_ids: np.ndarray = field(repr=False)
+    unique_codes: np.ndarray = field(repr=False)
+    part_codes: list[np.ndarray] = field(repr=False)
+    part_labels: list[np.ndarray] = field(repr=False)
+
+    def text(self, codes: np.ndarray) -> np.ndarray:
+        """Return the ``"a | b | c"`` key for each code as an object array."""
+        positions = np.searchsorted(self.unique_codes, codes)
+        if not self.part_labels:
+            return np.full(len(positions), "", dtype=object)
+        text = self.part_labels[0][self.part_codes[0][positions]]
+        for labels, part in zip(self.part_labels[1:], self.part_codes[1:]):
+            text = text + KEY_SEPARATOR + labels[part[positions]]
+        return text
+
+
+def factorize_comparison_keys(legacy_keys: pd.DataFrame, converted_keys: pd.DataFrame) -> ComparisonKeys:
+    """Factorize both sides' key columns into shared comparison key codes.
+
+    Rows whose stripped key values are equal get the same code on both sides,
+    and codes sort in the same order as the ``"a | b"`` key text, so every
+    engine orders results alike. When the two sides use a different number
+    of key columns the readable text keys are factorized instead, which
+    preserves the string-join semantics.
+    """
+    legacy_rows = len(legacy_keys)
+    if legacy_keys.shape[1] != converted_keys.shape[1]:
+        text = pd.concat([comparison_key_text(legacy_keys), comparison_key_text(converted_keys)], ignore_index=True)
+        combined, uniques = pd.factorize(text, sort=True)
+        part_codes = [combined.astype(np.int64)]
+        part_labels = [np.asarray(uniques, dtype=object)]
+        combined = part_codes[0]
+    else:
+        combined = np.zeros(legacy_rows + len(converted_keys), dtype=np.int64)
+        cardinality = 1
+        part_codes, part_labels = [], []
+        for i in range(legacy_keys.shape[1]):
+            followed = i < legacy_keys.shape[1] - 1
+            codes, labels = _factorize_key_part(legacy_keys.iloc[:, i], converted_keys.iloc[:, i], followed)
+            if cardinality > np.iinfo(np.int64).max // len(labels):
+                # Re-densify before the mixed-radix product can overflow int64.
+                combined, uniques = pd.factorize(combined, sort=True)
+                cardinality = len(uniques)
+            combined = combined * len(labels) + codes
+            cardinality *= len(labels)
+            part_codes.append(codes)
+            part_labels.append(labels)
+
+    unique_codes, first_rows, ids = np.unique(combined, return_index=True, return_inverse=True)
+    return ComparisonKeys(
+        legacy_codes=combined[:legacy_rows],
+        converted_codes=combined[legacy_rows:],
+        legacy_ids=ids[:legacy_rows],
+        converted_ids=ids[legacy_rows:],
+        unique_codes=unique_codes,
+        part_codes=[codes[first_rows] for codes in part_codes],
+        part_labels=part_labels,
+    )
+
+
+def _estimate_merge(
+    keys: ComparisonKeys, legacy: pd.DataFrame, converted: pd.DataFrame, distinct_list: bool
+) -> MergeEstimate:
+    """Estimate the merge of two sides reduced to the columns that reach the result."""
+    sample = keys.text(keys.unique_codes[:1000])
+    key_bytes = row_bytes(pd.DataFrame({"key": sample}))
+    return estimate_merge(
+        keys.legacy_ids,
+        keys.converted_ids,
+        len(keys.unique_codes),
+        row_bytes(legacy) + row_bytes(converted) + key_bytes + DIFFERENCE_ROW_BYTES,
+        distinct_list,
+    )
+
+
+def preflight_merge(
+    legacy: pd.DataFrame,
+    converted: pd.DataFrame,
+    pk_legacy: list[str],
+    pk_converted: list[str],
+    columns_legacy: list[str] = (),
+    columns_converted: list[str] = (),
+    distinct_list: bool = True,
+) -> MergeEstimate:
+    """Estimate the key statistics and merged size of a comparison without running it.
+
+    ``columns_legacy`` / ``columns_converted`` are the non-key columns that
+    reach the result (compare and display columns). Only the keys are
+    factorized, which is a fraction of the cost of ``align_frames``.
+    """
+    keys = factorize_comparison_keys(legacy[pk_legacy], converted[pk_converted])
+    columns_legacy = [column for column in dict.fromkeys(columns_legacy) if column not in pk_legacy]
+    columns_converted = [column for column in dict.fromkeys(columns_converted) if column not in pk_converted]
+    return _estimate_merge(keys, legacy[columns_legacy], converted[columns_converted], distinct_list)
+
+
+def _align(
+    legacy: pd.DataFrame,
+    converted: pd.DataFrame,
+    comparison_key: str,
+    value_legacy: list[str],
+    value_converted: list[str],
+    distinct_list: bool,
+    display_legacy: list[str] = (),
+    display_converted: list[str] = (),
+    memory_report: MemoryReport | None = None,
+    trace: Trace | None = None,
+) -> pd.DataFrame:
+    """Aggregate each side per comparison key (if ``distinct_list``) and outer-merge them.
+
+    Key-part columns are not carried through the aggregation: the readable
+    key is rendered from the factorized codes and the parts would be dropped
+    from the result anyway. Value columns are summed and display columns
+    keep their first non-null value per key.
+    """
+    if distinct_list:
+        legacy_agg = {**dict.fromkeys(value_legacy, "sum"), **dict.fromkeys(display_legacy, "first")}
+        converted_agg = {**dict.fromkeys(value_converted, "sum"), **dict.fromkeys(display_converted, "first")}
+        with traced(trace, "aggregate") as stage:
+            legacy = legacy.groupby(comparison_key, dropna=False).agg(legacy_agg).reset_index()
+            converted = converted.groupby(comparison_key, dropna=False).agg(converted_agg).reset_index()
+            stage.rows = len(legacy) + len(converted)
+        if memory_report is not None:
+            memory_report.record("aggregated", legacy, converted)
+
+    with traced(trace, "merge") as stage:
+        merged_df = pd.merge(
+            legacy,
+            converted,
+            on=comparison_key,
+            suffixes=("_legacy", "_converted"),
+            how="outer",
+        )
+        stage.rows = len(merged_df)
+    return merged_df
+
+
+_worker_pools: dict[int, ProcessPoolExecutor] = {}
+_worker_pools_lock = threading.Lock()
+
+
+def worker_pool(workers: int) -> ProcessPoolExecutor:
+    """Return a process pool with ``workers`` processes, created once and then reused.
+
+    Worker processes are started with ``spawn`` so they are safe to create
+    from the threaded Streamlit server, and are kept alive so later runs do
+    not pay the interpreter and pandas start-up cost again.
+    """
+    with _worker_pools_lock:
+        if workers not in _worker_pools:
+            context = multiprocessing.get_context("spawn")
+            _worker_pools[workers] = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+        return _worker_pools[workers]
+
+
+def _align_parallel(legacy: pd.DataFrame, converted: pd.DataFrame, align_args: tuple, workers: int) -> pd.DataFrame:
+    """Run ``_align`` on hash partitions of the comparison key in a process pool.
+
+    Rows are partitioned on their integer comparison key, so every key lands
+    in exactly one partition and the per-partition merges can simply be
+    concatenated. The result is re-sorted by key to match the serial merge.
+    """
+    comparison_key, value_legacy, value_converted, distinct_list, display_legacy, display_converted = align_args
+    if distinct_list:
+        # Only the key, value and display columns survive the aggregation.
+        legacy = legacy[[comparison_key, *value_legacy, *display_legacy]]
+        converted = converted[[comparison_key, *value_converted, *display_converted]]
+
+    legacy_parts = _partition_positions(legacy[comparison_key].to_numpy(), workers)
+    converted_parts = _partition_positions(converted[comparison_key].to_numpy(), workers)
+
+    executor = worker_pool(workers)
+    futures = [
+        executor.submit(_align, legacy.iloc[legacy_rows], converted.iloc[converted_rows], *align_args)
+        for legacy_rows, converted_rows in zip(legacy_parts, converted_parts)
+    ]
+    frames = [future.result() for future in futures]
+
+    merged_df = pd.concat(frames, ignore_index=True)
+    return merged_df.sort_values(comparison_key, kind="stable", ignore_index=True)
+
+
+def _partition_positions(codes: np.ndarray, partitions: int) -> list[np.ndarray]:
+    """Return the row positions belonging to each of ``partitions`` key partitions."""
+    partition_ids = codes % partitions
+    order = np.argsort(partition_ids, kind="stable")
+    bounds = np.searchsorted(partition_ids[order], np.arange(1, partitions))
+    return np.split(order, bounds)
+
+
+def _result_columns(
+    frame: pd.DataFrame,
+    pk: list[str],
+    value_columns: list[str],
+    display: list[str],
+    distinct_list: bool,
+    other: pd.DataFrame,
+    other_pk: list[str],
+) -> list[str]:
+    """Return the columns of one side that survive into the result.
+
+    Aggregation keeps only the compare and display columns. Otherwise every
+    column passes through except key columns, which the result drops; a key
+    column is kept while the other side has a non-key column of that name,
+    since the merge suffixes both.
+    """
+    if distinct_list:
+        return list(dict.fromkeys([*value_columns, *display]))
+    return [
+        column
+        for column in frame.columns
+        if column in value_columns or column not in pk or (column in other.columns and column not in other_pk)
+    ]
+
+
+@dataclass
+class ColumnPlan:
+    """The columns a comparison carries from each side, from ``plan_columns``.
+
+    ``measures`` starts with the main compare columns. ``value_legacy`` /
+    ``value_converted`` are the distinct compared columns of each side and
+    ``display_legacy`` / ``display_converted`` the display columns that are
+    not also key or compared columns.
+    """
+
+    measures: list[Measure]
+    value_legacy: list[str]
+    value_converted: list[str]
+    display_legacy: list[str]
+    display_converted: list[str]
+
+
+def plan_columns(
+    legacy_columns,
+    converted_columns,
+    pk_legacy: list[str],
+    pk_converted: list[str],
+    match_col_legacy: str,
+    match_col_converted: str,
+    display_legacy: list[str] | None = None,
+    display_converted: list[str] | None = None,
+    measures: list[Measure] | None = None,
+) -> ColumnPlan:
+    """Check the display and measure columns against both sides' columns and plan the result columns."""
+    missing = [col for col in display_legacy or [] if col not in legacy_columns]
+    missing += [col for col in display_converted or [] if col not in converted_columns]
+    if missing:
+        raise ValueError(f"Display columns not found: {', '.join(missing)}")
+    measures = list(measures or [])
+    all_measures = [Measure(match_col_legacy, match_col_converted), *measures]
+    missing = [measure.first for measure in measures if measure.first not in legacy_columns]
+    missing += [measure.second for measure in measures if measure.second not in converted_columns]
+    if missing:
+        raise ValueError(f"Measure columns not found: {', '.join(missing)}")
+    labels = [measure.label for measure in all_measures]
+    if len(set(labels)) < len(labels):
+        raise ValueError(f"Each measure must compare a different pair of columns: {', '.join(labels)}")
+    value_legacy = list(dict.fromkeys(measure.first for measure in all_measures))
+    value_converted = list(dict.fromkeys(measure.second for measure in all_measures))
+    reserved = {*pk_legacy, *pk_converted, *value_legacy, *value_converted}
+    return ColumnPlan(
+        all_measures,
+        value_legacy,
+        value_converted,
+        [col for col in dict.fromkeys(display_legacy or []) if col not in reserved],
+        [col for col in dict.fromkeys(display_converted or []) if col not in reserved],
+    )
+
+
+def align_frames(
+    legacy: pd.DataFrame,
+    converted: pd.DataFrame,
+    pk_legacy: list[str],
+    pk_converted: list[str],
+    match_col_legacy: str,
+    match_col_converted: str,
+    distinct_list: bool = True,
+    legacy_columns: set[str] | None = None,
+    converted_columns: set[str] | None = None,
+    workers: int = 1,
+    display_legacy: list[str] | None = None,
+    display_converted: list[str] | None = None,
+    compact: bool = True,
+    memory_report: MemoryReport | None = None,
+    exact_scale: int | None = None,
+    measures: list[Measure] | None = None,
+    merge_budget_mb: float | None = None,
+    trace: Trace | None = None,
+    backend: str = BACKEND_PANDAS,
+) -> Alignment:
+    """Align two dataframes on their comparison keys, everything a comparison does before tolerance applies.
+
+    Pass the returned ``Alignment`` to ``evaluate_alignment`` for each
+    tolerance setting; ``compare_frames`` does both in one call.
+
+    The frames only need the key, compare and display columns, so callers
+    may pass frames loaded with just those columns.
+
+    ``legacy_columns`` / ``converted_columns`` name every column of the original
+    inputs and decide which columns get a ``(First)`` / ``(Second)`` suffix.
+    They default to the columns of the frames passed in, and only need to be
+    given when the frames are a projection of larger files.
+
+    ``display_legacy`` / ``display_converted`` are extra columns passed through
+    to the result for context. With ``distinct_list`` each keeps its first
+    non-null value per key; without it every column is passed through anyway.
+
+    With ``workers`` > 1 the aggregation and merge run on that many key
+    partitions in parallel processes; the result is identical.
+
+    Only the columns that reach the result are carried past key building.
+    With ``compact`` low-cardinality pass-through columns become categoricals
+    before the aggregation and merge (see ``recon_memory.compact_frame``), so
+    they stay categoricals in the result. ``memory_report`` receives the size
+    of the frames after each stage.
+
+    ``exact_scale`` switches to exact amounts: compare columns are parsed
+    into integer units of ``10 ** -exact_scale`` (see ``recon_amounts``) and
+    summed and compared as integers. The result shows them in currency units
+    and records the scale in ``attrs["exact_scale"]``.
+
+    ``measures`` are further column pairs compared on the same keys, each
+    with its own tolerance (see ``Measure``). Their values are summed,
+    parsed and carried through exactly like the compare columns, so several
+    amounts are reconciled with one key build and one merge.
+
+    With ``merge_budget_mb`` the size of the merged result is estimated
+    from the key codes first (see ``recon_preflight``), and
+    ``MergeBudgetExceeded`` is raised instead of running a merge that would
+    take more memory than that. This matters without ``distinct_list``,
+    where duplicate keys multiply.
+
+    ``trace`` (a ``recon_trace.Trace``) records the time, CPU and peak
+    memory of each stage: key building, parsing, aggregation, merge, key
+    text and column finalizing.
+
+    ``backend`` ``"sql"`` (or ``"duckdb"`` / ``"sqlite"``) aligns in an
+    embedded database that spills to disk instead (see ``recon_sql``), for
+    merges that do not fit in memory. It needs ``distinct_list`` and one
+    worker; ``compact``, ``memory_report`` and ``merge_budget_mb`` do not
+    apply to it. ``backend`` ``"arrow"`` aligns in memory with multithreaded
+    Arrow compute and Arrow strings (see ``recon_arrow``), under the same
+    restrictions.
+
+    The frame's ``attrs["value_columns"]`` names the first and second
+    compared value columns as they appear in it. With ``measures``,
+    ``attrs["measures"]`` describes every compared pair, the compare columns
+    first; ``measure_columns`` reads it back.
+    """
+
+    if backend != BACKEND_PANDAS:
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend '{backend}'; expected one of {', '.join(BACKENDS)}")
+        if not distinct_list or workers > 1:
+            raise ValueError(f"The {backend} backend aggregates duplicate keys and runs in one process")
+        if backend == BACKEND_ARROW:
+            from recon_arrow import align_arrow  # imported lazily; it imports this module
+
+            return align_arrow(
+                legacy,
+                converted,
+                pk_legacy,
+                pk_converted,
+                match_col_legacy,
+                match_col_converted,
+                display_legacy=display_legacy,
+                display_converted=display_converted,
+                exact_scale=exact_scale,
+                measures=measures,
+                legacy_columns=legacy_columns,
+                converted_columns=converted_columns,
+                trace=trace,
+            )
+        from recon_sql import align_sql
+
+        return align_sql(
+            legacy,
+            converted,
+            pk_legacy,
+            pk_converted,
+            match_col_legacy,
+            match_col_converted,
+            display_legacy=display_legacy,
+            display_converted=display_converted,
+            exact_scale=exact_scale,
+            measures=measures,
+            backend=None if backend == BACKEND_SQL else backend,
+            legacy_columns=legacy_columns,
+            converted_columns=converted_columns,
+            trace=trace,
+        )
+
+    def _unique_key_name() -> str:
+        base = "_comparison_key"
+        key_name = base
+        counter = 1
+        while key_name in legacy.columns or key_name in converted.columns:
+            key_name = f"{base}_{counter}"
+            counter += 1
+        return key_name
+
+    comparison_key = _unique_key_name()
+    if memory_report is not None:
+        memory_report.record("input", legacy, converted)
+    if legacy_columns is None:
+        legacy_columns = set(legacy.columns)
+    if converted_columns is None:
+        converted_columns = set(converted.columns)
+    plan = plan_columns(
+        legacy.columns,
+        converted.columns,
+        pk_legacy,
+        pk_converted,
+        match_col_legacy,
+        match_col_converted,
+        display_legacy,
+        display_converted,
+        measures,
+    )
+    value_legacy, value_converted = plan.value_legacy, plan.value_converted
+    display_legacy, display_converted = plan.display_legacy, plan.display_converted
+
+    with traced(trace, "build keys", rows=len(legacy) + len(converted)):
+        keys = factorize_comparison_keys(legacy[pk_legacy], converted[pk_converted])
+
+    # Key columns are now captured as codes; keep only the columns that reach the result.
+    legacy = legacy[
+        _result_columns(legacy, pk_legacy, value_legacy, display_legacy, distinct_list, converted, pk_converted)
+    ]
+    converted = converted[
+        _result_columns(converted, pk_converted, value_converted, display_converted, distinct_list, legacy, pk_legacy)
+    ]
+    if merge_budget_mb is not None:
+        with traced(trace, "estimate merge"):
+            check_merge_budget(_estimate_merge(keys, legacy, converted, distinct_list), merge_budget_mb)
+    with traced(trace, "parse columns", rows=len(legacy) + len(converted)):
+        if exact_scale is not None:
+            exact_scale = validate_scale(exact_scale)
+            skip_legacy, skip_converted = value_legacy, value_converted
+            numeric_legacy, numeric_converted = [], []
+        else:
+            skip_legacy = skip_converted = []
+            numeric_legacy, numeric_converted = value_legacy, value_converted
+        if compact:
+            legacy = compact_frame(legacy, numeric_legacy, skip_columns=skip_legacy)
+            converted = compact_frame(converted, numeric_converted, skip_columns=skip_converted)
+        else:
+            legacy = legacy.copy()
+            converted = converted.copy()
+            for column in numeric_legacy:
+                legacy[column] = pd.to_numeric(legacy[column], errors="coerce")
+            for column in numeric_converted:
+                converted[column] = pd.to_numeric(converted[column], errors="coerce")
+        if exact_scale is not None:
+            for column in value_legacy:
+                legacy[column] = scaled_amounts(legacy[column], exact_scale)
+            for column in value_converted:
+                converted[column] = scaled_amounts(converted[column], exact_scale)
+        legacy[comparison_key] = keys.legacy_codes
+        converted[comparison_key] = keys.converted_codes
+    if memory_report is not None:
+        memory_report.record("working columns", legacy, converted)
+
+    align_args = (
+        comparison_key,
+        value_legacy,
+        value_converted,
+        distinct_list,
+        display_legacy,
+        display_converted,
+    )
+    if workers > 1:
+        with traced(trace, f"aggregate + merge ({workers} workers)") as stage:
+            merged_df = _align_parallel(legacy, converted, align_args, workers)
+            stage.rows = len(merged_df)
+    else:
+        merged_df = _align(legacy, converted, *align_args, memory_report=memory_report, trace=trace)
+    with traced(trace, "key text", rows=len(merged_df)):
+        merged_df[comparison_key] = keys.text(merged_df[comparison_key].to_numpy())
+        merged_df.rename(columns={comparison_key: "Comparison Key"}, inplace=True)
+    if memory_report is not None:
+        memory_report.record("merged", merged_df)
+
+    alignment = finish_alignment(
+        merged_df, plan, pk_legacy, pk_converted, legacy_columns, converted_columns, exact_scale, trace
+    )
+    if memory_report is not None:
+        memory_report.record("result", alignment.merged)
+    return alignment
+
+
+def finish_alignment(
+    merged_df: pd.DataFrame,
+    plan: ColumnPlan,
+    pk_legacy: list[str],
+    pk_converted: list[str],
+    legacy_columns: set[str],
+    converted_columns: set[str],
+    exact_scale: int | None = None,
+    trace: Trace | None = None,
+) -> Alignment:
+    """Turn an outer merge of both sides into the result frame and its alignment, in place.
+
+    ``merged_df`` holds the ``"Comparison Key"`` and the planned columns
+    named as ``pd.merge`` names them (``_legacy`` / ``_converted`` suffixes
+    on names both sides carry), with compared values as parsed (integer
+    units with ``exact_scale``). Key columns are dropped, the others get
+    ``(First)`` / ``(Second)`` suffixes and the result ``attrs`` are set.
+    """
+    value_legacy, value_converted = plan.value_legacy, plan.value_converted
+    all_measures = plan.measures
+    with traced(trace, "finalize columns", rows=len(merged_df)):
+        def _merged_column(column: str, suffix: str) -> str:
+            return f"{column}{suffix}" if f"{column}{suffix}" in merged_df.columns else column
+
+        legacy_value_columns = {column: _merged_column(column, "_legacy") for column in value_legacy}
+        converted_value_columns = {column: _merged_column(column, "_converted") for column in value_converted}
+        value_columns = [*legacy_value_columns.values(), *converted_value_columns.values()]
+
+        # Captured before key columns are dropped, in case a compare column is also a key.
+        values = {column: merged_df[column] for column in value_columns}
+        if exact_scale is not None:
+            for column in value_columns:
+                merged_df[column] = merged_df[column].to_numpy(dtype="float64", na_value=np.nan) / 10**exact_scale
+            merged_df.attrs[EXACT_SCALE_ATTR] = exact_scale
+
+        def _should_drop_match_column(column_name: str) -> bool:
+            if column_name in pk_legacy or column_name in pk_converted:
+                return True
+            if column_name.endswith("_legacy") and column_name[: -len("_legacy")] in pk_legacy:
+                return True
+            if column_name.endswith("_converted") and column_name[: -len("_converted")] in pk_converted:
+                return True
+            return False
+
+        drop_columns = [col for col in merged_df.columns if _should_drop_match_column(col)]
+        if drop_columns:
+            merged_df.drop(columns=drop_columns, inplace=True)
+
+        rename_columns: dict[str, str] = {}
+        for column in merged_df.columns:
+            if column in RESULT_COLUMNS:
+                continue
+            if column.endswith("_legacy"):
+                base = column[: -len("_legacy")]
+                rename_columns[column] = f"{base} (First)"
+            elif column.endswith("_converted"):
+                base = column[: -len("_converted")]
+                rename_columns[column] = f"{base} (Second)"
+            elif column in legacy_columns and column not in converted_columns:
+                rename_columns[column] = f"{column} (First)"
+            elif column in converted_columns and column not in legacy_columns:
+                rename_columns[column] = f"{column} (Second)"
+
+        if rename_columns:
+            merged_df.rename(columns=rename_columns, inplace=True)
+        pairs = [
+            (legacy_value_columns[measure.first], converted_value_columns[measure.second]) for measure in all_measures
+        ]
+        merged_df.attrs[VALUE_COLUMNS_ATTR] = tuple(rename_columns.get(column, column) for column in pairs[0])
+        if len(all_measures) > 1:
+            merged_df.attrs[MEASURES_ATTR] = tuple(
+                (*astuple(measure), rename_columns.get(first, first), rename_columns.get(second, second))
+                for measure, (first, second) in zip(all_measures, pairs)
+            )
+
+    return Alignment(
+        merged_df,
+        values[pairs[0][0]],
+        values[pairs[0][1]],
+        scale=exact_scale,
+        measure_values=[(values[first], values[second]) for first, second in pairs[1:]],
+    )
+
+
+def measure_columns(merged_df: pd.DataFrame) -> list[tuple[Measure, str, str]]:
+    """Return ``(measure, first column, second column)`` for each pair a multi-measure result compares.
+
+    The main compare columns come first, as a measure without a tolerance;
+    single-measure results return an empty list. The pairs are kept in
+    ``attrs`` as plain tuples so the frame's attributes stay serializable.
+    """
+    return [(Measure(*entry[:4]), entry[4], entry[5]) for entry in merged_df.attrs.get(MEASURES_ATTR, ())]
+
+
+def _difference_columns(merged_df: pd.DataFrame) -> list[str]:
+    """Return the names of the tolerance-dependent columns of a result frame."""
+    columns = ["Difference", "Dollar Difference", "Percentage Difference"]
+    for position, (measure, _, _) in enumerate(measure_columns(merged_df)):
+        columns.append(f"{measure.label} Difference")
+        if position:
+            columns += [f"{measure.label} Dollar Difference", f"{measure.label} Percentage Difference"]
+    return columns
+
+
+def _with_differences(
+    alignment: Alignment,
+    tolerance_type: str | None,
+    tolerance_value: float | None,
+    measure_tolerances: list[tuple[str | None, float | None]] | None = None,
+) -> pd.DataFrame:
+    measures = alignment.measures
+    if measure_tolerances is None:
+        measure_tolerances = [(measure.tolerance_type, measure.tolerance_value) for measure in measures]
+    if len(measure_tolerances) != len(measures):
+        raise ValueError(f"Expected {len(measures)} measure tolerances, got {len(measure_tolerances)}")
+    difference, dollar_difference, percentage_difference = evaluate_measures(
+        [alignment.legacy_values, *(legacy for legacy, _ in alignment.measure_values)],
+        [alignment.converted_values, *(converted for _, converted in alignment.measure_values)],
+        [(tolerance_type, tolerance_value), *measure_tolerances],
+        alignment.scale,
+    )
+    merged_df = alignment.merged.copy(deep=False)
+    merged_df["Difference"] = difference.any(axis=0)
+    merged_df["Dollar Difference"] = dollar_difference[0]
+    merged_df["Percentage Difference"] = percentage_difference[0]
+    for position, (measure, _, _) in enumerate(measure_columns(merged_df)):
+        merged_df[f"{measure.label} Difference"] = difference[position]
+        if position:
+            merged_df[f"{measure.label} Dollar Difference"] = dollar_difference[position]
+            merged_df[f"{measure.label} Percentage Difference"] = percentage_difference[position]
+    return merged_df
+
+
+def alignment_of(merged_df: pd.DataFrame) -> Alignment | None:
+    """Recover the alignment of a result frame, or ``None`` if its value columns are unknown.
+
+    The frame may be a finished result or one without the difference columns.
+    """
+    value_columns = merged_df.attrs.get(VALUE_COLUMNS_ATTR)
+    pairs = [value_columns, *((first, second) for _, first, second in measure_columns(merged_df)[1:])]
+    if not value_columns or not all(column in merged_df.columns for pair in pairs for column in pair):
+        return None
+    scale = merged_df.attrs.get(EXACT_SCALE_ATTR)
+    if scale is None:
+        values = [(merged_df[first], merged_df[second]) for first, second in pairs]
+    else:
+        values = [tuple(scaled_amounts(merged_df[column], scale) for column in pair) for pair in pairs]
+    return Alignment(
+        merged_df.drop(columns=_difference_columns(merged_df), errors="ignore"),
+        *values[0],
+        scale=scale,
+        measure_values=values[1:],
+    )
+
+
+def evaluate_alignment(
+    alignment: Alignment,
+    tolerance_type: str | None = None,
+    tolerance_value: float | None = None,
+    measure_tolerances: list[tuple[str | None, float | None]] | None = None,
+) -> ComparisonResult:
+    """Apply a tolerance to an aligned comparison and summarize it.
+
+    Only the difference columns are computed, so re-evaluating an alignment
+    with a new tolerance takes milliseconds. The result keeps the alignment.
+    ``measure_tolerances`` replaces the ``(type, value)`` tolerance of each
+    additional measure; by default each measure keeps its own.
+    """
+    result = summarize(_with_differences(alignment, tolerance_type, tolerance_value, measure_tolerances))
+    result.alignment = alignment
+    return result
+
+
+def compare_frames(
+    legacy: pd.DataFrame,
+    converted: pd.DataFrame,
+    pk_legacy: list[str],
+    pk_converted: list[str],
+    match_col_legacy: str,
+    match_col_converted: str,
+    tolerance_type: str | None = None,
+    tolerance_value: float | None = None,
+    distinct_list: bool = True,
+    legacy_columns: set[str] | None = None,
+    converted_columns: set[str] | None = None,
+    workers: int = 1,
+    display_legacy: list[str] | None = None,
+    display_converted: list[str] | None = None,
+    compact: bool = True,
+    memory_report: MemoryReport | None = None,
+    exact_scale: int | None = None,
+    measures: list[Measure] | None = None,
+    merge_budget_mb: float | None = None,
+    trace: Trace | None = None,
+) -> pd.DataFrame:
+    """Align two dataframes on their comparison keys and return the merged result frame.
+
+    See ``align_frames`` for the arguments.
+    """
+    alignment = align_frames(
+        legacy,
+        converted,
+        pk_legacy,
+        pk_converted,
+        match_col_legacy,
+        match_col_converted,
+        distinct_list=distinct_list,
+        legacy_columns=legacy_columns,
+        converted_columns=converted_columns,
+        workers=workers,
+        display_legacy=display_legacy,
+        display_converted=display_converted,
+        compact=compact,
+        memory_report=memory_report,
+        exact_scale=exact_scale,
+        measures=measures,
+        merge_budget_mb=merge_budget_mb,
+        trace=trace,
+    )
+    return _with_differences(alignment, tolerance_type, tolerance_value)
+
+
+def summarize(merged_df: pd.DataFrame) -> ComparisonResult:
+    """Wrap a merged result frame in a ``ComparisonResult`` with its match counts.
+
+    A row counts as matched when every measure matches; multi-measure
+    results also get per-measure counts.
+    """
+    total_records = len(merged_df)
+    matched_records = int((~merged_df["Difference"]).sum())
+    match_percentage = (matched_records / total_records) * 100 if total_records else 0
+
+    summary_lines = [
+        f"Total records: {total_records}",
+        f"Matched records: {matched_records}",
+        f"Match percentage: {match_percentage:.2f}%",
+    ]
+    measures = []
+    for measure, _, _ in measure_columns(merged_df):
+        unmatched = int(merged_df[f"{measure.label} Difference"].sum())
+        measures.append(MeasureSummary(measure.label, total_records - unmatched, unmatched))
+        summary_lines.append(f"{measure.label}: {total_records - unmatched} matched, {unmatched} unmatched")
+
+    return ComparisonResult(
+        merged_df,
+        "\n".join(summary_lines),
+        total_records=total_records,
+        matched_records=matched_records,
+        match_percentage=match_percentage,
+        measures=measures,
+    )
+
+
+def compare_data(
+    legacy: pd.DataFrame,
+    converted: pd.DataFrame,
+    pk_legacy: list[str],
+    pk_converted: list[str],
+    match_col_legacy: str,
+    match_col_converted: str,
+    output_file: str | None = None,
+    tolerance_type: str | None = None,
+    tolerance_value: float | None = None,
+    distinct_list: bool = True,
+    workers: int = 1,
+    display_legacy: list[str] | None = None,
+    display_converted: list[str] | None = None,
+    output_format: str | None = None,
+    compact: bool = True,
+    memory_report: MemoryReport | None = None,
+    exact_scale: int | None = None,
+    measures: list[Measure] | None = None,
+    merge_budget_mb: float | None = None,
+    trace: Trace | None = None,
+    backend: str = BACKEND_PANDAS,
+) -> ComparisonResult:
+    """Compare two dataframes and return a summary.
+
+    The frames may be projections holding only the key, compare and display
+    columns (see ``recon_profiles.profile_columns``). ``workers`` > 1
+    reconciles hash partitions of the comparison key in that many processes.
+    ``display_legacy`` / ``display_converted`` name columns passed through to
+    the result alongside the compared values. ``compact``,
+    ``memory_report``, ``exact_scale``, ``measures``, ``merge_budget_mb``
+    and ``backend`` are passed to ``align_frames``; each measure is
+    judged by its own tolerance. With a ``trace`` the alignment stages,
+    the evaluation and the write are recorded in it, and it is attached to
+    the result.
+    ``output_file`` is written as Excel, Parquet, Arrow or CSV according to
+    ``output_format`` or its extension, with the summary embedded as metadata.
+    """
+    with traced(trace, "align") as stage:
+        alignment = align_frames(
+            legacy,
+            converted,
+            pk_legacy,
+            pk_converted,
+            match_col_legacy,
+            match_col_converted,
+            distinct_list=distinct_list,
+            workers=workers,
+            display_legacy=display_legacy,
+            display_converted=display_converted,
+            compact=compact,
+            memory_report=memory_report,
+            exact_scale=exact_scale,
+            measures=measures,
+            merge_budget_mb=merge_budget_mb,
+            trace=trace,
+            backend=backend,
+        )
+        stage.rows = len(alignment.merged)
+
+    with traced(trace, "evaluate", rows=len(alignment.merged)):
+        result = evaluate_alignment(alignment, tolerance_type, tolerance_value)
+    if output_file:
+        with traced(trace, f"write {resolve_format(output_file, output_format)}"):
+            write_result(result.merged, output_file, output_format, metadata=result.metadata())
+
+    result.trace = trace
+    return result
@@ -0,0 +1,285 @@
+"""Writing reconciliation results to files and buffers.
+
+``write_excel`` produces the formatted workbook in a single pass with
+xlsxwriter: number formats are set once per column instead of per cell, rows
+are written in order, and results longer than one sheet continue on extra
+sheets. ``write_result`` also writes Parquet, Arrow IPC (Feather) and CSV,
+embedding the comparison summary as file metadata where the format has
+room for it. ``start_export`` runs an export on a background thread so a UI
+can show progress while the file is built, and times it in the job's
+``trace``. This module must not import Streamlit or tkinter.
+"""
+
+import gzip
+import json
+import os
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+
+from recon_trace import Trace
+
+EXCEL_MAX_ROWS = 1_048_576  # rows per worksheet, including the header
+RESULTS_SHEET = "Sheet1"  # the name to_excel used, kept for existing consumers
+COLUMN_FORMATS = {
+    "Dollar Difference": "$#,##0.00",
+    "Percentage Difference": "0.00%",
+}
+FORMAT_XLSX = "xlsx"
+FORMAT_PARQUET = "parquet"
+FORMAT_ARROW = "arrow"
+FORMAT_CSV = "csv"
+FORMAT_CSV_GZ = "csv.gz"
+# File extension for each format, and the extensions recognised when reading a path.
+FORMAT_EXTENSIONS = {
+    FORMAT_XLSX: ".xlsx",
+    FORMAT_PARQUET: ".parquet",
+    FORMAT_ARROW: ".arrow",
+    FORMAT_CSV: ".csv",
+    FORMAT_CSV_GZ: ".csv.gz",
+}
+_EXTENSION_FORMATS = {
+    ".csv.gz": FORMAT_CSV_GZ,
+    ".parquet": FORMAT_PARQUET,
+    ".pq": FORMAT_PARQUET,
+    ".arrow": FORMAT_ARROW,
+    ".feather": FORMAT_ARROW,
+    ".ipc": FORMAT_ARROW,
+    ".csv": FORMAT_CSV,
+    ".xlsx": FORMAT_XLSX,
+}
+METADATA_KEY = "reconciliation"  # schema / document property holding the summary JSON
+_DATETIME_FORMAT = "yyyy-mm-dd hh:mm:ss"
+_PROGRESS_EVERY = 10_000  # rows between progress callbacks
+
+
+def _column_writer(worksheet, series: pd.Series, datetime_format):
+    """Return ``(values, write)`` for one column, choosing the xlsxwriter call by dtype.
+
+    ``write(row, col, value)`` skips missing values, which leaves the cell
+    empty as ``to_excel`` does.
+    """
+    if pd.api.types.is_bool_dtype(series.dtype) and not series.hasnans:
+        return series.to_numpy(dtype=bool).tolist(), worksheet.write_boolean
+    if pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype):
+        values = series.to_numpy(dtype=float, na_value=np.nan)
+        write_number = worksheet.write_number
+
+        def _write_number(row: int, col: int, value: float) -> None:
+            if value == value:  # skips NaN
+                write_number(row, col, value)
+
+        return values.tolist(), _write_number
+    if pd.api.types.is_datetime64_any_dtype(series.dtype):
+        values = series.dt.tz_localize(None) if series.dt.tz is not None else series
+        write_datetime = worksheet.write_datetime
+
+        def _write_datetime(row: int, col: int, value) -> None:
+            if value is not pd.NaT:
+                write_datetime(row, col, value.to_pydatetime(), datetime_format)
+
+        return list(values), _write_datetime
+
+    write = worksheet.write
+    write_string = worksheet.write_string
+
+    def _write_value(row: int, col: int, value) -> None:
+        if isinstance(value, str):
+            write_string(row, col, value)
+        elif value is not None and not pd.isna(value):
+            write(row, col, value)
+
+    return series.astype(object).tolist(), _write_value
+
+
+def _number_format(column: str) -> str | None:
+    """Return the number format of a column such as ``"Dollar Difference"`` or ``"DEBIT Dollar Difference"``."""
+    for name, number_format in COLUMN_FORMATS.items():
+        if column == name or column.endswith(f" {name}"):
+            return number_format
+    return None
+
+
+def write_excel(
+    merged_df: pd.DataFrame,
+    target,
+    sheet_name: str = RESULTS_SHEET,
+    max_rows_per_sheet: int = EXCEL_MAX_ROWS,
+    progress: Callable[[int, int], None] | None = None,
+    metadata: dict | None = None,
+) -> None:
+    """Write a result frame as a formatted ``.xlsx`` to a path or binary buffer.
+
+    Dollar and percentage columns, per-measure ones included, get their
+    number formats at column level, so the file is written once and never
+    reopened. Rows past ``max_rows_per_sheet`` continue on
+    ``"<sheet_name> (2)"``, ``(3)``, ..., each with its own header. Rows are
+    streamed in xlsxwriter's constant-memory mode, so memory stays flat up to
+    the sheet limit whether the target is a path or a buffer. ``progress(rows_written, total_rows)``
+    is called periodically while rows are written. ``metadata`` is stored as
+    custom document properties.
+    """
+    import xlsxwriter  # imported lazily to keep command-line start-up fast
+
+    workbook = xlsxwriter.Workbook(target, {"constant_memory": True, "nan_inf_to_errors": True})
+    for name, value in (metadata or {}).items():
+        workbook.set_custom_property(name, value if isinstance(value, (int, float, bool)) else str(value))
+    header_format = workbook.add_format({"bold": True, "border": 1, "align": "center", "valign": "top"})
+    datetime_format = workbook.add_format({"num_format": _DATETIME_FORMAT})
+    column_formats = {
+        position: workbook.add_format({"num_format": number_format})
+        for position, column in enumerate(merged_df.columns)
+        if (number_format := _number_format(str(column)))
+    }
+    headers = [str(column) for column in merged_df.columns]
+    rows_per_sheet = max_rows_per_sheet - 1
+    sheet_count = max(1, -(-len(merged_df) // rows_per_sheet))
+
+    for sheet in range(sheet_count):
+        worksheet = workbook.add_worksheet(sheet_name if sheet == 0 else f"{sheet_name} ({sheet + 1})")
+        for position, column_format in column_formats.items():
+            worksheet.set_column(position, position, None, column_format)
+        worksheet.write_row(0, 0, headers, header_format)
+
+        first_row = sheet * rows_per_sheet
+        block = merged_df.iloc[first_row : first_row + rows_per_sheet]
+        columns = [_column_writer(worksheet, block.iloc[:, i], datetime_format) for i in range(block.shape[1])]
+        for offset in range(len(block)):
+            row = offset + 1
+            for col, (values, write) in enumerate(columns):
+                write(row, col, values[offset])
+            if progress and row % _PROGRESS_EVERY == 0:
+                progress(first_row + row, len(merged_df))
+    workbook.close()
+    if progress:
+        progress(len(merged_df), len(merged_df))
+
+
+def resolve_format(target, output_format: str | None = None) -> str:
+    """Return the export format named by ``output_format`` or by the target's file name.
+
+    ``output_format`` may be a format name or an extension (``"parquet"``,
+    ``".csv.gz"``). Unrecognised file names fall back to Excel.
+    """
+    if output_format:
+        name = output_format.lower().lstrip(".")
+        if name in FORMAT_EXTENSIONS:
+            return name
+        if f".{name}" in _EXTENSION_FORMATS:
+            return _EXTENSION_FORMATS[f".{name}"]
+        raise ValueError(f"Unknown export format '{output_format}'")
+    name = os.fspath(target).lower() if isinstance(target, (str, os.PathLike)) else getattr(target, "name", "")
+    for extension, format_name in _EXTENSION_FORMATS.items():
+        if str(name).lower().endswith(extension):
+            return format_name
+    return FORMAT_XLSX
+
+
+def _arrow_table(merged_df: pd.DataFrame, metadata: dict | None):
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(merged_df, preserve_index=False)
+    if metadata:
+        schema_metadata = {**(table.schema.metadata or {}), METADATA_KEY.encode(): json.dumps(metadata).encode()}
+        table = table.replace_schema_metadata(schema_metadata)
+    return table
+
+
+def write_result(
+    merged_df: pd.DataFrame,
+    target,
+    output_format: str | None = None,
+    metadata: dict | None = None,
+    progress: Callable[[int, int], None] | None = None,
+) -> None:
+    """Write a result frame to a path or binary buffer in any supported format.
+
+    The format comes from ``output_format`` or the target's extension (see
+    ``resolve_format``). ``metadata`` (normally ``ComparisonResult.metadata()``)
+    is embedded as Parquet / Arrow schema metadata under ``"reconciliation"``
+    and as Excel document properties; CSV has nowhere to keep it.
+    """
+    output_format = resolve_format(target, output_format)
+    if output_format == FORMAT_XLSX:
+        write_excel(merged_df, target, progress=progress, metadata=metadata)
+    elif output_format == FORMAT_PARQUET:
+        import pyarrow.parquet as pq
+
+        pq.write_table(_arrow_table(merged_df, metadata), target, compression="zstd")
+    elif output_format == FORMAT_ARROW:
+        import pyarrow.feather as feather
+
+        feather.write_feather(_arrow_table(merged_df, metadata), target, compression="zstd")
+    elif output_format == FORMAT_CSV_GZ:
+        with gzip.open(target, "wt", newline="", compresslevel=6) as f:
+            merged_df.to_csv(f, index=False)
+    else:
+        merged_df.to_csv(target, index=False)
+    if progress and output_format != FORMAT_XLSX:
+        progress(len(merged_df), len(merged_df))
+
+
+def read_result_metadata(source) -> dict:
+    """Return the summary embedded in a Parquet or Arrow result file, or ``{}``."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pq.read_schema(source) if resolve_format(source) == FORMAT_PARQUET else pa.ipc.open_file(source).schema
+    raw = (schema.metadata or {}).get(METADATA_KEY.encode())
+    return json.loads(raw) if raw else {}
+
+
+@dataclass
+class ExportJob:
+    """An export being written on a background thread.
+
+    Poll ``done`` / ``progress`` and read ``data`` once it has finished.
+    ``trace`` holds the export's timing once it has finished.
+    """
+
+    total_rows: int
+    rows_written: int = 0
+    future: Future | None = None
+    trace: Trace = field(default_factory=Trace)
+
+    @property
+    def done(self) -> bool:
+        return self.future is not None and self.future.done()
+
+    @property
+    def progress(self) -> float:
+        return 1.0 if self.done else min(self.rows_written / max(self.total_rows, 1), 1.0)
+
+    @property
+    def error(self) -> BaseException | None:
+        return self.future.exception() if self.done else None
+
+    @property
+    def data(self) -> bytes:
+        return self.future.result()
+
+
+_export_threads = ThreadPoolExecutor(max_workers=2, thread_name_prefix="recon-export")
+
+
+def start_export(
+    merged_df: pd.DataFrame, output_format: str = FORMAT_XLSX, metadata: dict | None = None
+) -> ExportJob:
+    """Start writing ``merged_df`` as bytes in ``output_format`` on a background thread."""
+    job = ExportJob(total_rows=len(merged_df))
+
+    def _progress(rows_written: int, _total_rows: int) -> None:
+        job.rows_written = rows_written
+
+    def _write() -> bytes:
+        buffer = BytesIO()
+        with job.trace.stage(f"export {output_format}", rows=len(merged_df)):
+            write_result(merged_df, buffer, output_format, metadata=metadata, progress=_progress)
+        return buffer.getvalue()
+
+    job.future = _export_threads.submit(_write)
+    return job
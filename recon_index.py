@@ -0,0 +1,106 @@
+"""Precomputed row indexes over a comparison result.
+
+``ResultIndex`` is built once per result and answers the questions the
+results view asks on every rerun: which rows match or differ, which keys
+exist on one side only, which rows fall into a dollar-difference band, and
+where a comparison key is. Each answer is a ready-made array of row
+positions, so filtering never rescans or copies the result frame. This
+module must not import Streamlit or tkinter.
+"""
+
+from dataclasses import dataclass, field, replace
+
+import numpy as np
+import pandas as pd
+
+# Lower edges of the absolute dollar-difference buckets after the first ("< $0.01").
+DOLLAR_BUCKET_EDGES = (0.01, 1.0, 100.0, 10_000.0)
+_KEY_PREFIX_END = "\U0010ffff"  # sorts after every character a key can contain
+
+
+def _money(value: float) -> str:
+    return f"${value:,.2f}" if value < 1 else f"${value:,.0f}"
+
+
+def dollar_bucket_labels(edges: tuple[float, ...] = DOLLAR_BUCKET_EDGES) -> list[str]:
+    """Return a readable label for each bucket bounded by ``edges``."""
+    labels = [f"< {_money(edges[0])}"]
+    labels += [f"{_money(low)} – {_money(high)}" for low, high in zip(edges, edges[1:])]
+    labels.append(f"≥ {_money(edges[-1])}")
+    return labels
+
+
+@dataclass
+class ResultIndex:
+    """Row positions of a result frame, grouped the ways the results view filters it.
+
+    Every position array is sorted ascending, i.e. in result order.
+    ``first_only`` / ``second_only`` are the rows with a value on that side
+    and none on the other, which for aggregated results are the keys present
+    in one file only.
+    """
+
+    matched: np.ndarray
+    unmatched: np.ndarray
+    first_only: np.ndarray
+    second_only: np.ndarray
+    key_order: np.ndarray = field(repr=False)
+    sorted_keys: np.ndarray = field(repr=False)
+    bucket_positions: list[np.ndarray] = field(repr=False)
+    bucket_edges: tuple[float, ...] = DOLLAR_BUCKET_EDGES
+
+    def bucket_labels(self) -> list[str]:
+        return dollar_bucket_labels(self.bucket_edges)
+
+    def find_keys(self, text: str) -> np.ndarray:
+        """Return the positions of rows whose comparison key starts with ``text`` (case-insensitive)."""
+        needle = text.strip().lower()
+        if not needle:
+            return np.arange(len(self.key_order))
+        start = np.searchsorted(self.sorted_keys, needle, side="left")
+        stop = np.searchsorted(self.sorted_keys, needle + _KEY_PREFIX_END, side="left")
+        return np.sort(self.key_order[start:stop])
+
+
+def build_result_index(
+    merged_df: pd.DataFrame,
+    value_columns: tuple[str, str] | None = None,
+    bucket_edges: tuple[float, ...] = DOLLAR_BUCKET_EDGES,
+    reuse: ResultIndex | None = None,
+) -> ResultIndex:
+    """Build the index of a result frame from ``compare_frames``.
+
+    ``value_columns`` names the first and second compared value columns in
+    the result; without them the one-side arrays are empty. Building the key
+    index sorts the comparison keys once, about a second per million rows.
+    ``reuse`` is the index of a result with the same rows evaluated under
+    another tolerance: only the matched / unmatched arrays are rebuilt.
+    """
+    difference = merged_df["Difference"].to_numpy(dtype=bool)
+    if reuse is not None:
+        return replace(reuse, matched=np.flatnonzero(~difference), unmatched=np.flatnonzero(difference))
+    if value_columns and all(column in merged_df.columns for column in value_columns):
+        first_missing, second_missing = (merged_df[column].isna().to_numpy() for column in value_columns)
+        first_only = np.flatnonzero(~first_missing & second_missing)
+        second_only = np.flatnonzero(first_missing & ~second_missing)
+    else:
+        first_only = second_only = np.array([], dtype=np.intp)
+
+    keys = merged_df["Comparison Key"].astype("str").str.lower().reset_index(drop=True)
+    key_order = keys.argsort(kind="stable").to_numpy()
+
+    dollars = np.abs(merged_df["Dollar Difference"].to_numpy(dtype=float, na_value=np.nan))
+    buckets = np.digitize(np.nan_to_num(dollars, nan=0.0), bucket_edges)
+    bucket_order = np.argsort(buckets, kind="stable")
+    bounds = np.searchsorted(buckets[bucket_order], np.arange(len(bucket_edges) + 2))
+
+    return ResultIndex(
+        matched=np.flatnonzero(~difference),
+        unmatched=np.flatnonzero(difference),
+        first_only=first_only,
+        second_only=second_only,
+        key_order=key_order,
+        sorted_keys=keys.to_numpy(dtype=object)[key_order],
+        bucket_positions=[bucket_order[low:high] for low, high in zip(bounds, bounds[1:])],
+        bucket_edges=tuple(bucket_edges),
+    )
@@ -0,0 +1,177 @@
+"""Reading ledger extracts for reconciliation.
+
+Sources may be a filesystem path or a file-like object with a ``name``
+attribute (such as a Streamlit ``UploadedFile``). Cells are read as strings,
+matching ``pd.read_excel(..., dtype=str)``. This module must not import
+Streamlit or tkinter.
+
+Workbooks are parsed with python-calamine when it is installed, which is
+several times faster than openpyxl. Otherwise ``.xlsx`` files are streamed
+through openpyxl's read-only mode and ``.xls`` files fall back to xlrd.
+"""
+
+import importlib.util
+import os
+import sys
+import time
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import datetime
+
+import pandas as pd
+
+ENGINE_AUTO = "auto"
+ENGINE_CALAMINE = "calamine"
+ENGINE_OPENPYXL = "openpyxl"
+
+
+@dataclass
+class ReadResult:
+    """A parsed source together with how it was read and how long that took."""
+
+    frame: pd.DataFrame
+    engine: str
+    seconds: float
+
+
+def calamine_available() -> bool:
+    """Return whether the optional python-calamine reader is installed."""
+    return importlib.util.find_spec("python_calamine") is not None
+
+
+def available_engines() -> list[str]:
+    """Return the workbook engines that can be selected, ``"auto"`` first."""
+    engines = [ENGINE_AUTO, ENGINE_OPENPYXL]
+    if calamine_available():
+        engines.insert(1, ENGINE_CALAMINE)
+    return engines
+
+
+def source_name(source) -> str:
+    """Return the file name of a path or file-like source."""
+    return os.path.basename(source if isinstance(source, (str, os.PathLike)) else getattr(source, "name", ""))
+
+
+def source_extension(source) -> str:
+    """Return the lower-cased extension of a source, e.g. ``".xlsx"``."""
+    return os.path.splitext(source_name(source))[1].lower()
+
+
+def _rewind(source) -> None:
+    if hasattr(source, "seek"):
+        source.seek(0)
+
+
+def _header_names(values) -> list[str]:
+    """Name header cells the way ``pd.read_excel`` does, including de-duplication."""
+    names: list[str] = []
+    seen: dict[str, int] = {}
+    for position, value in enumerate(values):
+        name = f"Unnamed: {position}" if value is None else str(value)
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        seen.setdefault(name, 0)
+        names.append(name)
+    return names
+
+
+def _cell_text(value) -> str | None:
+    """Convert an openpyxl cell value to the string ``pd.read_excel(dtype=str)`` produces."""
+    if value is None:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    if isinstance(value, datetime):
+        return str(pd.Timestamp(value))
+    return str(value)
+
+
+def read_columns(source) -> list[str]:
+    """Return the header of a source without reading its data rows."""
+    _rewind(source)
+    if source_extension(source) == ".csv":
+        columns = list(pd.read_csv(source, dtype=str, nrows=0).columns)
+    else:
+        columns = list(pd.read_excel(source, dtype=str, nrows=0).columns)
+    _rewind(source)
+    return columns
+
+
+def _iter_xlsx_chunks(source, chunk_rows: int, usecols: list[str] | None) -> Iterator[pd.DataFrame]:
+    from openpyxl import load_workbook  # imported lazily to keep command-line start-up fast
+
+    workbook = load_workbook(source, read_only=True, data_only=True, keep_links=False)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = _header_names(next(rows, ()))
+        missing = [name for name in usecols or [] if name not in header]
+        if missing:
+            raise ValueError(f"Columns not found in {source_name(source)}: {', '.join(missing)}")
+        positions = [header.index(name) for name in usecols] if usecols else list(range(len(header)))
+        columns = [header[position] for position in positions]
+
+        buffer: list[list[str | None]] = []
+        yielded = False
+        pending_blank = 0  # blank rows are only kept if data follows them, as pandas does
+        for row in rows:
+            values = [_cell_text(row[position]) if position < len(row) else None for position in positions]
+            if all(value is None for value in row):
+                pending_blank += 1
+                continue
+            buffer.extend([[None] * len(positions)] * pending_blank)
+            pending_blank = 0
+            buffer.append(values)
+            if len(buffer) >= chunk_rows:
+                yield pd.DataFrame(buffer, columns=columns, dtype=object)
+                yielded = True
+                buffer = []
+        if buffer or not yielded:
+            yield pd.DataFrame(buffer, columns=columns, dtype=object)
+    finally:
+        workbook.close()
+
+
+def iter_chunks(source, chunk_rows: int, usecols: list[str] | None = None) -> Iterator[pd.DataFrame]:
+    """Yield a source as string DataFrames of at most ``chunk_rows`` rows.
+
+    ``.xlsx`` / ``.xlsm`` workbooks are streamed row by row from the first
+    sheet with openpyxl's read-only mode, and ``.csv`` files with pandas'
+    chunked reader. ``.xls`` has no streaming reader, so it is loaded whole
+    and then sliced. ``usecols`` limits the columns that are kept.
+    """
+    _rewind(source)
+    extension = source_extension(source)
+    if extension == ".csv":
+        yield from pd.read_csv(source, dtype=str, usecols=usecols, chunksize=chunk_rows)
+    elif extension == ".xls":
+        frame = pd.read_excel(source, dtype=str, usecols=usecols)
+        for start in range(0, max(len(frame), 1), chunk_rows):
+            yield frame.iloc[start : start + chunk_rows]
+    else:
+        yield from _iter_xlsx_chunks(source, chunk_rows, usecols)
+
+
+def read_frame(source, usecols: list[str] | None = None, engine: str = ENGINE_AUTO) -> ReadResult:
+    """Read a whole source as strings, optionally keeping only ``usecols``.
+
+    ``engine`` is ``"auto"`` (calamine if installed, otherwise openpyxl for
+    ``.xlsx`` and xlrd for ``.xls``), ``"calamine"`` or ``"openpyxl"``. CSV
+    sources always use pandas' CSV parser.
+    """
+    if engine == ENGINE_CALAMINE and not calamine_available():
+        raise ValueError("The calamine engine needs the python-calamine package")
+    use_calamine = engine == ENGINE_CALAMINE or (engine == ENGINE_AUTO and calamine_available())
+
+    start = time.perf_counter()
+    _rewind(source)
+    extension = source_extension(source)
+    if extension == ".csv":
+        used, frame = "csv", pd.read_csv(source, dtype=str, usecols=usecols)
+    elif use_calamine:
+        used, frame = ENGINE_CALAMINE, pd.read_excel(source, dtype=str, usecols=usecols, engine="calamine")
+    elif extension == ".xls":
+        used, frame = "xlrd", pd.read_excel(source, dtype=str, usecols=usecols, engine="xlrd")
+    else:
+        used, frame = ENGINE_OPENPYXL, next(_iter_xlsx_chunks(source, sys.maxsize, usecols))
+    return ReadResult(frame, used, time.perf_counter() - start)
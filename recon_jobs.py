@@ -0,0 +1,204 @@
+"""Comparisons run in the background on a shared, bounded executor.
+
+``submit_job`` queues a function on one executor shared by every session
+of the process, so at most ``MAX_RUNNING_JOBS`` comparisons run at once and
+the rest wait their turn in submission order; more than
+``MAX_QUEUED_JOBS`` waiting, or more than ``MAX_QUEUED_PER_SESSION`` from
+the same ``session``, raises ``JobQueueFull`` rather than letting one busy
+user pile up work for everyone. The limits can be set with the
+``RECON_MAX_RUNNING_JOBS`` / ``RECON_MAX_QUEUED_JOBS`` /
+``RECON_MAX_QUEUED_PER_SESSION`` environment variables.
+
+The function is called with a ``JobTrace``, a ``recon_trace.Trace`` that
+the engine records its stages in as usual, which doubles as live progress:
+the stages so far with their rows, and the stage running now. Its CPU
+times are the job thread's own, not the whole server's. Cancelling
+a job takes effect at the next stage boundary, where the trace raises
+``JobCancelled``; a queued job is dropped before it starts. Jobs are found
+again by ``job_id`` with ``get_job``, and finished jobs are forgotten after
+``JOB_RETENTION_SECONDS``. This module must not import Streamlit or
+tkinter.
+"""
+
+import os
+import threading
+import time
+import uuid
+from collections.abc import Callable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+from recon_trace import StageTiming, Trace
+
+MAX_RUNNING_JOBS = int(os.environ.get("RECON_MAX_RUNNING_JOBS", 2))
+MAX_QUEUED_JOBS = int(os.environ.get("RECON_MAX_QUEUED_JOBS", 8))
+MAX_QUEUED_PER_SESSION = int(os.environ.get("RECON_MAX_QUEUED_PER_SESSION", 2))
+JOB_RETENTION_SECONDS = 3600
+
+STATE_QUEUED = "queued"
+STATE_RUNNING = "running"
+STATE_DONE = "done"
+STATE_FAILED = "failed"
+STATE_CANCELLED = "cancelled"
+
+
+class JobCancelled(Exception):
+    """Raised inside a job at the first stage boundary after it was cancelled."""
+
+
+class JobQueueFull(RuntimeError):
+    """Raised by ``submit_job`` when too many jobs are already waiting."""
+
+
+@dataclass
+class JobTrace(Trace):
+    """A trace that also tracks the stages in progress and stops the job once it is cancelled."""
+
+    cpu_scope: str = "thread"  # other jobs and the UI share the process
+    cancel_event: threading.Event = field(default_factory=threading.Event, repr=False)
+    active: list[StageTiming] = field(default_factory=list, repr=False)
+
+    def check_cancelled(self) -> None:
+        if self.cancel_event.is_set():
+            raise JobCancelled("The comparison was cancelled")
+
+    @contextmanager
+    def stage(self, name: str, rows: int | None = None) -> Iterator[StageTiming]:
+        self.check_cancelled()
+        with super().stage(name, rows) as timing:
+            self.active.append(timing)
+            try:
+                yield timing
+            finally:
+                self.active.remove(timing)
+        self.check_cancelled()
+
+
+@dataclass
+class ComparisonJob:
+    """One submitted job. Poll ``state`` and read ``result`` / ``error`` once it is finished."""
+
+    job_id: str
+    label: str
+    session: str | None = None
+    trace: JobTrace = field(default_factory=JobTrace)
+    submitted: float = field(default_factory=time.time)
+    started: float | None = None
+    finished: float | None = None
+    future: Future | None = field(default=None, repr=False)
+
+    @property
+    def state(self) -> str:
+        if self.future is None or not self.future.done():
+            return STATE_QUEUED if self.started is None else STATE_RUNNING
+        if self.future.cancelled() or isinstance(self.future.exception(), JobCancelled):
+            return STATE_CANCELLED
+        return STATE_FAILED if self.future.exception() is not None else STATE_DONE
+
+    @property
+    def done(self) -> bool:
+        return self.state in (STATE_DONE, STATE_FAILED, STATE_CANCELLED)
+
+    @property
+    def error(self) -> BaseException | None:
+        return self.future.exception() if self.state == STATE_FAILED else None
+
+    @property
+    def result(self):
+        return self.future.result()
+
+    @property
+    def current_stage(self) -> str | None:
+        """The innermost stage running now, or ``None``."""
+        active = list(self.trace.active)
+        return active[-1].stage if active else None
+
+    @property
+    def elapsed_seconds(self) -> float:
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.time()) - self.started
+
+    @property
+    def queue_position(self) -> int:
+        """How many jobs were queued before this one and have not started yet (0 once it has started)."""
+        if self.started is not None:
+            return 0
+        with _lock:
+            return sum(1 for job in _queued if job.submitted < self.submitted)
+
+    def cancel(self) -> None:
+        """Stop the job: drop it if it has not started, otherwise at its next stage boundary."""
+        self.trace.cancel_event.set()
+        if self.future is not None and self.future.cancel():
+            self.finished = time.time()
+            with _lock:
+                if self in _queued:
+                    _queued.remove(self)
+
+
+_executor = ThreadPoolExecutor(max_workers=MAX_RUNNING_JOBS, thread_name_prefix="recon-job")
+_lock = threading.Lock()
+_jobs: dict[str, ComparisonJob] = {}
+_queued: list[ComparisonJob] = []
+
+
+def _prune() -> None:
+    cutoff = time.time() - JOB_RETENTION_SECONDS
+    for job_id, job in list(_jobs.items()):
+        if job.finished is not None and job.finished < cutoff:
+            del _jobs[job_id]
+
+
+def submit_job(
+    func: Callable[[JobTrace], object], label: str = "Comparison", session: str | None = None
+) -> ComparisonJob:
+    """Queue ``func(trace)`` on the shared executor and return its job.
+
+    ``func`` runs on a worker thread and must not touch UI state; what it
+    returns becomes the job's ``result``. ``session`` identifies the
+    submitting user for the per-session queue limit.
+    """
+    job = ComparisonJob(job_id=uuid.uuid4().hex, label=label, session=session)
+
+    def _run():
+        with _lock:
+            if job in _queued:
+                _queued.remove(job)
+        job.started = time.time()
+        try:
+            job.trace.check_cancelled()
+            return func(job.trace)
+        finally:
+            job.finished = time.time()
+
+    with _lock:
+        _prune()
+        if len(_queued) >= MAX_QUEUED_JOBS:
+            raise JobQueueFull(f"{len(_queued)} comparisons are already waiting; try again shortly")
+        if session is not None and sum(1 for queued in _queued if queued.session == session) >= MAX_QUEUED_PER_SESSION:
+            raise JobQueueFull(f"You already have {MAX_QUEUED_PER_SESSION} comparisons waiting; try again shortly")
+        _queued.append(job)
+        _jobs[job.job_id] = job
+        job.future = _executor.submit(_run)
+    return job
+
+
+def get_job(job_id: str | None) -> ComparisonJob | None:
+    """Return the job with ``job_id`` if it is still known."""
+    with _lock:
+        return _jobs.get(job_id) if job_id else None
+
+
+def forget_job(job_id: str) -> None:
+    """Drop a job once its result has been collected."""
+    with _lock:
+        _jobs.pop(job_id, None)
+
+
+def job_counts() -> tuple[int, int]:
+    """Return the number of running and queued jobs across all sessions."""
+    with _lock:
+        running = sum(1 for job in _jobs.values() if job.started is not None and job.finished is None)
+        return running, len(_queued)
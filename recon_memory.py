@@ -0,0 +1,106 @@
+"""Compact column dtypes and per-stage memory reporting for the compare pipeline.
+
+Ledger extracts are read as strings, but most pass-through columns (business
+unit, ledger, description codes) hold a few hundred distinct values across
+millions of rows. ``compact_frame`` turns such columns into categoricals,
+which group and merge on integer codes, and parses compare columns into
+float64 once. Columns with many distinct values keep their string dtype.
+``MemoryReport`` records the size of the frames at each stage of a run so
+the effect can be checked on real files, and ``row_bytes`` samples the
+memory per row for size estimates. This module must not import
+Streamlit or tkinter.
+"""
+
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+CATEGORY_MAX_RATIO = 0.5  # largest share of distinct values for which a categorical pays off
+_CATEGORY_SAMPLE_ROWS = 10_000
+
+
+def _category_candidate(values: pd.Series, max_ratio: float) -> bool:
+    """Return whether a string column has few enough distinct values to be stored as a categorical."""
+    if not (pd.api.types.is_object_dtype(values.dtype) or pd.api.types.is_string_dtype(values.dtype)):
+        return False
+    # A sample with many distinct values rules the column out without hashing all of it.
+    sample = values.iloc[:_CATEGORY_SAMPLE_ROWS]
+    if len(values) > len(sample) and sample.nunique(dropna=False) > max_ratio * len(sample):
+        return False
+    return values.nunique(dropna=False) <= max_ratio * len(values)
+
+
+def compact_frame(
+    frame: pd.DataFrame,
+    numeric_columns: list[str] = (),
+    skip_columns: list[str] = (),
+    category_max_ratio: float = CATEGORY_MAX_RATIO,
+) -> pd.DataFrame:
+    """Return ``frame`` with compact dtypes; the input is not modified.
+
+    ``numeric_columns`` are parsed as float64, unparseable values becoming
+    NaN as with ``pd.to_numeric(errors="coerce")``. Other string columns with
+    at most ``category_max_ratio`` distinct values per row become
+    categoricals with sorted categories, so they sort as the strings did.
+    ``skip_columns`` are left as they are, e.g. key columns that are
+    factorized anyway.
+    """
+    compact = frame.copy(deep=False)
+    for column in frame.columns:
+        if column in numeric_columns:
+            compact[column] = pd.to_numeric(frame[column], errors="coerce")
+        elif column not in skip_columns and _category_candidate(frame[column], category_max_ratio):
+            compact[column] = frame[column].astype("category")
+    return compact
+
+
+def frame_bytes(*frames: pd.DataFrame) -> int:
+    """Return the memory held by ``frames``, including the strings they reference."""
+    return sum(int(frame.memory_usage(index=True, deep=True).sum()) for frame in frames)
+
+
+def row_bytes(frame: pd.DataFrame, sample_rows: int = _CATEGORY_SAMPLE_ROWS) -> float:
+    """Return the average memory per row of ``frame``, measured on its first ``sample_rows`` rows."""
+    sample = frame.iloc[:sample_rows]
+    if sample.empty:
+        return 0.0
+    return int(sample.memory_usage(index=False, deep=True).sum()) / len(sample)
+
+
+@dataclass
+class StageMemory:
+    """The size of the frames one pipeline stage produced."""
+
+    stage: str
+    rows: int
+    bytes: int
+
+
+@dataclass
+class MemoryReport:
+    """Per-stage frame sizes of one comparison, filled in as the pipeline runs."""
+
+    stages: list[StageMemory] = field(default_factory=list)
+
+    def record(self, stage: str, *frames: pd.DataFrame) -> None:
+        self.stages.append(StageMemory(stage, sum(len(frame) for frame in frames), frame_bytes(*frames)))
+
+    def to_frame(self, baseline: "MemoryReport | None" = None) -> pd.DataFrame:
+        """Return the stages as a table, next to the same stages of ``baseline`` if given."""
+        table = pd.DataFrame(
+            {
+                "Stage": [stage.stage for stage in self.stages],
+                "Rows": [stage.rows for stage in self.stages],
+                "MB": [stage.bytes / 1e6 for stage in self.stages],
+            }
+        )
+        if baseline is None:
+            return table
+        before = {stage.stage: stage.bytes / 1e6 for stage in baseline.stages}
+        table.insert(2, "MB before", table["Stage"].map(before))
+        table = table.rename(columns={"MB": "MB after"})
+        table["Reduction %"] = (1 - table["MB after"] / table["MB before"]) * 100
+        return table
+
+    def text(self, baseline: "MemoryReport | None" = None) -> str:
+        return self.to_frame(baseline).to_string(index=False, float_format=lambda value: f"{value:,.1f}")
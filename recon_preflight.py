@@ -0,0 +1,127 @@
+"""Pre-merge estimates of key cardinality, duplicate fan-out and result size.
+
+Without aggregation every pair of rows that share a key survives the outer
+merge, so a key repeated 1,000 times on each side yields a million rows.
+``estimate_merge`` counts the rows per key on each side from the factorized
+comparison keys (an exact count, no sketch needed once keys are dense
+integers) and predicts the merged row count both with and without
+aggregation, plus the memory the result would take. ``check_merge_budget``
+refuses a merge whose estimate exceeds a budget. This module must not
+import Streamlit or tkinter.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+DEFAULT_MERGE_BUDGET_MB = 4096
+
+
+@dataclass
+class MergeEstimate:
+    """Key statistics of both sides and the predicted size of their merge.
+
+    ``grouped_rows`` is the merge size when duplicate keys are aggregated
+    first (one row per distinct key), ``ungrouped_rows`` the size when every
+    row is merged as is. ``row_bytes`` is the estimated memory per result
+    row, from a sample of the columns as read.
+    """
+
+    first_rows: int
+    second_rows: int
+    first_keys: int
+    second_keys: int
+    shared_keys: int
+    first_duplicate_keys: int
+    second_duplicate_keys: int
+    first_max_rows_per_key: int
+    second_max_rows_per_key: int
+    grouped_rows: int
+    ungrouped_rows: int
+    row_bytes: float
+    distinct_list: bool = True
+
+    @property
+    def merged_rows(self) -> int:
+        """The predicted result rows for the estimate's ``distinct_list`` setting."""
+        return self.grouped_rows if self.distinct_list else self.ungrouped_rows
+
+    @property
+    def merged_mb(self) -> float:
+        return self.merged_rows * self.row_bytes / (1024 * 1024)
+
+    def text(self) -> str:
+        """Return the estimate as a few readable lines."""
+        lines = [
+            f"First file: {self.first_rows:,} rows, {self.first_keys:,} distinct keys, "
+            f"{self.first_duplicate_keys:,} repeated (up to {self.first_max_rows_per_key:,} rows per key)",
+            f"Second file: {self.second_rows:,} rows, {self.second_keys:,} distinct keys, "
+            f"{self.second_duplicate_keys:,} repeated (up to {self.second_max_rows_per_key:,} rows per key)",
+            f"Keys in both files: {self.shared_keys:,}",
+            f"Merged result: {self.merged_rows:,} rows, about {self.merged_mb:,.1f} MB",
+        ]
+        if self.ungrouped_rows > self.grouped_rows and self.distinct_list:
+            lines.append(f"Without aggregating duplicate keys the merge would produce {self.ungrouped_rows:,} rows")
+        elif self.ungrouped_rows > self.grouped_rows:
+            lines.append(f"Aggregating duplicate keys would give {self.grouped_rows:,} rows")
+        return "\n".join(lines)
+
+
+class MergeBudgetExceeded(ValueError):
+    """Raised instead of running a merge whose estimated result exceeds the memory budget."""
+
+    def __init__(self, estimate: MergeEstimate, budget_mb: float):
+        self.estimate = estimate
+        self.budget_mb = budget_mb
+        message = (
+            f"The merge would produce about {estimate.merged_rows:,} rows (~{estimate.merged_mb:,.1f} MB), "
+            f"over the {budget_mb:,g} MB budget"
+        )
+        if not estimate.distinct_list and estimate.ungrouped_rows > estimate.grouped_rows:
+            message += f"; aggregating duplicate keys would give {estimate.grouped_rows:,} rows"
+        super().__init__(message)
+
+
+def estimate_merge(
+    first_ids: np.ndarray,
+    second_ids: np.ndarray,
+    key_count: int,
+    row_bytes: float,
+    distinct_list: bool = True,
+) -> MergeEstimate:
+    """Estimate the outer merge of two sides from their dense key numbers.
+
+    ``first_ids`` / ``second_ids`` hold one key number in ``0 .. key_count - 1``
+    per row, as ``recon_engine.ComparisonKeys`` provides. Row counts are
+    exact: the ungrouped merge has ``first * second`` rows for each shared
+    key and one row per row of a one-sided key.
+    """
+    first_counts = np.bincount(first_ids, minlength=key_count)
+    second_counts = np.bincount(second_ids, minlength=key_count)
+    first_present, second_present = first_counts > 0, second_counts > 0
+    ungrouped_rows = (
+        int(np.dot(first_counts, second_counts))
+        + int(first_counts[~second_present].sum())
+        + int(second_counts[~first_present].sum())
+    )
+    return MergeEstimate(
+        first_rows=len(first_ids),
+        second_rows=len(second_ids),
+        first_keys=int(first_present.sum()),
+        second_keys=int(second_present.sum()),
+        shared_keys=int((first_present & second_present).sum()),
+        first_duplicate_keys=int((first_counts > 1).sum()),
+        second_duplicate_keys=int((second_counts > 1).sum()),
+        first_max_rows_per_key=int(first_counts.max(initial=0)),
+        second_max_rows_per_key=int(second_counts.max(initial=0)),
+        grouped_rows=int((first_present | second_present).sum()),
+        ungrouped_rows=ungrouped_rows,
+        row_bytes=row_bytes,
+        distinct_list=distinct_list,
+    )
+
+
+def check_merge_budget(estimate: MergeEstimate, budget_mb: float | None) -> None:
+    """Raise ``MergeBudgetExceeded`` if the estimated result is larger than ``budget_mb``."""
+    if budget_mb is not None and estimate.merged_mb > budget_mb:
+        raise MergeBudgetExceeded(estimate, budget_mb)
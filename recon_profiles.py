@@ -0,0 +1,71 @@
+"""Saved comparison profiles stored in ``config_profiles.json``.
+
+A profile names the match keys and compare column of each file, the
+tolerance, and optionally extra display columns to carry into the result.
+``exact_scale``, when set, compares amounts exactly as integer units with
+that many decimal places (see ``recon_amounts``). ``measures`` lists
+further column pairs to compare on the same keys, each a dict with
+``first``, ``second``, ``tolerance_type`` and ``tolerance_value``.
+``backend`` picks the comparison engine: ``"pandas"`` (the default),
+``"arrow"`` for the multithreaded engine in ``recon_arrow`` or ``"sql"``
+for the disk-spilling engine in ``recon_sql``.
+This module must not import Streamlit or tkinter.
+"""
+
+import json
+import os
+
+PROFILES_FILE = "config_profiles.json"
+
+
+def load_profiles(path: str = PROFILES_FILE) -> dict:
+    """Return all saved configuration profiles from disk."""
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_profile(name: str, config: dict) -> None:
+    """Persist a named configuration profile to disk."""
+    profiles = load_profiles()
+    profiles[name] = config
+    with open(PROFILES_FILE, "w") as f:
+        json.dump(profiles, f, indent=2)
+
+
+def delete_profile(name: str) -> None:
+    """Remove a named configuration profile from disk."""
+    profiles = load_profiles()
+    profiles.pop(name, None)
+    with open(PROFILES_FILE, "w") as f:
+        json.dump(profiles, f, indent=2)
+
+
+def profile_columns(profile: dict, side: str) -> list[str]:
+    """Return the columns a profile needs from one file, in a stable order.
+
+    ``side`` is ``"first"`` or ``"second"``. Loading only these columns is
+    enough to run the profile's comparison.
+    """
+    columns = [
+        *profile.get(f"match_keys_{side}", []),
+        profile.get(f"compare_col_{side}"),
+        *(measure.get(side) for measure in profile.get("measures") or []),
+        *profile.get(f"display_cols_{side}", []),
+    ]
+    return [column for column in dict.fromkeys(columns) if column]
+
+
+def profile_measures(profile: dict) -> list:
+    """Return the profile's additional measures as ``recon_engine.Measure`` objects."""
+    from recon_engine import Measure  # imported lazily so listing profiles does not load pandas
+
+    measures = []
+    for entry in profile.get("measures") or []:
+        tolerance_type = entry.get("tolerance_type")
+        if tolerance_type in (None, "None"):
+            measures.append(Measure(entry["first"], entry["second"]))
+        else:
+            measures.append(Measure(entry["first"], entry["second"], tolerance_type, entry.get("tolerance_value")))
+    return measures
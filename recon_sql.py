@@ -0,0 +1,353 @@
+"""Out-of-core reconciliation in an embedded database.
+
+``align_sql`` loads both sides into DuckDB when it is installed and SQLite
+otherwise, each in a database file in a temporary directory, and does the
+key normalization, the per-key sums and the full outer join in SQL. The
+database spills to disk, so neither side, the aggregates nor the join has
+to fit in memory at once; only the joined result, one row per key, is read
+back. That result is finished by ``recon_engine.finish_alignment``, so
+it has the same columns, ``attrs`` and alignment as the pandas engine.
+
+Key parts are stripped of the same whitespace ``str.strip`` removes, and
+sides with a different number of key columns are joined on the
+``"a | b"`` key text, as in the pandas engine. Only ``distinct_list=True``
+is supported. Compare columns are parsed as they are loaded. Float sums
+are compensated (``fsum``), so they do not depend on the order rows are
+added in; exact amounts are summed as integers. Display columns come back
+as text. This module must not import Streamlit or tkinter.
+"""
+
+import math
+import os
+import sqlite3
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from recon_amounts import scaled_amounts, validate_scale
+from recon_engine import (
+    KEY_SEPARATOR,
+    Alignment,
+    Measure,
+    finish_alignment,
+    plan_columns,
+)
+from recon_trace import Trace, traced
+
+BACKEND_DUCKDB = "duckdb"
+BACKEND_SQLITE = "sqlite"
+DEFAULT_MEMORY_BUDGET_MB = 1024
+DEFAULT_CHUNK_ROWS = 100_000
+# Everything str.strip() removes, so keys normalize exactly as in the pandas engine.
+_WHITESPACE = "".join(character for character in map(chr, range(0x3001)) if character.isspace())
+
+
+def duckdb_available() -> bool:
+    try:
+        import duckdb  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def resolve_backend(backend: str | None = None) -> str:
+    """Return ``"duckdb"`` or ``"sqlite"``; ``None`` picks DuckDB when it is installed."""
+    if backend is None:
+        return BACKEND_DUCKDB if duckdb_available() else BACKEND_SQLITE
+    if backend not in (BACKEND_DUCKDB, BACKEND_SQLITE):
+        raise ValueError(f"Unknown SQL backend '{backend}'; expected {BACKEND_DUCKDB} or {BACKEND_SQLITE}")
+    if backend == BACKEND_DUCKDB and not duckdb_available():
+        raise ValueError("The duckdb backend needs the duckdb package")
+    return backend
+
+
+class _ExactSum:
+    """SQLite aggregate adding floats without rounding error, like ``math.fsum`` but a row at a time."""
+
+    def __init__(self):
+        self.partials: list[float] = []
+        self.seen = False
+
+    def step(self, value) -> None:
+        if value is None:
+            return
+        self.seen = True
+        partials = []
+        value = float(value)
+        for partial in self.partials:
+            if abs(value) < abs(partial):
+                value, partial = partial, value
+            high = value + partial
+            low = partial - (high - value)
+            if low:
+                partials.append(low)
+            value = high
+        partials.append(value)
+        self.partials = partials
+
+    def finalize(self) -> float | None:
+        return math.fsum(self.partials) if self.seen else None
+
+
+def _connect(backend: str, workdir: str, memory_budget_mb: int):
+    path = os.path.join(workdir, f"recon.{backend}")
+    if backend == BACKEND_DUCKDB:
+        import duckdb
+
+        connection = duckdb.connect(path)
+        connection.execute(f"SET memory_limit = '{int(memory_budget_mb)}MB'")
+        connection.execute(f"SET temp_directory = '{workdir}'")
+        connection.execute("SET preserve_insertion_order = false")
+        return connection
+    connection = sqlite3.connect(path)
+    connection.create_aggregate("fsum", 1, _ExactSum)
+    # A scratch database: no journal or fsync, sorts and temporary tables go to disk past the cache.
+    connection.execute("PRAGMA journal_mode = OFF")
+    connection.execute("PRAGMA synchronous = OFF")
+    connection.execute("PRAGMA temp_store = FILE")
+    connection.execute(f"PRAGMA cache_size = -{int(memory_budget_mb) * 1024}")
+    return connection
+
+
+def _side_columns(
+    frame: pd.DataFrame, pk: list[str], values: list[str], display: list[str], exact_scale: int | None
+) -> pd.DataFrame:
+    """Return a chunk of one side with positional column names, keys as text and values parsed."""
+    columns = {}
+    for position, column in enumerate(pk):
+        part = frame[column]
+        columns[f"k{position}"] = np.where(part.isna(), None, part.astype(str).astype(object))
+    for position, column in enumerate(values):
+        if exact_scale is None:
+            columns[f"v{position}"] = pd.to_numeric(frame[column], errors="coerce").astype("Float64")
+        else:
+            columns[f"v{position}"] = scaled_amounts(frame[column], exact_scale)
+    for position, column in enumerate(display):
+        part = frame[column]
+        columns[f"d{position}"] = np.where(part.isna(), None, part.astype(str).astype(object))
+    return pd.DataFrame(columns, index=frame.index)
+
+
+def _load(
+    connection,
+    backend: str,
+    table: str,
+    frame: pd.DataFrame,
+    pk: list[str],
+    values: list[str],
+    display: list[str],
+    exact_scale: int | None,
+    chunk_rows: int,
+) -> None:
+    """Create ``table`` and insert ``frame`` into it chunk by chunk, with a row number in ``rid``."""
+    value_type = "DOUBLE" if exact_scale is None else "BIGINT"
+    definitions = [
+        "rid BIGINT PRIMARY KEY" if backend == BACKEND_DUCKDB else "rid INTEGER PRIMARY KEY",
+        *(f"k{position} TEXT" for position in range(len(pk))),
+        *(f"v{position} {value_type}" for position in range(len(values))),
+        *(f"d{position} TEXT" for position in range(len(display))),
+    ]
+    connection.execute(f"CREATE TABLE {table} ({', '.join(definitions)})")
+    placeholders = ", ".join("?" * len(definitions))
+    for start in range(0, len(frame), chunk_rows):
+        chunk = _side_columns(frame.iloc[start : start + chunk_rows], pk, values, display, exact_scale)
+        chunk.insert(0, "rid", np.arange(start, start + len(chunk), dtype=np.int64))
+        if backend == BACKEND_DUCKDB:
+            connection.register("recon_chunk", chunk)
+            connection.execute(f"INSERT INTO {table} SELECT * FROM recon_chunk")
+            connection.unregister("recon_chunk")
+        else:
+            rows = zip(*(chunk[column].astype(object).where(chunk[column].notna(), None) for column in chunk))
+            connection.executemany(f"INSERT INTO {table} VALUES ({placeholders})", rows)
+
+
+def _aggregate(connection, table: str, parts: list[str], values: int, display: int, exact: bool) -> None:
+    """Create ``{table}_keys`` with one row per key: its parts, summed values and first display rows."""
+    total = "SUM" if exact else "fsum"
+    select = [
+        *(f"{expression} AS p{position}" for position, expression in enumerate(parts)),
+        *(f"COALESCE({total}(v{position}), 0) AS v{position}" for position in range(values)),
+        *(f"MIN(CASE WHEN d{position} IS NOT NULL THEN rid END) AS r{position}" for position in range(display)),
+    ]
+    group_by = ", ".join(f"p{position}" for position in range(len(parts)))
+    connection.execute(f"CREATE TABLE {table}_keys AS SELECT {', '.join(select)} FROM {table} GROUP BY {group_by}")
+
+
+def _key_parts(pk_legacy: list[str], pk_converted: list[str]) -> tuple[list[str], list[str]]:
+    """Return the SQL expressions of the normalized key parts of each side.
+
+    Sides with the same number of key columns are matched part by part;
+    otherwise on the joined key text, as ``factorize_comparison_keys`` does.
+    """
+
+    def _normalized(position: int) -> str:
+        return f"TRIM(COALESCE(k{position}, ''), '{_WHITESPACE}')"
+
+    if len(pk_legacy) == len(pk_converted):
+        return [_normalized(position) for position in range(len(pk_legacy))], [
+            _normalized(position) for position in range(len(pk_converted))
+        ]
+
+    def _text(count: int) -> list[str]:
+        return [f" || '{KEY_SEPARATOR}' || ".join(_normalized(position) for position in range(count)) or "''"]
+
+    return _text(len(pk_legacy)), _text(len(pk_converted))
+
+
+def _join_sql(
+    parts: int, legacy_names: list[tuple[str, str]], converted_names: list[tuple[str, str]], displays: tuple[int, int]
+) -> str:
+    """Return the full outer join of both aggregates ordered by key text, as a left join plus the unmatched right rows.
+
+    ``legacy_names`` / ``converted_names`` pair each output alias with the
+    aggregate column (``v0``, ``d1``, ...) it comes from.
+    """
+    on = " AND ".join(f"a.p{position} = b.p{position}" for position in range(parts))
+    key_text = f" || '{KEY_SEPARATOR}' || ".join(f"COALESCE(a.p{position}, b.p{position})" for position in range(parts))
+    display_joins = [
+        *(f"LEFT JOIN first_rows AS ad{n} ON ad{n}.rid = a.r{n}" for n in range(displays[0])),
+        *(f"LEFT JOIN second_rows AS bd{n} ON bd{n}.rid = b.r{n}" for n in range(displays[1])),
+    ]
+
+    def _source(side: str, column: str) -> str:
+        return f"{side}d{column[1:]}.{column}" if column.startswith("d") else f"{side}.{column}"
+
+    select = [
+        f"{key_text} AS ckey",
+        *(f"{_source('a', column)} AS {alias}" for alias, column in legacy_names),
+        *(f"{_source('b', column)} AS {alias}" for alias, column in converted_names),
+    ]
+    joins = " ".join(display_joins)
+    matched = f"SELECT {', '.join(select)} FROM first_rows_keys AS a LEFT JOIN second_rows_keys AS b ON {on} {joins}"
+    unmatched = (
+        f"SELECT {', '.join(select)} FROM second_rows_keys AS b LEFT JOIN first_rows_keys AS a ON {on} {joins} "
+        "WHERE a.p0 IS NULL"
+    )
+    return f"SELECT * FROM ({matched} UNION ALL {unmatched}) AS joined ORDER BY ckey"
+
+
+def _fetch(cursor, columns: list[str], integer_columns: set[str], text_columns: set[str], batch_rows: int):
+    """Read a query result in batches into a frame with the given column names."""
+
+    def _column(column: str, values) -> pd.api.extensions.ExtensionArray | np.ndarray:
+        if column in integer_columns:
+            return pd.array(values, dtype="Int64")
+        return np.array(values, dtype=object if column in text_columns else "float64")
+
+    frames = []
+    while rows := cursor.fetchmany(batch_rows):
+        frames.append(pd.DataFrame({column: _column(column, values) for column, values in zip(columns, zip(*rows))}))
+    if not frames:
+        return pd.DataFrame({column: _column(column, []) for column in columns})
+    return pd.concat(frames, ignore_index=True)
+
+
+def align_sql(
+    legacy: pd.DataFrame,
+    converted: pd.DataFrame,
+    pk_legacy: list[str],
+    pk_converted: list[str],
+    match_col_legacy: str,
+    match_col_converted: str,
+    display_legacy: list[str] | None = None,
+    display_converted: list[str] | None = None,
+    exact_scale: int | None = None,
+    measures: list[Measure] | None = None,
+    backend: str | None = None,
+    memory_budget_mb: int = DEFAULT_MEMORY_BUDGET_MB,
+    spill_dir: str | None = None,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    legacy_columns: set[str] | None = None,
+    converted_columns: set[str] | None = None,
+    trace: Trace | None = None,
+) -> Alignment:
+    """Align two dataframes in an embedded database; the result matches ``recon_engine.align_frames``.
+
+    ``backend`` is ``"duckdb"``, ``"sqlite"`` or ``None`` for DuckDB when
+    installed. The database lives in a temporary directory under
+    ``spill_dir`` and may use about ``memory_budget_mb`` of memory before it
+    spills. Sides are loaded ``chunk_rows`` rows at a time.
+    ``legacy_columns`` / ``converted_columns`` are as for ``align_frames``.
+    """
+    backend = resolve_backend(backend)
+    if exact_scale is not None:
+        exact_scale = validate_scale(exact_scale)
+    plan = plan_columns(
+        legacy.columns,
+        converted.columns,
+        pk_legacy,
+        pk_converted,
+        match_col_legacy,
+        match_col_converted,
+        display_legacy,
+        display_converted,
+        measures,
+    )
+    legacy_result = list(dict.fromkeys([*plan.value_legacy, *plan.display_legacy]))
+    converted_result = list(dict.fromkeys([*plan.value_converted, *plan.display_converted]))
+
+    # Output names follow pd.merge: names both sides carry get a side suffix.
+    def _names(result: list[str], other: list[str], values: list[str], suffix: str) -> list[tuple[str, str, str]]:
+        return [
+            (
+                column + suffix if column in other else column,
+                f"v{values.index(column)}" if column in values else f"d{result.index(column) - len(values)}",
+                f"c{suffix}{position}",
+            )
+            for position, column in enumerate(result)
+        ]
+
+    legacy_names = _names(legacy_result, converted_result, plan.value_legacy, "_legacy")
+    converted_names = _names(converted_result, legacy_result, plan.value_converted, "_converted")
+    legacy_parts, converted_parts = _key_parts(pk_legacy, pk_converted)
+
+    with tempfile.TemporaryDirectory(prefix="recon-sql-", dir=spill_dir) as workdir:
+        connection = _connect(backend, workdir, memory_budget_mb)
+        try:
+            sides = (
+                ("first", legacy, pk_legacy, plan.value_legacy, plan.display_legacy, legacy_parts),
+                ("second", converted, pk_converted, plan.value_converted, plan.display_converted, converted_parts),
+            )
+            for side, frame, pk, values, display, parts in sides:
+                with traced(trace, f"load {side} ({backend})", rows=len(frame)):
+                    _load(connection, backend, f"{side}_rows", frame, pk, values, display, exact_scale, chunk_rows)
+                with traced(trace, f"aggregate {side}"):
+                    _aggregate(connection, f"{side}_rows", parts, len(values), len(display), exact_scale is not None)
+
+            with traced(trace, "join") as stage:
+                sql = _join_sql(
+                    len(legacy_parts),
+                    [(alias, column) for _, column, alias in legacy_names],
+                    [(alias, column) for _, column, alias in converted_names],
+                    (len(plan.display_legacy), len(plan.display_converted)),
+                )
+                cursor = connection.execute(sql)
+                aliases = [
+                    "ckey",
+                    *(alias for _, _, alias in legacy_names),
+                    *(alias for _, _, alias in converted_names),
+                ]
+                value_aliases = {alias for _, column, alias in [*legacy_names, *converted_names] if column[0] == "v"}
+                merged_df = _fetch(
+                    cursor,
+                    aliases,
+                    value_aliases if exact_scale is not None else set(),
+                    set(aliases) - value_aliases,
+                    chunk_rows,
+                )
+                stage.rows = len(merged_df)
+        finally:
+            connection.close()
+
+    merged_df.columns = ["Comparison Key", *(name for name, _, _ in [*legacy_names, *converted_names])]
+    return finish_alignment(
+        merged_df,
+        plan,
+        pk_legacy,
+        pk_converted,
+        set(legacy.columns) if legacy_columns is None else legacy_columns,
+        set(converted.columns) if converted_columns is None else converted_columns,
+        exact_scale,
+        trace,
+    )
@@ -0,0 +1,293 @@
+"""Bounded-memory reconciliation for extracts larger than RAM.
+
+Each side is read in chunks and every chunk is reduced to one row per
+comparison key (stripped key parts plus the summed compare column). Those
+partial aggregates are hash-partitioned on the key and spilled to disk, then
+each partition is reconciled on its own with ``compare_frames``. A partition
+whose spill files are still too large for the memory budget is split again
+with a different hash seed before it is loaded.
+
+Only ``distinct_list=True`` semantics are supported, because un-aggregated
+rows cannot be merged without holding a whole side in memory. Partial sums
+are added in chunk order, so float totals can differ from the in-memory
+path in the last few bits. With exact amounts the partial sums are integer
+units, spilled as currency values that convert back to the same units, so
+totals are exact. A compare column that is also a key is kept in the
+result as a ``(First)`` / ``(Second)`` value column, so the result can be
+re-evaluated.
+"""
+
+import math
+import os
+import pickle
+import tempfile
+from collections.abc import Iterator
+
+import pandas as pd
+
+from recon_amounts import scaled_amounts
+from recon_engine import (
+    VALUE_COLUMNS_ATTR,
+    ComparisonResult,
+    alignment_of,
+    compare_frames,
+    comparison_key_text,
+    summarize,
+)
+from recon_export import write_result
+from recon_io import iter_chunks, read_columns
+
+DEFAULT_MEMORY_BUDGET_MB = 512
+DEFAULT_PARTITIONS = 16
+_BYTES_PER_CELL = 64  # rough in-memory size of one object-dtype string cell
+_CHUNK_SHARE = 4  # a chunk may use at most 1/_CHUNK_SHARE of the budget
+_MERGE_EXPANSION = 8  # reconciling a partition needs ~this many times its spill size
+_MAX_SPLIT_DEPTH = 4
+_MAX_SPLIT_FANOUT = 64
+_VALUE = "__value"  # the summed compare column, kept apart from the key parts in case it is also a key
+
+
+def _hash_seed(depth: int) -> str:
+    """Return the 16-character hash key used to partition at ``depth``."""
+    return f"recon-split-{depth:04d}"
+
+
+def _partial_aggregate(
+    chunk: pd.DataFrame, pk: list[str], match_col: str, exact_scale: int | None = None
+) -> pd.DataFrame:
+    """Reduce a chunk to one row per stripped key with the compare column summed into ``_VALUE``."""
+    parts = pd.DataFrame({col: chunk[col].fillna("").astype(str).str.strip().astype(object) for col in pk})
+    if exact_scale is None:
+        parts[_VALUE] = pd.to_numeric(chunk[match_col], errors="coerce").to_numpy()
+        return parts.groupby(pk, sort=False, dropna=False)[_VALUE].sum().reset_index()
+    parts[_VALUE] = scaled_amounts(chunk[match_col], exact_scale).array
+    aggregated = parts.groupby(pk, sort=False, dropna=False)[_VALUE].sum().reset_index()
+    aggregated[_VALUE] = aggregated[_VALUE].to_numpy(dtype="float64") / 10**exact_scale
+    return aggregated
+
+
+def _compare_aggregates(
+    legacy_part: pd.DataFrame,
+    converted_part: pd.DataFrame,
+    pk_legacy: list[str],
+    pk_converted: list[str],
+    match_col_legacy: str,
+    match_col_converted: str,
+    **options,
+) -> pd.DataFrame:
+    """Reconcile two sides' partial aggregates with ``compare_frames``.
+
+    The summed values take their compare column's name back, unless that
+    name is also a key part; then they are compared as ``_VALUE`` and only
+    the result columns are renamed.
+    """
+    if match_col_legacy not in pk_legacy and match_col_converted not in pk_converted:
+        return compare_frames(
+            legacy_part.rename(columns={_VALUE: match_col_legacy}),
+            converted_part.rename(columns={_VALUE: match_col_converted}),
+            pk_legacy,
+            pk_converted,
+            match_col_legacy,
+            match_col_converted,
+            **options,
+        )
+    merged_df = compare_frames(legacy_part, converted_part, pk_legacy, pk_converted, _VALUE, _VALUE, **options)
+    names = {
+        f"{_VALUE} (First)": f"{match_col_legacy} (First)",
+        f"{_VALUE} (Second)": f"{match_col_converted} (Second)",
+    }
+    merged_df.rename(columns=names, inplace=True)
+    merged_df.attrs[VALUE_COLUMNS_ATTR] = tuple(names[column] for column in merged_df.attrs[VALUE_COLUMNS_ATTR])
+    return merged_df
+
+
+def _partition_ids(frame: pd.DataFrame, pk: list[str], partitions: int, depth: int) -> pd.Series:
+    """Hash each row's joined key text into a partition number.
+
+    Hashing the text rather than the individual parts sends equal keys to the
+    same partition even when the two sides use a different number of key
+    columns.
+    """
+    text = comparison_key_text(frame[pk])
+    hashes = pd.util.hash_pandas_object(text, index=False, hash_key=_hash_seed(depth))
+    return hashes % partitions
+
+
+def _spill(frame: pd.DataFrame, pk: list[str], paths: list[str], depth: int) -> None:
+    """Append each row of ``frame`` to the spill file of its hash partition."""
+    if frame.empty:
+        return
+    for partition, rows in frame.groupby(_partition_ids(frame, pk, len(paths), depth), sort=False):
+        with open(paths[int(partition)], "ab") as f:
+            pickle.dump(rows, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _load_spill(path: str) -> Iterator[pd.DataFrame]:
+    if not os.path.exists(path):
+        return
+    with open(path, "rb") as f:
+        while True:
+            try:
+                yield pickle.load(f)
+            except EOFError:
+                return
+
+
+def _read_spill(path: str, columns: list[str]) -> pd.DataFrame:
+    frames = list(_load_spill(path))
+    if not frames:
+        return pd.DataFrame({col: pd.Series(dtype=object) for col in columns})
+    return pd.concat(frames, ignore_index=True)
+
+
+def _spill_size(path: str) -> int:
+    return os.path.getsize(path) if os.path.exists(path) else 0
+
+
+def _chunk_rows_for_budget(budget_bytes: int, columns: int) -> int:
+    return max(1_000, budget_bytes // (_CHUNK_SHARE * _BYTES_PER_CELL * max(columns, 1)))
+
+
+def iter_compare_streaming(
+    legacy_source,
+    converted_source,
+    pk_legacy: list[str],
+    pk_converted: list[str],
+    match_col_legacy: str,
+    match_col_converted: str,
+    tolerance_type: str | None = None,
+    tolerance_value: float | None = None,
+    memory_budget_mb: int = DEFAULT_MEMORY_BUDGET_MB,
+    partitions: int = DEFAULT_PARTITIONS,
+    chunk_rows: int | None = None,
+    spill_dir: str | None = None,
+    exact_scale: int | None = None,
+) -> Iterator[pd.DataFrame]:
+    """Reconcile two file sources partition by partition, yielding merged result frames.
+
+    Each yielded frame has the same columns as ``compare_data`` produces and
+    holds the keys of one hash partition; together they cover every key once.
+    """
+    budget_bytes = memory_budget_mb * 1024 * 1024
+    legacy_columns = set(read_columns(legacy_source))
+    converted_columns = set(read_columns(converted_source))
+    sides = [
+        (legacy_source, pk_legacy, match_col_legacy),
+        (converted_source, pk_converted, match_col_converted),
+    ]
+
+    with tempfile.TemporaryDirectory(prefix="recon-spill-", dir=spill_dir) as workdir:
+
+        def _paths(side: str, name: str, count: int) -> list[str]:
+            return [os.path.join(workdir, f"{name}-{side}-{i}.pkl") for i in range(count)]
+
+        spill_paths = []
+        for side, (source, pk, match_col) in zip(("legacy", "converted"), sides):
+            usecols = list(dict.fromkeys([*pk, match_col]))
+            paths = _paths(side, "p", partitions)
+            rows = chunk_rows or _chunk_rows_for_budget(budget_bytes, len(usecols))
+            for chunk in iter_chunks(source, rows, usecols=usecols):
+                _spill(_partial_aggregate(chunk, pk, match_col, exact_scale), pk, paths, depth=0)
+            spill_paths.append(paths)
+
+        def _reconcile(legacy_path: str, converted_path: str, name: str, depth: int) -> Iterator[pd.DataFrame]:
+            spill_bytes = _spill_size(legacy_path) + _spill_size(converted_path)
+            if spill_bytes == 0:
+                return
+            if spill_bytes * _MERGE_EXPANSION > budget_bytes and depth < _MAX_SPLIT_DEPTH:
+                fanout = min(_MAX_SPLIT_FANOUT, max(2, math.ceil(spill_bytes * _MERGE_EXPANSION / budget_bytes)))
+                legacy_split = _paths("legacy", name, fanout)
+                converted_split = _paths("converted", name, fanout)
+                for path, split, pk in (
+                    (legacy_path, legacy_split, pk_legacy),
+                    (converted_path, converted_split, pk_converted),
+                ):
+                    for frame in _load_spill(path):
+                        _spill(frame, pk, split, depth + 1)
+                    if os.path.exists(path):
+                        os.remove(path)
+                for i in range(fanout):
+                    yield from _reconcile(legacy_split[i], converted_split[i], f"{name}.{i}", depth + 1)
+                return
+
+            legacy_part = _read_spill(legacy_path, [*pk_legacy, _VALUE])
+            converted_part = _read_spill(converted_path, [*pk_converted, _VALUE])
+            yield _compare_aggregates(
+                legacy_part,
+                converted_part,
+                pk_legacy,
+                pk_converted,
+                match_col_legacy,
+                match_col_converted,
+                tolerance_type=tolerance_type,
+                tolerance_value=tolerance_value,
+                distinct_list=True,
+                legacy_columns=legacy_columns,
+                converted_columns=converted_columns,
+                exact_scale=exact_scale,
+            )
+
+        for i in range(partitions):
+            yield from _reconcile(spill_paths[0][i], spill_paths[1][i], f"p{i}", depth=0)
+
+
+def compare_streaming(
+    legacy_source,
+    converted_source,
+    pk_legacy: list[str],
+    pk_converted: list[str],
+    match_col_legacy: str,
+    match_col_converted: str,
+    output_file: str | None = None,
+    tolerance_type: str | None = None,
+    tolerance_value: float | None = None,
+    memory_budget_mb: int = DEFAULT_MEMORY_BUDGET_MB,
+    partitions: int = DEFAULT_PARTITIONS,
+    chunk_rows: int | None = None,
+    spill_dir: str | None = None,
+    output_format: str | None = None,
+    exact_scale: int | None = None,
+) -> ComparisonResult:
+    """Reconcile two file sources within a memory budget and return the combined result.
+
+    Peak memory is bounded by the budget plus the final result, which holds
+    one row per distinct comparison key. The result keeps its alignment, so
+    ``evaluate_alignment`` can apply another tolerance without re-reading.
+    """
+    frames = list(
+        iter_compare_streaming(
+            legacy_source,
+            converted_source,
+            pk_legacy,
+            pk_converted,
+            match_col_legacy,
+            match_col_converted,
+            tolerance_type=tolerance_type,
+            tolerance_value=tolerance_value,
+            memory_budget_mb=memory_budget_mb,
+            partitions=partitions,
+            chunk_rows=chunk_rows,
+            spill_dir=spill_dir,
+            exact_scale=exact_scale,
+        )
+    )
+    if frames:
+        merged_df = pd.concat(frames, ignore_index=True)
+        merged_df.sort_values("Comparison Key", kind="stable", inplace=True, ignore_index=True)
+    else:
+        merged_df = _compare_aggregates(
+            _read_spill("", [*pk_legacy, _VALUE]),
+            _read_spill("", [*pk_converted, _VALUE]),
+            pk_legacy,
+            pk_converted,
+            match_col_legacy,
+            match_col_converted,
+            exact_scale=exact_scale,
+        )
+
+    result = summarize(merged_df)
+    result.alignment = alignment_of(merged_df)
+    if output_file:
+        write_result(merged_df, output_file, output_format, metadata=result.metadata())
+
+    return result
@@ -0,0 +1,168 @@
+"""Per-stage wall time, CPU time, peak memory and row counts of a reconciliation.
+
+A ``Trace`` is passed down the ingest, compare and export paths and each
+stage is recorded with ``traced(trace, name)``. Without a trace
+``traced`` returns one shared do-nothing context manager, so the
+instrumentation costs an ``is None`` check per stage when disabled.
+Stages may nest; a stage is listed before the stages it contains.
+
+Peak memory is the process's resident-set high-water mark when the stage
+ended, and how far the stage raised it, since the operating system keeps
+one high-water mark per process rather than per stage. CPU time and
+memory are this process's own, so work done in worker processes shows up
+as wall time only. With ``cpu_scope="thread"`` CPU time is the recording
+thread's alone, for traces recorded while other work shares the process
+(see ``recon_jobs``); work the stage hands to other threads is then left
+out. This module must not import Streamlit or tkinter.
+"""
+
+import json
+import platform
+import sys
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager, nullcontext
+from dataclasses import asdict, dataclass, field
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+def peak_rss_bytes() -> int | None:
+    """Return the largest resident set size of this process so far, or ``None`` if unavailable."""
+    if sys.platform == "win32":
+        return _windows_peak_rss()
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024  # bytes on macOS, KiB on Linux
+
+
+def _windows_peak_rss() -> int | None:
+    import ctypes
+    from ctypes import wintypes
+
+    class _MemoryCounters(ctypes.Structure):
+        _fields_ = [
+            ("cb", wintypes.DWORD),
+            ("PageFaultCount", wintypes.DWORD),
+            ("PeakWorkingSetSize", ctypes.c_size_t),
+            ("WorkingSetSize", ctypes.c_size_t),
+            ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+            ("PagefileUsage", ctypes.c_size_t),
+            ("PeakPagefileUsage", ctypes.c_size_t),
+        ]
+
+    counters = _MemoryCounters()
+    counters.cb = ctypes.sizeof(counters)
+    kernel32 = ctypes.windll.kernel32
+    kernel32.GetCurrentProcess.restype = wintypes.HANDLE
+    if not kernel32.K32GetProcessMemoryInfo(kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb):
+        return None
+    return counters.PeakWorkingSetSize
+
+
+@dataclass
+class StageTiming:
+    """One recorded stage. ``rows`` is the number of rows the stage produced, where that is meaningful."""
+
+    stage: str
+    depth: int = 0
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    peak_rss_mb: float | None = None
+    peak_rss_growth_mb: float | None = None
+    rows: int | None = None
+    cpu_scope: str = "process"
+
+
+_DISABLED = nullcontext(StageTiming("disabled"))  # shared; whatever callers set on it is ignored
+
+
+@dataclass
+class Trace:
+    """The stages of one reconciliation, in the order they started."""
+
+    stages: list[StageTiming] = field(default_factory=list)
+    cpu_scope: str = "process"  # or "thread": CPU time of the recording thread only
+    _depth: int = field(default=0, repr=False)
+
+    @contextmanager
+    def stage(self, name: str, rows: int | None = None) -> Iterator[StageTiming]:
+        """Record the enclosed block as a stage; set ``rows`` (or rename) on the yielded timing."""
+        timing = StageTiming(name, depth=self._depth, rows=rows, cpu_scope=self.cpu_scope)
+        self.stages.append(timing)
+        self._depth += 1
+        peak_before = peak_rss_bytes()
+        cpu_time = time.thread_time if self.cpu_scope == "thread" else time.process_time
+        wall, cpu = time.perf_counter(), cpu_time()
+        try:
+            yield timing
+        finally:
+            timing.wall_seconds = time.perf_counter() - wall
+            timing.cpu_seconds = cpu_time() - cpu
+            peak_after = peak_rss_bytes()
+            if peak_after is not None:
+                timing.peak_rss_mb = peak_after / (1024 * 1024)
+                timing.peak_rss_growth_mb = (peak_after - (peak_before or 0)) / (1024 * 1024)
+            self._depth -= 1
+
+    def extend(self, stages: list[StageTiming]) -> None:
+        """Append stages recorded elsewhere, e.g. ingest stages from before the run."""
+        self.stages.extend(StageTiming(**asdict(timing)) for timing in stages)
+
+    def to_frame(self) -> "pd.DataFrame":
+        """Return the stages as a table, names indented by nesting depth."""
+        import pandas as pd  # imported lazily so the CLI can time its own imports
+
+        return pd.DataFrame(
+            {
+                "Stage": ["  " * timing.depth + timing.stage for timing in self.stages],
+                "Wall s": [timing.wall_seconds for timing in self.stages],
+                "CPU s": [timing.cpu_seconds for timing in self.stages],
+                "Peak RSS MB": [timing.peak_rss_mb for timing in self.stages],
+                "RSS growth MB": [timing.peak_rss_growth_mb for timing in self.stages],
+                "Rows": pd.array([timing.rows for timing in self.stages], dtype="Int64"),
+            }
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "stages": [asdict(timing) for timing in self.stages],
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), indent=2)
+
+    def text(self) -> str:
+        """Return the stages as an aligned plain-text table."""
+        names = ["  " * timing.depth + timing.stage for timing in self.stages]
+        width = max(map(len, names), default=len("Stage"))
+
+        def _number(value, pattern: str) -> str:
+            return "" if value is None else format(value, pattern)
+
+        header = f"{'Stage':<{width}}  {'Wall s':>8}  {'CPU s':>8}  {'Peak RSS MB':>11}  {'RSS growth MB':>13}"
+        lines = [f"{header}  {'Rows':>11}"]
+        for name, timing in zip(names, self.stages):
+            lines.append(
+                f"{name:<{width}}  {timing.wall_seconds:8.2f}  {timing.cpu_seconds:8.2f}"
+                f"  {_number(timing.peak_rss_mb, ',.1f'):>11}  {_number(timing.peak_rss_growth_mb, ',.1f'):>13}"
+                f"  {_number(timing.rows, ','):>11}"
+            )
+        return "\n".join(lines)
+
+
+def traced(trace: Trace | None, name: str, rows: int | None = None):
+    """Return a context manager recording ``name`` in ``trace``, or a no-op one when ``trace`` is ``None``."""
+    if trace is None:
+        return _DISABLED
+    return trace.stage(name, rows)
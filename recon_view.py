@@ -0,0 +1,162 @@
+"""Server-side filtering, sorting and paging of a comparison result.
+
+``ResultView`` wraps ``ComparisonResult.merged`` without copying it. Status,
+key and dollar-band filters come straight from the result's precomputed
+``ResultIndex``; column filters become boolean masks and sorts become
+argsort orders, both computed once per column and cached. A rerun only
+combines ready-made arrays and materializes the rows of the visible page.
+This module must not import Streamlit or tkinter.
+"""
+
+import re
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from recon_index import ResultIndex
+
+STATUS_ALL = "all"
+STATUS_DIFFERENCES = "differences"
+STATUS_MATCHES = "matches"
+STATUS_FIRST_ONLY = "first only"
+STATUS_SECOND_ONLY = "second only"
+DEFAULT_PAGE_SIZE = 100
+PAGE_SIZES = (50, 100, 250, 500, 1000)
+_CACHED_MASKS = 16
+_NUMERIC_FILTER = re.compile(r"^\s*(<=|>=|!=|<|>|=)?\s*(-?[\d,]*\.?\d+)\s*$")
+_RANGE_FILTER = re.compile(r"^\s*(-?[\d,]*\.?\d+)\s*\.\.\s*(-?[\d,]*\.?\d+)\s*$")
+
+
+def _number(text: str) -> float:
+    return float(text.replace(",", ""))
+
+
+class ResultView:
+    """Filtered, sorted, paged access to a result frame that is never copied."""
+
+    def __init__(self, merged: pd.DataFrame, index: ResultIndex) -> None:
+        self.merged = merged
+        self.index = index
+        self._masks: OrderedDict[tuple, np.ndarray] = OrderedDict()
+        self._orders: dict[tuple[str, bool], np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self.merged)
+
+    def _cached_mask(self, key: tuple, build) -> np.ndarray:
+        if key in self._masks:
+            self._masks.move_to_end(key)
+            return self._masks[key]
+        mask = build()
+        self._masks[key] = mask
+        while len(self._masks) > _CACHED_MASKS:
+            self._masks.popitem(last=False)
+        return mask
+
+    def status_positions(self, status: str) -> np.ndarray | None:
+        """Return the row positions with ``status``, or ``None`` for all rows."""
+        by_status = {
+            STATUS_DIFFERENCES: self.index.unmatched,
+            STATUS_MATCHES: self.index.matched,
+            STATUS_FIRST_ONLY: self.index.first_only,
+            STATUS_SECOND_ONLY: self.index.second_only,
+        }
+        return by_status.get(status)
+
+    def _keep(self, selected: np.ndarray | None, positions: np.ndarray) -> np.ndarray:
+        """Keep the rows of ``selected`` (``None`` meaning every row) that are in ``positions``, in order."""
+        if selected is None:
+            return positions
+        member = np.zeros(len(self.merged), dtype=bool)
+        member[positions] = True
+        return selected[member[selected]]
+
+    def column_mask(self, column: str, expression: str) -> np.ndarray:
+        """Return the rows of ``column`` matching a filter expression.
+
+        Numeric columns take ``>100``, ``<=0``, ``!=5``, ``=5`` / ``5`` or a
+        range ``10..20``; boolean columns take ``true`` / ``false``; other
+        columns match a case-insensitive substring. Raises ``ValueError`` for
+        an expression the column cannot take.
+        """
+        return self._cached_mask(("column", column, expression), lambda: self._build_column_mask(column, expression))
+
+    def _build_column_mask(self, column: str, expression: str) -> np.ndarray:
+        series = self.merged[column]
+        text = expression.strip()
+        if pd.api.types.is_bool_dtype(series.dtype):
+            if text.lower() not in ("true", "false"):
+                raise ValueError(f"Filter '{column}' with true or false")
+            values = series.to_numpy(dtype=bool)
+            return values if text.lower() == "true" else ~values
+        if pd.api.types.is_numeric_dtype(series.dtype):
+            values = series.to_numpy(dtype=float, na_value=np.nan)
+            with np.errstate(invalid="ignore"):
+                range_match = _RANGE_FILTER.match(text)
+                if range_match:
+                    low, high = sorted(_number(bound) for bound in range_match.groups())
+                    return (values >= low) & (values <= high)
+                match = _NUMERIC_FILTER.match(text)
+                if not match:
+                    raise ValueError(f"Filter '{column}' with a number, e.g. >100, <=0 or 10..20")
+                operator, number = match.group(1) or "=", _number(match.group(2))
+                comparisons = {
+                    "<": np.less,
+                    "<=": np.less_equal,
+                    ">": np.greater,
+                    ">=": np.greater_equal,
+                    "=": np.equal,
+                    "!=": np.not_equal,
+                }
+                return comparisons[operator](values, number)
+        return series.astype("string").str.contains(text, case=False, regex=False).to_numpy(dtype=bool, na_value=False)
+
+    def sort_order(self, column: str, descending: bool = False) -> np.ndarray:
+        """Return all row positions ordered by ``column`` (stable, missing values last)."""
+        key = (column, descending)
+        if key not in self._orders:
+            ordered = self.merged[column].reset_index(drop=True).sort_values(
+                ascending=not descending, kind="stable", na_position="last"
+            )
+            self._orders[key] = ordered.index.to_numpy()
+        return self._orders[key]
+
+    def positions(
+        self,
+        status: str = STATUS_ALL,
+        column: str | None = None,
+        expression: str = "",
+        sort_by: str | None = None,
+        descending: bool = False,
+        key: str = "",
+        bucket: int | None = None,
+    ) -> np.ndarray:
+        """Return the row positions passing the filters, in display order.
+
+        ``key`` keeps rows whose comparison key starts with it and ``bucket``
+        the rows in that dollar-difference band of the index.
+        """
+        selected = self.status_positions(status)
+        if key.strip():
+            selected = self._keep(selected, self.index.find_keys(key))
+        if bucket is not None:
+            selected = self._keep(selected, self.index.bucket_positions[bucket])
+        if column and expression.strip():
+            mask = self.column_mask(column, expression)
+            selected = np.flatnonzero(mask) if selected is None else selected[mask[selected]]
+        if not sort_by:
+            return np.arange(len(self.merged)) if selected is None else selected
+        order = self.sort_order(sort_by, descending)
+        return order if selected is None else self._keep(order, selected)
+
+    def page(self, positions: np.ndarray, page: int, page_size: int = DEFAULT_PAGE_SIZE) -> pd.DataFrame:
+        """Return the rows of 1-based ``page`` of ``positions``."""
+        start = (max(page, 1) - 1) * page_size
+        return self.merged.iloc[positions[start : start + page_size]]
+
+    def rows(self, positions: np.ndarray) -> pd.DataFrame:
+        """Return the rows at ``positions``, without copying when they are all rows in order."""
+        if len(positions) == len(self.merged) and np.array_equal(positions, np.arange(len(self.merged))):
+            return self.merged
+        return self.merged.iloc[positions]
@@ -0,0 +1,77 @@
+"""Exact amounts parse like Decimal and compare without float drift."""
+
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from recon_amounts import MAX_SCALE, scaled_amounts, units_threshold, validate_scale
+from recon_engine import TOLERANCE_DOLLAR, TOLERANCE_PERCENTAGE, compare_data
+
+TEXT = ["0.1", "0.2", "-0.125", "0.125", " 12.345 ", "1e3", "2.5E-2", "", None, "x", "nan", "inf",
+        "123456789012345.675", "-0", "7."]  # fmt: skip
+
+
+def _decimal_units(text, scale: int):
+    try:
+        value = Decimal(str(text).strip())
+    except InvalidOperation:
+        return None
+    return int((value * 10**scale).to_integral_value(ROUND_HALF_UP)) if value.is_finite() else None
+
+
+@pytest.mark.parametrize("scale", [0, 2, 3, 4])
+def test_text_matches_decimal(scale):
+    units = scaled_amounts(pd.Series(TEXT, dtype=object), scale)
+    assert units.dtype == "Int64"
+    assert [None if pd.isna(value) else value for value in units] == [_decimal_units(text, scale) for text in TEXT]
+
+
+def test_numeric_columns_round_to_the_nearest_unit():
+    units = scaled_amounts(pd.Series([0.1, 2.675, np.nan, -1.005]), 2)
+    assert units.tolist() == [10, 268, pd.NA, -100]  # 2.675 and -1.005 are stored just off the half
+
+
+def test_index_and_name_are_kept():
+    values = pd.Series(["1.50", "2"], index=[7, 3], name="Amount")
+    units = scaled_amounts(values)
+    assert units.name == "Amount" and units.index.tolist() == [7, 3] and units.tolist() == [150, 200]
+    assert scaled_amounts(values.iloc[:0]).dtype == "Int64"
+
+
+@pytest.mark.parametrize("values", [["99999999999999999999"], [1e30]])
+def test_too_large_amounts_are_rejected(values):
+    with pytest.raises(ValueError):
+        scaled_amounts(pd.Series(values), 2)
+
+
+@pytest.mark.parametrize("scale", [-1, MAX_SCALE + 1, 1.5, True, "2"])
+def test_invalid_scale(scale):
+    with pytest.raises((ValueError, TypeError)):
+        validate_scale(scale)
+
+
+def test_units_threshold_reads_the_printed_decimal():
+    assert units_threshold(0.07, 2) == 7
+    assert units_threshold(1.1, 1) == 11
+    assert units_threshold(0.005, 2) == 0
+
+
+FIRST = pd.DataFrame({"Key": ["a", "a", "b", "c"], "Amount": ["0.1", "0.2", "1.1", "100"]})
+SECOND = pd.DataFrame({"Key": ["a", "b", "c"], "Amount": ["0.3", "1.0", "100.1"]})
+
+
+@pytest.mark.parametrize(
+    "tolerance_type, tolerance_value, expected",
+    [(None, None, [False, True, True]), (TOLERANCE_DOLLAR, 0.1, [False, False, False]),
+     (TOLERANCE_PERCENTAGE, 0.1, [False, True, False])],
+)  # fmt: skip
+def test_exact_comparison_has_no_float_drift(tolerance_type, tolerance_value, expected):
+    options = {"tolerance_type": tolerance_type, "tolerance_value": tolerance_value}
+    exact = compare_data(FIRST, SECOND, ["Key"], ["Key"], "Amount", "Amount", exact_scale=2, **options)
+    assert exact.merged["Difference"].tolist() == expected
+    assert exact.merged.attrs["exact_scale"] == 2
+    assert exact.merged["Dollar Difference"].tolist() == [0.0, 0.1, -0.1]
+    drifted = compare_data(FIRST, SECOND, ["Key"], ["Key"], "Amount", "Amount", **options)
+    assert drifted.merged["Dollar Difference"].tolist() != [0.0, 0.1, -0.1]
@@ -0,0 +1,61 @@
+"""Batch runs of a manifest of file pairs."""
+
+import os
+import pickle
+
+import pandas as pd
+import pytest
+
+from recon_batch import STATUS_ERROR, STATUS_OK, SUMMARY_FILE, load_manifest, run_batch
+from recon_cache import IngestCache
+
+PROFILES = {
+    "P": {
+        "match_keys_first": ["K"],
+        "match_keys_second": ["K"],
+        "compare_col_first": "V",
+        "compare_col_second": "V",
+        "tolerance_type": "None",
+    }
+}
+
+
+@pytest.fixture
+def manifest(tmp_path):
+    pd.DataFrame({"K": ["a", "b", "c"], "V": ["1", "2", "3"]}).to_csv(tmp_path / "first.csv", index=False)
+    pd.DataFrame({"K": ["a", "b"], "V": ["1", "5"]}).to_csv(tmp_path / "second.csv", index=False)
+    rows = [
+        {"first": "first.csv", "second": "second.csv", "profile": "P", "name": "ok"},
+        {"first": "first.csv", "second": "second.csv", "profile": "P", "name": "ok"},
+        {"first": "first.csv", "second": "missing.csv", "profile": "P", "name": "missing file"},
+        {"first": "first.csv", "second": "second.csv", "profile": "Q", "name": "missing profile"},
+    ]
+    pd.DataFrame(rows).to_csv(tmp_path / "pairs.csv", index=False)
+    return str(tmp_path / "pairs.csv")
+
+
+def test_manifest_paths_and_names(manifest):
+    pairs = load_manifest(manifest)
+    assert [pair.name for pair in pairs] == ["ok", "ok-2", "missing file", "missing profile"]
+    assert pairs[0].first == os.path.join(os.path.dirname(manifest), "first.csv")
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_failures_do_not_stop_the_batch(manifest, tmp_path, workers):
+    out_dir = tmp_path / f"out{workers}"
+    outcomes = run_batch(load_manifest(manifest), PROFILES, str(out_dir), ".csv", workers=workers)
+    assert [outcome.status for outcome in outcomes] == [STATUS_OK, STATUS_OK, STATUS_ERROR, STATUS_ERROR]
+    assert (outcomes[0].total_records, outcomes[0].matched_records) == (3, 1)
+    assert "missing.csv" in outcomes[2].error and "'Q' not found" in outcomes[3].error
+    summary = pd.read_csv(out_dir / SUMMARY_FILE)
+    assert summary["name"].tolist() == ["ok", "ok-2", "missing file", "missing profile"]
+    assert os.path.exists(out_dir / "ok.csv") and os.path.exists(out_dir / "ok-2.csv")
+
+
+def test_cache_copies_start_empty(tmp_path):
+    cache = IngestCache(memory_limit_mb=8, cache_dir=str(tmp_path))
+    cache.load(b"data", lambda: pd.DataFrame({"a": ["1"]}))
+    copy = pickle.loads(pickle.dumps(cache))
+    assert copy.stats.entries == 0 and cache.stats.entries == 1
+    assert (copy.cache_dir, copy.memory_limit_bytes) == (cache.cache_dir, cache.memory_limit_bytes)
+    assert copy.load(b"data", lambda: pd.DataFrame()).equals(pd.DataFrame({"a": ["1"]}))  # read back from disk
@@ -0,0 +1,75 @@
+"""Synthetic GL pairs have the requested shape, and suite results can be compared."""
+
+import json
+
+import pytest
+
+from benchmark import SYNTHETIC_PROFILE, SyntheticSpec, _run_case, _synthetic_pair, bench_suite, diff_suites
+from recon_engine import compare_data
+
+KEYS = SYNTHETIC_PROFILE["match_keys_first"]
+
+
+def _key_text(frame, keys):
+    return frame[keys].astype(str).agg("|".join, axis=1)
+
+
+@pytest.mark.parametrize("duplicate_rate, one_sided_rate", [(0.1, 0.02), (0.0, 0.0), (0.5, 0.2)])
+def test_rates(duplicate_rate, one_sided_rate):
+    spec = SyntheticSpec(rows=10_000, duplicate_rate=duplicate_rate, one_sided_rate=one_sided_rate, seed=4)
+    first, second = _synthetic_pair(SYNTHETIC_PROFILE, spec)
+    assert len(first) == len(second) == spec.rows
+    assert list(first.columns) == [*KEYS, "CREDIT"]
+    first_keys, second_keys = set(_key_text(first, KEYS)), set(_key_text(second, KEYS))
+    assert 1 - len(first_keys) / spec.rows == pytest.approx(duplicate_rate, abs=0.01)
+    assert len(first_keys - second_keys) / len(first_keys) == pytest.approx(one_sided_rate, abs=0.01)
+    assert first["CREDIT"].isna().mean() == pytest.approx(spec.nan_rate, abs=0.005)
+
+
+def test_mismatch_rate():
+    spec = SyntheticSpec(rows=10_000, duplicate_rate=0, one_sided_rate=0, nan_rate=0, mismatch_rate=0.2)
+    first, second = _synthetic_pair(SYNTHETIC_PROFILE, spec)
+    result = compare_data(first, second, KEYS, KEYS, "CREDIT", "CREDIT")
+    assert result.total_records == spec.rows
+    assert 1 - result.matched_records / spec.rows == pytest.approx(0.2, abs=0.02)
+
+
+def test_same_seed_same_pair():
+    spec = SyntheticSpec(rows=500, seed=9)
+    first, second = _synthetic_pair(SYNTHETIC_PROFILE, spec)
+    again = _synthetic_pair(SYNTHETIC_PROFILE, spec)
+    assert first.equals(again[0]) and second.equals(again[1])
+
+
+def test_profile_columns_are_generated():
+    profile = {
+        **SYNTHETIC_PROFILE,
+        "match_keys_second": ["BU", "LOC", "ACCT", "DEPT"],
+        "compare_col_second": "AMOUNT",
+        "display_cols_first": ["JOURNAL"],
+        "measures": [{"first": "DEBIT", "second": "DR"}],
+    }
+    first, second = _synthetic_pair(profile, SyntheticSpec(rows=1_000, mismatch_rate=0))
+    assert list(first.columns) == [*KEYS, "CREDIT", "DEBIT", "JOURNAL"]
+    assert list(second.columns) == ["BU", "LOC", "ACCT", "DEPT", "AMOUNT", "DR"]
+    assert set(_key_text(first, KEYS)) & set(_key_text(second, profile["match_keys_second"]))
+
+
+def test_suite_and_diff(tmp_path, capsys):
+    case = _run_case("synthetic", SYNTHETIC_PROFILE, SyntheticSpec(rows=300), "csv", ["parquet", "csv"])
+    assert case["total_records"] > 0 and case["matched_records"] <= case["total_records"]
+    top = [stage["stage"] for stage in case["stages"] if stage["depth"] == 0]
+    assert top == ["ingest first (csv)", "ingest second (csv)", "compare", "export parquet", "export csv"]
+
+    before, after = tmp_path / "before.json", tmp_path / "after.json"
+    bench_suite([200], {"synthetic": SYNTHETIC_PROFILE}, SyntheticSpec(rows=0), "csv", ["parquet"], str(before))
+    report = json.loads(before.read_text())
+    assert [(case["profile"], case["spec"]["rows"]) for case in report["cases"]] == [("synthetic", 200)]
+    for case in report["cases"]:
+        for stage in case["stages"]:
+            stage["wall_seconds"] *= 2
+    after.write_text(json.dumps(report))
+    capsys.readouterr()
+    diff_suites(str(before), str(after))
+    lines = capsys.readouterr().out.splitlines()
+    assert any(line.strip().startswith("compare") and line.endswith("2.00x") for line in lines)
@@ -0,0 +1,45 @@
+"""The ingest cache serves a parsed frame only for the same bytes and read options."""
+
+import io
+
+import openpyxl
+import pytest
+
+from recon_cache import IngestCache, read_cached
+from recon_io import ENGINE_CALAMINE, ENGINE_OPENPYXL, calamine_available
+
+
+@pytest.fixture
+def workbook() -> bytes:
+    book = openpyxl.Workbook()
+    sheet = book.active
+    for row in (["K", "V"], ["a", "  "], ["b", "1"]):
+        sheet.append(row)
+    buffer = io.BytesIO()
+    book.save(buffer)
+    return buffer.getvalue()
+
+
+def test_second_read_comes_from_the_cache(workbook):
+    cache = IngestCache()
+    first = read_cached(io.BytesIO(workbook), engine=ENGINE_OPENPYXL, cache=cache)
+    second = read_cached(io.BytesIO(workbook), engine=ENGINE_OPENPYXL, cache=cache)
+    assert (first.engine, second.engine) == (ENGINE_OPENPYXL, "cache")
+    assert second.frame.equals(first.frame)
+
+
+def test_columns_are_part_of_the_key(workbook):
+    cache = IngestCache()
+    read_cached(io.BytesIO(workbook), engine=ENGINE_OPENPYXL, cache=cache)
+    projected = read_cached(io.BytesIO(workbook), usecols=["K"], engine=ENGINE_OPENPYXL, cache=cache)
+    assert projected.engine == ENGINE_OPENPYXL
+    assert list(projected.frame.columns) == ["K"]
+
+
+@pytest.mark.skipif(not calamine_available(), reason="python-calamine is not installed")
+def test_engine_is_part_of_the_key(workbook):
+    cache = IngestCache()
+    read_cached(io.BytesIO(workbook), engine=ENGINE_CALAMINE, cache=cache)
+    result = read_cached(io.BytesIO(workbook), engine=ENGINE_OPENPYXL, cache=cache)
+    assert result.engine == ENGINE_OPENPYXL
+    assert result.frame["V"].tolist() == ["  ", "1"]  # calamine reads the whitespace-only cell as blank
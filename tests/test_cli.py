@@ -0,0 +1,107 @@
+"""The command-line runner."""
+
+import json
+
+import pandas as pd
+import pytest
+
+from recon_cli import EXIT_DIFFERENCES, main
+from recon_engine import compare_data
+
+PROFILE = {
+    "match_keys_first": ["K"],
+    "match_keys_second": ["K"],
+    "compare_col_first": "V",
+    "compare_col_second": "V",
+    "tolerance_type": "None",
+}
+FIRST = pd.DataFrame({"K": ["a", "b", "c"], "V": ["1", "2", "3"], "Unused": ["x", "y", "z"]})
+SECOND = pd.DataFrame({"K": ["a", "b", "d"], "V": ["1", "5", "4"]})
+
+
+@pytest.fixture
+def files(tmp_path):
+    FIRST.to_csv(tmp_path / "first.csv", index=False)
+    SECOND.to_csv(tmp_path / "second.csv", index=False)
+    SECOND.iloc[[0]].to_csv(tmp_path / "same.csv", index=False)
+    FIRST.iloc[[0]].to_csv(tmp_path / "first_same.csv", index=False)
+    with open(tmp_path / "profiles.json", "w") as f:
+        json.dump({"P": PROFILE, "M": {**PROFILE, "measures": [{"first": "V", "second": "V"}]}}, f)
+    return tmp_path
+
+
+def _main(files, *argv) -> int:
+    return main(["--profiles-file", str(files / "profiles.json"), *argv])
+
+
+def _run(files, *argv, first="first.csv", second="second.csv") -> int:
+    return _main(files, "run", "--profile", "P", "--first", str(files / first), "--second", str(files / second), *argv)
+
+
+def test_run_writes_the_compare_data_result(files, capsys):
+    assert _run(files, "--out", str(files / "result.parquet"), "--trace-out", str(files / "trace.json")) == 0
+    expected = compare_data(FIRST, SECOND, ["K"], ["K"], "V", "V")
+    pd.testing.assert_frame_equal(pd.read_parquet(files / "result.parquet"), expected.merged, check_dtype=False)
+    output = capsys.readouterr().out
+    assert "Matched records: 1" in output and "Stages:" in output
+    assert [stage["stage"] for stage in json.load(open(files / "trace.json"))["stages"]][0] == "import"
+
+
+def test_fail_on_differences(files):
+    assert _run(files, "--fail-on-differences", "--quiet") == EXIT_DIFFERENCES
+    assert _run(files, "--fail-on-differences", "--quiet", first="first_same.csv", second="same.csv") == 0
+
+
+@pytest.mark.parametrize(
+    "argv",
+    [
+        ["--out", "result.txt"],
+        ["--delta", "--low-memory"],
+        ["--backend", "arrow", "--delta"],
+    ],
+)
+def test_invalid_options_are_usage_errors(files, argv):
+    with pytest.raises(SystemExit) as exit_info:
+        _run(files, *argv)
+    assert exit_info.value.code == 2
+
+
+def test_unknown_profile_is_a_usage_error(files):
+    with pytest.raises(SystemExit):
+        _main(files, "run", "--profile", "Nope", "--first", "a.csv", "--second", "b.csv")
+
+
+def test_missing_file_is_an_error(files, capsys):
+    assert _run(files, "--quiet", second="missing.csv") == 1
+    assert "error:" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize("argv", [["--low-memory"], ["--backend", "sqlite"], ["--memory-report"]])
+def test_engines_agree(files, capsys, argv):
+    assert _run(files, "--quiet", *argv) == 0
+    assert "Matched records: 1" in capsys.readouterr().out
+
+
+def test_delta_reports_changes(files, capsys):
+    snapshots = str(files / "snapshots")
+    assert _run(files, "--delta", "--snapshot-dir", snapshots, "--quiet") == 0
+    assert "new baseline" in capsys.readouterr().out
+    SECOND.assign(V=["1", "2", "4"]).to_csv(files / "second.csv", index=False)
+    changes = str(files / "changes.csv")
+    assert _run(files, "--delta", "--snapshot-dir", snapshots, "--changes-out", changes, "--quiet") == 0
+    output = capsys.readouterr().out
+    assert "Keys changed: 1" in output and "Newly matched: 1" in output
+    assert pd.read_csv(changes)["Comparison Key"].tolist() == ["b"]
+
+
+def test_batch_and_profiles(files, capsys):
+    pd.DataFrame([{"first": "first.csv", "second": "second.csv", "profile": "P"}]).to_csv(
+        files / "pairs.csv", index=False
+    )
+    out_dir = files / "out"
+    manifest = str(files / "pairs.csv")
+    assert _main(files, "batch", "--manifest", manifest, "--out-dir", str(out_dir), "--format", "csv") == 0
+    assert "Pairs: 1 reconciled, 0 failed" in capsys.readouterr().out
+    assert (out_dir / "batch_summary.csv").exists()
+    assert _main(files, "profiles") == 0
+    assert capsys.readouterr().out.splitlines() == ["P: keys [K], compare V / V", "M: keys [K], compare V / V, V / V"]
@@ -0,0 +1,74 @@
+"""Delta runs patch the previous result to what a full comparison gives."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from recon_delta import reconcile_delta
+from recon_engine import TOLERANCE_DOLLAR, compare_data
+
+PROFILE = {
+    "match_keys_first": ["A", "B"],
+    "match_keys_second": ["K"],
+    "compare_col_first": "V",
+    "compare_col_second": "V",
+    "tolerance_type": TOLERANCE_DOLLAR,
+    "tolerance_value": 0.5,
+}
+FIRST = pd.DataFrame({"A": ["x", "y", "y", "z"], "B": ["1", "2", "2", "3"], "V": ["1", "2", "3", "4"]})
+SECOND = pd.DataFrame({"K": ["x | 1", "y | 2", "z | 3", "w | 4"], "V": ["1", "5", "4", "9"]})
+
+
+def _full(first: pd.DataFrame, second: pd.DataFrame) -> pd.DataFrame:
+    result = compare_data(
+        first, second, ["A", "B"], ["K"], "V", "V", tolerance_type=TOLERANCE_DOLLAR, tolerance_value=0.5
+    )
+    merged = result.merged
+    return merged.iloc[merged["Comparison Key"].astype(str).argsort(kind="stable")].reset_index(drop=True)
+
+
+def _delta(tmp_path, first: pd.DataFrame, second: pd.DataFrame):
+    return reconcile_delta("P", PROFILE, lambda: first, lambda: second, snapshot_dir=str(tmp_path))
+
+
+def _assert_same(actual: pd.DataFrame, expected: pd.DataFrame) -> None:
+    assert list(actual.columns) == list(expected.columns)
+    for column in expected.columns:
+        left, right = expected[column], actual[column]
+        if pd.api.types.is_float_dtype(left):
+            assert np.allclose(left.to_numpy(float), right.to_numpy(float), equal_nan=True), column
+        else:
+            assert left.tolist() == right.tolist(), column
+
+
+def test_first_run_is_a_baseline(tmp_path):
+    delta = _delta(tmp_path, FIRST, SECOND)
+    assert delta.report.baseline
+    _assert_same(delta.result.merged, _full(FIRST, SECOND))
+
+
+@pytest.mark.parametrize(
+    "first, second, added, removed, changed",
+    [
+        # A changed value of a key whose sides have a different number of key columns.
+        (FIRST.assign(V=["1", "2", "1", "4"]), SECOND, 0, 0, 1),
+        (FIRST, SECOND.assign(V=["1", "3", "4", "9"]), 0, 0, 1),
+        # An added key on one side and a key removed from both.
+        (pd.concat([FIRST, pd.DataFrame({"A": ["v"], "B": ["5"], "V": ["7"]})]), SECOND, 1, 0, 0),
+        (FIRST.iloc[[0, 1, 2]], SECOND.iloc[[0, 1, 3]], 0, 1, 0),
+    ],
+)
+def test_delta_matches_full_comparison(tmp_path, first, second, added, removed, changed):
+    _delta(tmp_path, FIRST, SECOND)
+    delta = _delta(tmp_path, first, second)
+    _assert_same(delta.result.merged, _full(first, second))
+    report = delta.report
+    assert (report.keys_added, report.keys_removed, report.keys_changed) == (added, removed, changed)
+
+
+def test_changed_key_keeps_its_other_side(tmp_path):
+    _delta(tmp_path, FIRST, SECOND)
+    delta = _delta(tmp_path, FIRST.assign(V=["1", "2", "1", "4"]), SECOND)
+    row = delta.result.merged.set_index("Comparison Key").loc["y | 2"]
+    assert (row["V (First)"], row["V (Second)"], row["Dollar Difference"]) == (3.0, 5.0, -2.0)
+    assert (delta.report.newly_matched, delta.report.newly_unmatched) == (0, 1)  # it matched at 5 against 5
@@ -0,0 +1,67 @@
+"""The columnar difference engine matches the row-wise rules it replaced."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmark import TOLERANCE_CASES, _rowwise_differences, _synthetic_values
+from recon_engine import TOLERANCE_DOLLAR, TOLERANCE_PERCENTAGE, evaluate_differences
+
+# Each pair exercises one rule: equal, within and beyond a tolerance, exactly on it,
+# a zero first value, blanks on either or both sides, and negative amounts.
+EDGE_CASES = pd.DataFrame(
+    {
+        "first": [100.0, 100.0, 100.0, 100.0, 0.0, 0.0, np.nan, 50.0, np.nan, -200.0, -200.0, 0.01],
+        "second": [100.0, 104.0, 105.0, 200.0, 0.0, 3.0, 50.0, np.nan, np.nan, -190.0, 200.0, 0.02],
+    }
+)
+
+ALL_TOLERANCES = [
+    *TOLERANCE_CASES,
+    (TOLERANCE_DOLLAR, 0.0),
+    (TOLERANCE_DOLLAR, 5.0),
+    (TOLERANCE_PERCENTAGE, 0.0),
+    (TOLERANCE_PERCENTAGE, 10.0),
+]
+
+
+def _assert_matches_rowwise(frame: pd.DataFrame, tolerance_type, tolerance_value) -> None:
+    expected = _rowwise_differences(frame, tolerance_type, tolerance_value)
+    actual = evaluate_differences(frame["first"], frame["second"], tolerance_type, tolerance_value)
+    for name, reference, got in zip(("Difference", "Dollar Difference", "Percentage Difference"), expected, actual):
+        assert np.array_equal(np.asarray(reference, dtype=float), np.asarray(got, dtype=float), equal_nan=True), name
+
+
+@pytest.mark.parametrize("tolerance_type, tolerance_value", ALL_TOLERANCES)
+def test_edge_cases_match_rowwise(tolerance_type, tolerance_value):
+    _assert_matches_rowwise(EDGE_CASES, tolerance_type, tolerance_value)
+
+
+@pytest.mark.parametrize("tolerance_type, tolerance_value", ALL_TOLERANCES)
+def test_synthetic_values_match_rowwise(tolerance_type, tolerance_value):
+    _assert_matches_rowwise(_synthetic_values(2_000, seed=7), tolerance_type, tolerance_value)
+
+
+@pytest.mark.parametrize("tolerance_type, tolerance_value", ALL_TOLERANCES)
+def test_blank_side_is_always_a_difference(tolerance_type, tolerance_value):
+    difference, dollar, percentage = evaluate_differences(
+        pd.Series([np.nan, 50.0, np.nan]), pd.Series([50.0, np.nan, np.nan]), tolerance_type, tolerance_value
+    )
+    assert difference.tolist() == [True, True, True]
+    assert dollar.tolist() == [-50.0, 50.0, 0.0]  # a blank counts as zero
+    assert np.isnan(percentage).all()
+
+
+def test_zero_first_value_falls_back_to_equality():
+    difference, _, percentage = evaluate_differences(
+        pd.Series([0.0, 0.0]), pd.Series([0.0, 0.001]), TOLERANCE_PERCENTAGE, 50.0
+    )
+    assert difference.tolist() == [False, True]
+    assert np.isnan(percentage).all()
+
+
+def test_tolerance_boundary_is_not_a_difference():
+    difference, _, _ = evaluate_differences(pd.Series([100.0]), pd.Series([105.0]), TOLERANCE_DOLLAR, 5.0)
+    assert not difference[0]
+    difference, _, _ = evaluate_differences(pd.Series([100.0]), pd.Series([105.0]), TOLERANCE_PERCENTAGE, 5.0)
+    assert not difference[0]
@@ -0,0 +1,77 @@
+"""The single-pass Excel writer matches the write-then-reformat workbook it replaced."""
+
+import io
+
+import numpy as np
+import openpyxl
+import pandas as pd
+import pytest
+
+from benchmark import _reformat_reference
+from recon_engine import compare_data
+from recon_export import RESULTS_SHEET, write_excel
+
+FIRST = pd.DataFrame(
+    {"Key": ["a", "b", "c", "d", "e"], "Amount": ["1", "2", "3.5", "", "-4"], "Memo": ["m1", None, "m3", "m4", "m5"]}
+)
+SECOND = pd.DataFrame({"Key": ["a", "b", "c", "f"], "Amount": ["1", "2.5", "3", "7"]})
+
+
+@pytest.fixture
+def merged():
+    return compare_data(FIRST, SECOND, ["Key"], ["Key"], "Amount", "Amount", display_legacy=["Memo"]).merged
+
+
+def _cells(worksheet):
+    """Cell values and number formats; the reference also formats empty cells, so those compare by value only."""
+    return [
+        [(cell.value, cell.number_format if cell.value is not None else None) for cell in row]
+        for row in worksheet.iter_rows()
+    ]
+
+
+def test_matches_reference_values_and_formats(merged, tmp_path):
+    write_excel(merged, tmp_path / "fast.xlsx")
+    _reformat_reference(merged, str(tmp_path / "reference.xlsx"))
+    fast = openpyxl.load_workbook(tmp_path / "fast.xlsx")
+    reference = openpyxl.load_workbook(tmp_path / "reference.xlsx")
+    assert fast.sheetnames == [RESULTS_SHEET]
+    assert _cells(fast.active) == _cells(reference.active)
+
+
+def test_number_formats(merged, tmp_path):
+    write_excel(merged.assign(**{"DEBIT Dollar Difference": merged["Dollar Difference"]}), tmp_path / "out.xlsx")
+    worksheet = openpyxl.load_workbook(tmp_path / "out.xlsx").active
+    formats = {cell.value: worksheet.cell(row=2, column=cell.column).number_format for cell in worksheet[1]}
+    assert formats["Dollar Difference"] == formats["DEBIT Dollar Difference"] == "$#,##0.00"
+    assert formats["Percentage Difference"] == "0.00%"
+    assert formats["Comparison Key"] == "General"
+
+
+def test_buffer_matches_path(merged, tmp_path):
+    buffer = io.BytesIO()
+    write_excel(merged, buffer)
+    write_excel(merged, tmp_path / "out.xlsx")
+    from_buffer = openpyxl.load_workbook(io.BytesIO(buffer.getvalue())).active
+    assert _cells(from_buffer) == _cells(openpyxl.load_workbook(tmp_path / "out.xlsx").active)
+
+
+def test_long_results_continue_on_extra_sheets(tmp_path):
+    frame = pd.DataFrame({"Key": [f"k{i}" for i in range(7)], "Dollar Difference": np.arange(7, dtype=float)})
+    progress = []
+    write_excel(frame, tmp_path / "out.xlsx", max_rows_per_sheet=4, progress=lambda *done: progress.append(done))
+    workbook = openpyxl.load_workbook(tmp_path / "out.xlsx")
+    assert workbook.sheetnames == [RESULTS_SHEET, f"{RESULTS_SHEET} (2)", f"{RESULTS_SHEET} (3)"]
+    rows = [list(row) for sheet in workbook for row in sheet.iter_rows(values_only=True)]
+    assert rows == [
+        ["Key", "Dollar Difference"], ["k0", 0], ["k1", 1], ["k2", 2],
+        ["Key", "Dollar Difference"], ["k3", 3], ["k4", 4], ["k5", 5],
+        ["Key", "Dollar Difference"], ["k6", 6],
+    ]  # fmt: skip
+    assert progress[-1] == (7, 7)
+
+
+def test_empty_result_writes_the_header(merged, tmp_path):
+    write_excel(merged.iloc[:0], tmp_path / "out.xlsx")
+    rows = list(openpyxl.load_workbook(tmp_path / "out.xlsx").active.iter_rows(values_only=True))
+    assert rows == [tuple(merged.columns)]
@@ -0,0 +1,109 @@
+"""Parquet, Arrow, CSV and gzip CSV exports carry the same rows and summary."""
+
+import gzip
+import io
+import time
+import zipfile
+
+import pandas as pd
+import pyarrow.feather as feather
+import pytest
+
+from recon_engine import compare_data
+from recon_export import (
+    FORMAT_ARROW,
+    FORMAT_CSV,
+    FORMAT_CSV_GZ,
+    FORMAT_PARQUET,
+    FORMAT_XLSX,
+    METADATA_KEY,
+    read_result_metadata,
+    resolve_format,
+    start_export,
+    write_result,
+)
+
+FIRST = pd.DataFrame({"Key": ["a", "b", "c"], "Amount": ["1", "2", "3"]})
+SECOND = pd.DataFrame({"Key": ["a", "b", "d"], "Amount": ["1", "2.5", "4"]})
+
+
+@pytest.fixture
+def result():
+    return compare_data(FIRST, SECOND, ["Key"], ["Key"], "Amount", "Amount")
+
+
+def _read(path_or_buffer, output_format) -> pd.DataFrame:
+    if output_format == FORMAT_PARQUET:
+        return pd.read_parquet(path_or_buffer)
+    if output_format == FORMAT_ARROW:
+        return feather.read_feather(path_or_buffer)
+    return pd.read_csv(path_or_buffer, compression="gzip" if output_format == FORMAT_CSV_GZ else None)
+
+
+@pytest.mark.parametrize(
+    "name, expected",
+    [
+        ("out.xlsx", FORMAT_XLSX),
+        ("out.parquet", FORMAT_PARQUET),
+        ("OUT.PQ", FORMAT_PARQUET),
+        ("out.arrow", FORMAT_ARROW),
+        ("out.feather", FORMAT_ARROW),
+        ("out.csv", FORMAT_CSV),
+        ("out.csv.gz", FORMAT_CSV_GZ),
+        ("out.txt", FORMAT_XLSX),
+    ],
+)
+def test_format_from_extension(name, expected):
+    assert resolve_format(name) == expected
+
+
+def test_format_from_parameter():
+    assert resolve_format("out.xlsx", "parquet") == resolve_format("out.xlsx", ".parquet") == FORMAT_PARQUET
+    assert resolve_format("out.xlsx", ".feather") == FORMAT_ARROW
+    with pytest.raises(ValueError):
+        resolve_format("out.xlsx", "json")
+
+
+@pytest.mark.parametrize("extension", [".parquet", ".arrow", ".csv", ".csv.gz"])
+def test_output_file_round_trips(result, tmp_path, extension):
+    path = tmp_path / f"result{extension}"
+    compare_data(FIRST, SECOND, ["Key"], ["Key"], "Amount", "Amount", output_file=str(path))
+    written = _read(path, resolve_format(path))
+    pd.testing.assert_frame_equal(written, result.merged.reset_index(drop=True), check_dtype=False)
+
+
+@pytest.mark.parametrize("output_format", [FORMAT_PARQUET, FORMAT_ARROW])
+def test_summary_is_embedded(result, tmp_path, output_format):
+    path = tmp_path / f"result.{output_format}"
+    write_result(result.merged, path, metadata=result.metadata())
+    metadata = read_result_metadata(path)
+    assert metadata["total_records"] == result.total_records == 4
+    assert metadata["matched_records"] == result.matched_records == 1
+    assert metadata["unmatched_records"] == 3
+    assert METADATA_KEY == "reconciliation"
+
+
+def test_summary_is_stored_in_excel_properties(result):
+    buffer = io.BytesIO()
+    write_result(result.merged, buffer, FORMAT_XLSX, metadata=result.metadata())
+    custom = zipfile.ZipFile(buffer).read("docProps/custom.xml").decode()
+    assert 'name="matched_records"' in custom and "<vt:i4>1</vt:i4>" in custom
+
+
+def test_gzip_csv_is_compressed(result, tmp_path):
+    write_result(result.merged, tmp_path / "result.csv.gz")
+    write_result(result.merged, tmp_path / "result.csv")
+    with gzip.open(tmp_path / "result.csv.gz", "rb") as f:
+        assert f.read() == (tmp_path / "result.csv").read_bytes()
+
+
+@pytest.mark.parametrize("output_format", [FORMAT_PARQUET, FORMAT_CSV_GZ, FORMAT_XLSX])
+def test_background_export(result, output_format):
+    job = start_export(result.merged, output_format, metadata=result.metadata())
+    deadline = time.monotonic() + 30
+    while not job.done and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert job.done and job.error is None and job.progress == 1.0
+    assert [stage.stage for stage in job.trace.stages] == [f"export {output_format}"]
+    if output_format != FORMAT_XLSX:
+        assert len(_read(io.BytesIO(job.data), output_format)) == result.total_records
@@ -0,0 +1,96 @@
+"""The precomputed result index and the filters built on it agree with a scan of the result."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from recon_engine import compare_data
+from recon_index import DOLLAR_BUCKET_EDGES, build_result_index, dollar_bucket_labels
+from recon_view import STATUS_ALL, STATUS_DIFFERENCES, STATUS_FIRST_ONLY, STATUS_MATCHES, STATUS_SECOND_ONLY, ResultView
+
+RNG = np.random.default_rng(3)
+KEYS = [f"{prefix}{i:03d}" for prefix in ("AB", "Ac", "b") for i in range(40)]
+FIRST = pd.DataFrame({"Key": KEYS[:100], "Amount": RNG.choice([1, 50, 500, 20_000], 100).astype(str)})
+SECOND = pd.DataFrame({"Key": KEYS[20:], "Amount": RNG.choice([1, 50.5, 500, 0.005], 100).astype(str)})
+STATUSES = [STATUS_ALL, STATUS_DIFFERENCES, STATUS_MATCHES, STATUS_FIRST_ONLY, STATUS_SECOND_ONLY]
+
+
+@pytest.fixture(scope="module")
+def result():
+    return compare_data(FIRST, SECOND, ["Key"], ["Key"], "Amount", "Amount")
+
+
+@pytest.fixture
+def view(result):
+    return ResultView(result.merged, result.index)
+
+
+def test_status_positions(result):
+    merged, index = result.merged, result.index
+    difference = merged["Difference"].to_numpy(dtype=bool)
+    assert np.array_equal(index.matched, np.flatnonzero(~difference))
+    assert np.array_equal(index.unmatched, np.flatnonzero(difference))
+    keys = merged["Comparison Key"].to_numpy()
+    assert keys[index.first_only].tolist() == KEYS[:20]
+    assert keys[index.second_only].tolist() == KEYS[100:]
+
+
+@pytest.mark.parametrize("text", ["a", "AB", "ac01", " b03 ", "z", ""])
+def test_find_keys_is_a_case_insensitive_prefix(result, text):
+    keys = result.merged["Comparison Key"].str.lower()
+    expected = np.flatnonzero(keys.str.startswith(text.strip().lower()).to_numpy())
+    assert np.array_equal(result.index.find_keys(text), expected)
+
+
+def test_buckets_partition_the_rows(result):
+    index = result.index
+    dollars = np.abs(result.merged["Dollar Difference"].to_numpy(dtype=float))
+    bounds = (0.0, *DOLLAR_BUCKET_EDGES, np.inf)
+    assert len(index.bucket_positions) == len(index.bucket_labels()) == len(DOLLAR_BUCKET_EDGES) + 1
+    for positions, low, high in zip(index.bucket_positions, bounds, bounds[1:]):
+        assert ((dollars[positions] >= low) & (dollars[positions] < high)).all()
+    assert sorted(np.concatenate(index.bucket_positions).tolist()) == list(range(len(dollars)))
+
+
+def test_bucket_labels():
+    assert dollar_bucket_labels((0.01, 100.0)) == ["< $0.01", "$0.01 – $100", "≥ $100"]
+
+
+def test_reuse_keeps_keys_and_rebuilds_status(result):
+    merged = result.merged.assign(Difference=~result.merged["Difference"])
+    reused = build_result_index(merged, reuse=result.index)
+    assert np.array_equal(reused.matched, result.index.unmatched)
+    assert reused.key_order is result.index.key_order
+    assert reused.bucket_positions is result.index.bucket_positions
+
+
+@pytest.mark.parametrize("status", STATUSES)
+@pytest.mark.parametrize("sort_by, descending", [(None, False), ("Dollar Difference", True), ("Comparison Key", False)])
+def test_positions_match_a_scan(view, status, sort_by, descending):
+    merged = view.merged.reset_index(drop=True)
+    first, second = merged["Amount (First)"], merged["Amount (Second)"]
+    keep = {
+        STATUS_ALL: pd.Series(True, index=merged.index),
+        STATUS_DIFFERENCES: merged["Difference"],
+        STATUS_MATCHES: ~merged["Difference"],
+        STATUS_FIRST_ONLY: first.notna() & second.isna(),
+        STATUS_SECOND_ONLY: first.isna() & second.notna(),
+    }[status]
+    dollars = merged["Dollar Difference"].abs()
+    keep &= merged["Comparison Key"].str.lower().str.startswith("a") & (dollars >= 1) & (dollars < 100)
+    expected = merged[keep]
+    if sort_by:
+        expected = expected.sort_values(sort_by, ascending=not descending, kind="stable", na_position="last")
+    positions = view.positions(status, key="a", bucket=2, sort_by=sort_by, descending=descending)
+    assert positions.tolist() == expected.index.tolist()
+
+def test_sort_order_and_paging(view):
+    order = view.sort_order("Dollar Difference", descending=True)
+    dollars = view.merged["Dollar Difference"].to_numpy(dtype=float)[order]
+    assert (np.diff(dollars[~np.isnan(dollars)]) <= 0).all()
+    positions = view.positions(sort_by="Dollar Difference", descending=True)
+    pages = [view.page(positions, page, page_size=50) for page in (1, 2, 3)]
+    assert [len(page) for page in pages] == [50, 50, 20]
+    assert pd.concat(pages)["Comparison Key"].tolist() == view.merged["Comparison Key"].to_numpy()[order].tolist()
+    assert view.page(positions, 4, page_size=50).empty
+    assert view.rows(np.arange(len(view))) is view.merged
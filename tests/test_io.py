@@ -0,0 +1,95 @@
+"""Workbook and CSV reading matches pandas' string parsing."""
+
+import io
+from datetime import datetime
+
+import openpyxl
+import pandas as pd
+import pytest
+
+from recon_io import (
+    ENGINE_CALAMINE,
+    ENGINE_OPENPYXL,
+    calamine_available,
+    iter_chunks,
+    read_columns,
+    read_frame,
+)
+
+ROWS = [
+    ["Key", "Amount", "Amount", None, "Posted"],
+    ["a", 1, 1.5, "x", datetime(2024, 1, 31)],
+    ["b", 2.0, -3.25, None, datetime(2024, 2, 1, 12, 30)],
+    [None, None, None, None, None],
+    ["c", "0012", 1e-3, "y", None],
+    [None, None, None, None, None],
+]
+
+
+def _workbook(name: str = "ledger.xlsx") -> io.BytesIO:
+    book = openpyxl.Workbook()
+    for row in ROWS:
+        book.active.append(row)
+    buffer = io.BytesIO()
+    book.save(buffer)
+    buffer.seek(0)
+    buffer.name = name
+    return buffer
+
+
+def _expected(usecols=None) -> pd.DataFrame:
+    return pd.read_excel(_workbook(), dtype=str, usecols=usecols, engine="openpyxl")
+
+
+def _values(frame: pd.DataFrame) -> list[list]:
+    return [[None if pd.isna(value) else value for value in row] for row in frame.itertuples(index=False)]
+
+
+def _assert_frames_equal(actual: pd.DataFrame, expected: pd.DataFrame) -> None:
+    assert list(actual.columns) == list(expected.columns)
+    assert _values(actual) == _values(expected)
+
+
+def test_streamed_xlsx_matches_read_excel():
+    result = read_frame(_workbook(), engine=ENGINE_OPENPYXL)
+    assert result.engine == ENGINE_OPENPYXL
+    _assert_frames_equal(result.frame, _expected())
+
+
+def test_projected_columns():
+    projected = read_frame(_workbook(), usecols=["Key", "Amount.1"], engine=ENGINE_OPENPYXL)
+    _assert_frames_equal(projected.frame, _expected(["Key", "Amount.1"]))
+    with pytest.raises(ValueError, match="Missing"):
+        read_frame(_workbook(), usecols=["Key", "Missing"], engine=ENGINE_OPENPYXL)
+
+
+def test_chunks_add_up_to_the_frame():
+    chunks = list(iter_chunks(_workbook(), 2))
+    assert [len(chunk) for chunk in chunks] == [2, 2]
+    _assert_frames_equal(pd.concat(chunks, ignore_index=True), _expected())
+
+
+def test_header_only():
+    assert read_columns(_workbook()) == ["Key", "Amount", "Amount.1", "Unnamed: 3", "Posted"]
+
+
+def test_csv_is_read_as_strings():
+    source = io.BytesIO(b"Key,Amount\na,0012\nb,\n")
+    source.name = "ledger.csv"
+    result = read_frame(source, engine=ENGINE_OPENPYXL)
+    assert result.engine == "csv"
+    assert result.frame["Amount"].tolist()[0] == "0012"
+    assert result.frame["Amount"].isna().tolist() == [False, True]
+
+
+@pytest.mark.skipif(not calamine_available(), reason="python-calamine is not installed")
+def test_calamine_matches_openpyxl_on_values():
+    columns = ["Key", "Amount", "Amount.1"]
+    calamine = read_frame(_workbook(), engine=ENGINE_CALAMINE).frame
+    assert _values(calamine[columns]) == _values(read_frame(_workbook(), engine=ENGINE_OPENPYXL).frame[columns])
+
+
+def test_calamine_needs_its_package(monkeypatch):
+    monkeypatch.setattr("recon_io.calamine_available", lambda: False)
+    with pytest.raises(ValueError, match="python-calamine"):
+        read_frame(_workbook(), engine=ENGINE_CALAMINE)
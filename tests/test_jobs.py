@@ -0,0 +1,139 @@
+"""Background jobs run in bounded slots, respect the queue limits and stop when cancelled."""
+
+import threading
+import time
+
+import pytest
+
+import recon_jobs
+from recon_jobs import (
+    MAX_RUNNING_JOBS,
+    STATE_CANCELLED,
+    STATE_DONE,
+    STATE_FAILED,
+    STATE_QUEUED,
+    STATE_RUNNING,
+    JobQueueFull,
+    forget_job,
+    get_job,
+    job_counts,
+    submit_job,
+)
+
+
+def _wait_for(condition, timeout: float = 10.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+@pytest.fixture
+def release():
+    """An event blocking jobs that wait on it; set at teardown so no job outlives its test."""
+    event = threading.Event()
+    jobs = []
+    yield event, jobs
+    event.set()
+    for job in jobs:
+        _wait_for(lambda: job.done)
+
+
+def _blocking(event):
+    def _func(trace):
+        with trace.stage("waiting"):
+            event.wait(10)
+        return "released"
+
+    return _func
+
+
+def _fill_running_slots(release) -> list:
+    event, jobs = release
+    blockers = [submit_job(_blocking(event), label="blocker") for _ in range(MAX_RUNNING_JOBS)]
+    jobs.extend(blockers)
+    _wait_for(lambda: all(job.state == STATE_RUNNING for job in blockers))
+    return blockers
+
+
+def test_job_runs_and_records_its_stages():
+    def _func(trace):
+        with trace.stage("work", rows=3):
+            pass
+        return 42
+
+    job = submit_job(_func, label="answer")
+    _wait_for(lambda: job.done)
+    assert (job.state, job.result, job.error) == (STATE_DONE, 42, None)
+    assert [(stage.stage, stage.rows, stage.cpu_scope) for stage in job.trace.stages] == [("work", 3, "thread")]
+    assert job.elapsed_seconds >= 0 and job.current_stage is None
+    assert get_job(job.job_id) is job
+    forget_job(job.job_id)
+    assert get_job(job.job_id) is None and get_job(None) is None
+
+
+def test_failed_job_keeps_its_error():
+    def _func(trace):
+        raise ValueError("bad column")
+
+    job = submit_job(_func)
+    _wait_for(lambda: job.done)
+    assert job.state == STATE_FAILED
+    assert isinstance(job.error, ValueError)
+
+
+def test_jobs_wait_for_a_free_slot(release):
+    event, jobs = release
+    _fill_running_slots(release)
+    queued = [submit_job(lambda trace: "queued") for _ in range(2)]
+    jobs.extend(queued)
+    assert [job.state for job in queued] == [STATE_QUEUED, STATE_QUEUED]
+    assert [job.queue_position for job in queued] == [0, 1]
+    assert job_counts() == (MAX_RUNNING_JOBS, 2)
+    event.set()
+    _wait_for(lambda: all(job.done for job in queued))
+    assert [job.result for job in queued] == ["queued", "queued"]
+
+
+def test_queue_limits(release, monkeypatch):
+    _, jobs = release
+    monkeypatch.setattr(recon_jobs, "MAX_QUEUED_JOBS", 3)
+    monkeypatch.setattr(recon_jobs, "MAX_QUEUED_PER_SESSION", 1)
+    _fill_running_slots(release)
+    jobs.append(submit_job(lambda trace: None, session="a"))
+    with pytest.raises(JobQueueFull, match="You already have 1"):
+        submit_job(lambda trace: None, session="a")
+    jobs.append(submit_job(lambda trace: None, session="b"))
+    jobs.append(submit_job(lambda trace: None))
+    with pytest.raises(JobQueueFull, match="3 comparisons are already waiting"):
+        submit_job(lambda trace: None, session="c")
+
+
+def test_cancel_a_queued_job(release):
+    _, jobs = release
+    _fill_running_slots(release)
+    ran = threading.Event()
+    job = submit_job(lambda trace: ran.set())
+    jobs.append(job)
+    job.cancel()
+    assert job.state == STATE_CANCELLED and job.done
+    assert job_counts()[1] == 0
+    assert not ran.is_set()
+
+
+def test_cancel_a_running_job():
+    steps = []
+
+    def _func(trace):
+        for step in range(1_000):
+            with trace.stage(f"step {step}"):
+                steps.append(step)
+                time.sleep(0.005)
+
+    job = submit_job(_func)
+    _wait_for(lambda: len(steps) > 2)
+    assert job.state == STATE_RUNNING and job.current_stage.startswith("step ")
+    job.cancel()
+    _wait_for(lambda: job.done)
+    assert job.state == STATE_CANCELLED and job.error is None
+    assert len(steps) < 1_000
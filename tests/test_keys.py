@@ -0,0 +1,64 @@
+"""Comparison keys: normalization, matching across sides and result order."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmark import _rowwise_keys
+from recon_engine import compare_data, comparison_key_text, factorize_comparison_keys
+
+# "a" sorts before "a b" as a value, but "a | z" sorts after "a b | c" as key text.
+FIRST = pd.DataFrame(
+    {
+        "A": ["a", "a b", " a ", None, "c", "c", "a"],
+        "B": ["z", "c", "y", "x", None, "", "z "],
+        "V": ["1", "2", "3", "4", "5", "6", "7"],
+    }
+)
+SECOND = pd.DataFrame({"A": ["a b", "a", "", "d"], "B": ["c", "z", "x", "w"], "V": ["2", "8", "4", "1"]})
+
+
+def _key_text(keys, codes: np.ndarray) -> list[str]:
+    return keys.text(codes).tolist()
+
+
+def test_keys_are_stripped_and_missing_parts_are_blank():
+    keys = factorize_comparison_keys(FIRST[["A", "B"]], SECOND[["A", "B"]])
+    assert _key_text(keys, keys.legacy_codes) == ["a | z", "a b | c", "a | y", " | x", "c | ", "c | ", "a | z"]
+    assert _key_text(keys, keys.legacy_codes) == _rowwise_keys(FIRST[["A", "B"]]).tolist()
+    assert keys.legacy_codes[0] == keys.legacy_codes[6] == keys.converted_codes[1]
+    assert keys.legacy_codes[4] == keys.legacy_codes[5]  # a missing part equals a blank one
+    assert keys.legacy_codes[3] == keys.converted_codes[2]
+
+
+def test_codes_sort_like_the_key_text():
+    keys = factorize_comparison_keys(FIRST[["A", "B"]], SECOND[["A", "B"]])
+    text = _key_text(keys, keys.unique_codes)
+    assert text == sorted(text)
+
+
+def test_categorical_parts_match_text_parts():
+    categorical = FIRST[["A", "B"]].astype("category")
+    keys = factorize_comparison_keys(categorical, SECOND[["A", "B"]])
+    assert _key_text(keys, keys.legacy_codes) == comparison_key_text(FIRST[["A", "B"]]).tolist()
+    assert keys.legacy_codes[0] == keys.converted_codes[1]
+
+
+def test_unequal_key_counts_match_on_text():
+    second = pd.DataFrame({"K": ["a | z", " a b | c", "c |"]})
+    keys = factorize_comparison_keys(FIRST[["A", "B"]], second)
+    assert keys.converted_codes[0] == keys.legacy_codes[0]
+    assert keys.converted_codes[1] == keys.legacy_codes[1]
+    assert keys.converted_codes[2] != keys.legacy_codes[4]  # "c |" is not "c | " once stripped
+
+
+@pytest.mark.parametrize("backend", ["pandas", "arrow", "sqlite"])
+@pytest.mark.parametrize("pk_second", [["A", "B"], ["K"]])
+def test_results_are_ordered_by_key_text(backend, pk_second):
+    second = SECOND if pk_second == ["A", "B"] else pd.DataFrame(
+        {"K": comparison_key_text(SECOND[["A", "B"]]), "V": SECOND["V"]}
+    )
+    result = compare_data(FIRST, second, ["A", "B"], pk_second, "V", "V", backend=backend)
+    keys = result.merged["Comparison Key"].tolist()
+    assert keys == sorted(keys)
+    assert keys == sorted(set(comparison_key_text(FIRST[["A", "B"]])) | set(comparison_key_text(second[pk_second])))
@@ -0,0 +1,90 @@
+"""Each measure of a multi-measure comparison is judged like a comparison of that pair alone."""
+
+import pandas as pd
+import pytest
+
+from recon_engine import (
+    TOLERANCE_DOLLAR,
+    TOLERANCE_PERCENTAGE,
+    Measure,
+    compare_data,
+    evaluate_alignment,
+    measure_columns,
+)
+from recon_profiles import profile_measures
+
+FIRST = pd.DataFrame(
+    {"Key": ["a", "b", "b", "c", "e"], "Amount": ["1", "2", "0", "3", "5"], "Debit": ["10", "15", "5", "30", "3"],
+     "Qty": ["1", "2", "1", "3", ""]}
+)  # fmt: skip
+SECOND = pd.DataFrame(
+    {"Key": ["a", "b", "d", "e"], "Amount": ["1", "2.5", "4", "5"], "Dr": ["10.5", "20", "30", "1"],
+     "Qty": ["1", "3", "3", "0"]}
+)  # fmt: skip
+MEASURES = [Measure("Debit", "Dr", TOLERANCE_DOLLAR, 1.0), Measure("Qty", "Qty", TOLERANCE_PERCENTAGE, 10.0)]
+
+
+def _compare(first_column, second_column, tolerance_type=None, tolerance_value=None, **options):
+    return compare_data(
+        FIRST, SECOND, ["Key"], ["Key"], first_column, second_column, tolerance_type=tolerance_type,
+        tolerance_value=tolerance_value, **options,
+    )  # fmt: skip
+
+
+@pytest.mark.parametrize("distinct_list", [True, False])
+@pytest.mark.parametrize("exact_scale", [None, 2])
+def test_each_measure_matches_its_own_comparison(distinct_list, exact_scale):
+    options = {"distinct_list": distinct_list, "exact_scale": exact_scale}
+    result = _compare("Amount", "Amount", measures=MEASURES, **options)
+    overall = pd.Series(False, index=result.merged.index)
+    for measure, first_column, second_column in measure_columns(result.merged):
+        alone = _compare(measure.first, measure.second, measure.tolerance_type, measure.tolerance_value, **options)
+        differences = result.merged[f"{measure.label} Difference"]
+        assert differences.tolist() == alone.merged["Difference"].tolist(), measure.label
+        assert result.merged[first_column].tolist() == pytest.approx(alone.merged[first_column].tolist(), nan_ok=True)
+        assert result.merged[second_column].tolist() == pytest.approx(alone.merged[second_column].tolist(), nan_ok=True)
+        overall |= differences
+    assert result.merged["Difference"].tolist() == overall.tolist()
+    assert result.matched_records == (~overall).sum()
+    assert [summary.label for summary in result.measures] == ["Amount", "Debit/Dr", "Qty"]
+    assert [summary.matched_records for summary in result.measures] == [
+        (~result.merged[f"{label} Difference"]).sum() for label in ("Amount", "Debit/Dr", "Qty")
+    ]
+
+
+def test_measure_columns():
+    result = _compare("Amount", "Amount", measures=MEASURES)
+    assert measure_columns(result.merged) == [
+        (Measure("Amount", "Amount"), "Amount (First)", "Amount (Second)"),
+        (MEASURES[0], "Debit (First)", "Dr (Second)"),
+        (MEASURES[1], "Qty (First)", "Qty (Second)"),
+    ]
+    assert measure_columns(_compare("Amount", "Amount").merged) == []
+    assert "Debit/Dr: 2 matched, 3 unmatched" in result.summary_text
+    assert result.metadata()["Debit/Dr matched_records"] == 2
+
+
+def test_measure_tolerances_can_be_replaced():
+    result = _compare("Amount", "Amount", measures=MEASURES)
+    loose = evaluate_alignment(result.alignment, measure_tolerances=[(TOLERANCE_DOLLAR, 100.0), (None, None)])
+    for label, (first_column, second_column, *tolerance) in {
+        "Debit/Dr": ("Debit", "Dr", TOLERANCE_DOLLAR, 100.0),
+        "Qty": ("Qty", "Qty"),
+    }.items():
+        expected = _compare(first_column, second_column, *tolerance).merged["Difference"]
+        assert loose.merged[f"{label} Difference"].tolist() == expected.tolist(), label
+    assert loose.merged["Debit/Dr Difference"].sum() < result.merged["Debit/Dr Difference"].sum()
+    assert evaluate_alignment(result.alignment).merged["Debit/Dr Difference"].tolist() == (
+        result.merged["Debit/Dr Difference"].tolist()
+    )
+
+
+def test_profile_measures():
+    profile = {
+        "measures": [
+            {"first": "Debit", "second": "Dr", "tolerance_type": TOLERANCE_DOLLAR, "tolerance_value": 1.0},
+            {"first": "Qty", "second": "Qty", "tolerance_type": "None"},
+        ]
+    }
+    assert profile_measures(profile) == [MEASURES[0], Measure("Qty", "Qty")]
+    assert profile_measures({}) == []
@@ -0,0 +1,76 @@
+"""Compact dtypes keep the data and the comparison unchanged while using less memory."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from recon_engine import compare_data
+from recon_memory import MemoryReport, compact_frame, frame_bytes, row_bytes
+
+ROWS = 2_000
+RNG = np.random.default_rng(5)
+FRAME = pd.DataFrame(
+    {
+        "Key": [f"k{i}" for i in range(ROWS)],
+        "Unit": RNG.choice(["north", "south", "east", None], ROWS),
+        "Amount": RNG.choice(["1.5", "-2", "", "x", "1e3"], ROWS),
+        "Memo": [f"memo {i}" for i in range(ROWS)],
+    }
+)
+
+
+def _plain(series: pd.Series) -> list:
+    return [None if pd.isna(value) else value for value in series.astype(object)]
+
+
+def test_compact_frame_dtypes_and_values():
+    compact = compact_frame(FRAME, numeric_columns=["Amount"], skip_columns=["Key"])
+    assert isinstance(compact["Unit"].dtype, pd.CategoricalDtype)
+    assert list(compact["Unit"].cat.categories) == sorted(FRAME["Unit"].dropna().unique())
+    assert _plain(compact["Unit"]) == _plain(FRAME["Unit"])
+    assert compact["Key"].dtype == FRAME["Key"].dtype and compact["Memo"].dtype == FRAME["Memo"].dtype
+    expected = pd.to_numeric(FRAME["Amount"], errors="coerce")
+    assert np.array_equal(compact["Amount"].to_numpy(), expected.to_numpy(), equal_nan=True)
+    assert frame_bytes(compact) < frame_bytes(FRAME)
+
+
+def test_compact_frame_leaves_the_input_alone():
+    before = FRAME.copy()
+    compact_frame(FRAME, numeric_columns=["Amount"])
+    pd.testing.assert_frame_equal(FRAME, before)
+
+
+def test_category_ratio():
+    assert isinstance(compact_frame(FRAME, category_max_ratio=1.0)["Memo"].dtype, pd.CategoricalDtype)
+    assert not isinstance(compact_frame(FRAME, category_max_ratio=0.001)["Unit"].dtype, pd.CategoricalDtype)
+
+
+@pytest.mark.parametrize("distinct_list", [True, False])
+def test_compact_comparison_matches(distinct_list):
+    second = FRAME.assign(Amount=FRAME["Amount"].where(FRAME.index % 7 != 0, "5"))
+    options = {"distinct_list": distinct_list, "display_legacy": ["Unit"], "display_converted": ["Unit"]}
+    plain = compare_data(FRAME, second, ["Key"], ["Key"], "Amount", "Amount", compact=False, **options)
+    compact = compare_data(FRAME, second, ["Key"], ["Key"], "Amount", "Amount", **options)
+    assert (compact.total_records, compact.matched_records) == (plain.total_records, plain.matched_records)
+    assert list(compact.merged.columns) == list(plain.merged.columns)
+    for column in plain.merged.columns:
+        assert _plain(compact.merged[column]) == _plain(plain.merged[column]), column
+
+
+def test_memory_report():
+    plain, compact = MemoryReport(), MemoryReport()
+    options = {"display_legacy": ["Unit"], "display_converted": ["Unit"]}
+    compare_data(FRAME, FRAME, ["Key"], ["Key"], "Amount", "Amount", compact=False, memory_report=plain, **options)
+    compare_data(FRAME, FRAME, ["Key"], ["Key"], "Amount", "Amount", memory_report=compact, **options)
+    assert [stage.stage for stage in compact.stages] == ["input", "working columns", "aggregated", "merged", "result"]
+    assert compact.stages[0].rows == 2 * ROWS and compact.stages[-1].rows == ROWS
+    table = compact.to_frame(baseline=plain)
+    assert list(table.columns) == ["Stage", "Rows", "MB before", "MB after", "Reduction %"]
+    reduction = table.set_index("Stage")["Reduction %"]
+    assert reduction["input"] == 0 and reduction["working columns"] > 0
+    assert "working columns" in compact.text(plain)
+
+
+def test_row_bytes():
+    assert row_bytes(FRAME) == pytest.approx(frame_bytes(FRAME.reset_index(drop=True)) / ROWS, rel=0.01)
+    assert row_bytes(FRAME.iloc[:0]) == 0.0
@@ -0,0 +1,39 @@
+"""Hash-partitioned parallel alignment gives the serial result."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmark import SYNTHETIC_PROFILE, SyntheticSpec, _synthetic_pair
+from recon_engine import TOLERANCE_DOLLAR, _partition_positions, compare_data
+
+KEYS = SYNTHETIC_PROFILE["match_keys_first"]
+
+
+@pytest.fixture(scope="module")
+def ledgers():
+    return _synthetic_pair(SYNTHETIC_PROFILE, SyntheticSpec(3_000, seed=5))
+
+
+def test_partitions_cover_every_row_once():
+    codes = np.random.default_rng(0).integers(0, 500, 10_000)
+    parts = _partition_positions(codes, 4)
+    assert np.array_equal(np.sort(np.concatenate(parts)), np.arange(len(codes)))
+    for part in parts:
+        assert len(np.unique(codes[part] % 4)) <= 1  # a key lands in exactly one partition
+
+
+@pytest.mark.parametrize("distinct_list", [True, False])
+def test_workers_match_serial(ledgers, distinct_list):
+    first, second = ledgers
+    options = {"tolerance_type": TOLERANCE_DOLLAR, "tolerance_value": 0.01, "distinct_list": distinct_list}
+    serial = compare_data(first, second, KEYS, KEYS, "CREDIT", "CREDIT", **options)
+    parallel = compare_data(first, second, KEYS, KEYS, "CREDIT", "CREDIT", workers=2, **options)
+    pd.testing.assert_frame_equal(parallel.merged, serial.merged)
+    assert parallel.matched_records == serial.matched_records
+
+
+def test_other_backends_run_in_one_process(ledgers):
+    first, second = ledgers
+    with pytest.raises(ValueError, match="one process"):
+        compare_data(first, second, KEYS, KEYS, "CREDIT", "CREDIT", workers=2, backend="arrow")
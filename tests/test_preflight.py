@@ -0,0 +1,59 @@
+"""Merge estimates predict the size of the merge that runs, and the budget refuses large ones."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from recon_engine import compare_data, preflight_merge
+from recon_preflight import MergeBudgetExceeded, check_merge_budget, estimate_merge
+
+RNG = np.random.default_rng(11)
+FIRST = pd.DataFrame({"Key": RNG.choice([f"k{i}" for i in range(60)], 400), "Amount": "1", "Memo": "m"})
+SECOND = pd.DataFrame({"Key": RNG.choice([f"k{i}" for i in range(20, 90)], 300), "Amount": "2"})
+
+
+def test_estimate_merge_counts():
+    estimate = estimate_merge(np.array([0, 0, 0, 1, 2]), np.array([0, 0, 1, 3]), key_count=4, row_bytes=100.0)
+    assert (estimate.first_rows, estimate.second_rows) == (5, 4)
+    assert (estimate.first_keys, estimate.second_keys, estimate.shared_keys) == (3, 3, 2)
+    assert (estimate.first_duplicate_keys, estimate.second_duplicate_keys) == (1, 1)
+    assert (estimate.first_max_rows_per_key, estimate.second_max_rows_per_key) == (3, 2)
+    assert estimate.grouped_rows == estimate.merged_rows == 4
+    assert estimate.ungrouped_rows == 3 * 2 + 1 * 1 + 1 + 1  # key 0, key 1, then one-sided keys 2 and 3
+    assert estimate.merged_mb == pytest.approx(400 / 2**20)
+
+
+def test_empty_sides():
+    estimate = estimate_merge(np.array([], dtype=int), np.array([], dtype=int), key_count=0, row_bytes=10.0)
+    assert estimate.grouped_rows == estimate.ungrouped_rows == estimate.first_max_rows_per_key == 0
+
+
+@pytest.mark.parametrize("distinct_list", [True, False])
+def test_preflight_predicts_the_merge(distinct_list):
+    estimate = preflight_merge(FIRST, SECOND, ["Key"], ["Key"], ["Amount", "Memo"], ["Amount"], distinct_list)
+    result = compare_data(
+        FIRST, SECOND, ["Key"], ["Key"], "Amount", "Amount", distinct_list=distinct_list, display_legacy=["Memo"]
+    )
+    assert estimate.merged_rows == result.total_records
+    assert estimate.ungrouped_rows > estimate.grouped_rows
+    assert estimate.shared_keys == len(set(FIRST["Key"]) & set(SECOND["Key"]))
+    assert estimate.merged_mb > 0
+    assert "Keys in both files" in estimate.text()
+
+
+def test_budget_refuses_a_large_merge():
+    estimate = preflight_merge(FIRST, SECOND, ["Key"], ["Key"], ["Amount"], ["Amount"], distinct_list=False)
+    check_merge_budget(estimate, None)
+    check_merge_budget(estimate, estimate.merged_mb * 2)
+    with pytest.raises(MergeBudgetExceeded, match="aggregating duplicate keys would give") as error:
+        check_merge_budget(estimate, estimate.merged_mb / 2)
+    assert error.value.estimate is estimate
+
+
+def test_compare_data_checks_the_budget():
+    options = {"distinct_list": False}
+    with pytest.raises(MergeBudgetExceeded):
+        compare_data(FIRST, SECOND, ["Key"], ["Key"], "Amount", "Amount", merge_budget_mb=1e-6, **options)
+    result = compare_data(FIRST, SECOND, ["Key"], ["Key"], "Amount", "Amount", merge_budget_mb=1e6, **options)
+    assert result.total_records == preflight_merge(FIRST, SECOND, ["Key"], ["Key"], distinct_list=False).merged_rows
+    assert issubclass(MergeBudgetExceeded, ValueError)  # reported like any other bad input
@@ -0,0 +1,56 @@
+"""Saved profiles and the columns they load."""
+
+import pandas as pd
+
+from recon_engine import compare_data
+from recon_profiles import delete_profile, load_profiles, profile_columns, save_profile
+
+PROFILE = {
+    "match_keys_first": ["Company", "Account"],
+    "match_keys_second": ["Company", "Account"],
+    "compare_col_first": "Amount",
+    "compare_col_second": "Balance",
+    "display_cols_first": ["Memo", "Account"],
+    "display_cols_second": ["Memo"],
+    "measures": [{"first": "Qty", "second": "Qty", "tolerance_type": "None", "tolerance_value": None}],
+}
+FIRST = pd.DataFrame(
+    {
+        "Company": ["A", "A", "B"],
+        "Account": ["1", "1", "2"],
+        "Amount": ["1.5", "2", "3"],
+        "Memo": [None, "second row", "b"],
+        "Unused": ["x", "y", "z"],
+    }
+)
+SECOND = pd.DataFrame({"Company": ["A", "C"], "Account": ["1", "9"], "Balance": ["3.5", "1"], "Memo": ["m", "n"]})
+
+
+def test_profile_columns_are_distinct_and_ordered():
+    assert profile_columns(PROFILE, "first") == ["Company", "Account", "Amount", "Qty", "Memo"]
+    assert profile_columns(PROFILE, "second") == ["Company", "Account", "Balance", "Qty", "Memo"]
+    assert profile_columns({}, "first") == []
+
+
+def test_projected_load_gives_the_full_result():
+    profile = {key: value for key, value in PROFILE.items() if key != "measures"}
+    options = {"display_legacy": profile["display_cols_first"], "display_converted": profile["display_cols_second"]}
+    args = (profile["match_keys_first"], profile["match_keys_second"], "Amount", "Balance")
+    full = compare_data(FIRST, SECOND, *args, **options)
+    projected = compare_data(
+        FIRST[profile_columns(profile, "first")], SECOND[profile_columns(profile, "second")], *args, **options
+    )
+    pd.testing.assert_frame_equal(projected.merged, full.merged)
+    assert full.merged["Memo (First)"].tolist()[0] == "second row"  # the first non-null value per key
+
+
+def test_profiles_round_trip(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert load_profiles() == {}
+    save_profile("Month end", PROFILE)
+    save_profile("Other", {"match_keys_first": ["K"]})
+    assert load_profiles() == {"Month end": PROFILE, "Other": {"match_keys_first": ["K"]}}
+    delete_profile("Other")
+    delete_profile("Never saved")
+    assert list(load_profiles()) == ["Month end"]
+
@@ -0,0 +1,91 @@
+"""The SQL and Arrow backends return the same comparison as the pandas engine."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from recon_engine import BACKEND_PANDAS, TOLERANCE_DOLLAR, compare_data
+
+
+@pytest.fixture(params=["arrow", "sqlite", "duckdb"])
+def backend(request):
+    if request.param == "duckdb":
+        pytest.importorskip("duckdb")
+    return request.param
+
+
+def _frame(**columns) -> pd.DataFrame:
+    return pd.DataFrame(columns, dtype=object)
+
+
+# Duplicate keys, a blank key part, keys differing only by surrounding whitespace,
+# one-sided keys, a blank amount and an unparseable one.
+FIRST = _frame(
+    Company=["A", "A", "A", "B", " B ", None, "C", "D", "E"],
+    Account=["100", "100", "200", "100", "200", "300", "100\t", "400", "500"],
+    Amount=["10.10", "5.05", "7", "1.10", "2.20", "3", None, "x", "9.99"],
+    Memo=["m1", None, "m3", "m4", "m5", "m6", "m7", "m8", "m9"],
+)
+SECOND = _frame(
+    Company=["A", "A ", "B", "B", "", "C", "D", "F"],
+    Account=["100", "200", "100", "200", "300", "100", "400", "600"],
+    Amount=["15.15", "7.01", "1.10", "2.20", "3", "4", "0", "1"],
+    Memo=["n1", "n2", None, "n4", "n5", "n6", "n7", "n8"],
+)
+
+
+def _compare(first, second, pk_first, pk_second, backend, **options):
+    return compare_data(
+        first,
+        second,
+        pk_first,
+        pk_second,
+        "Amount",
+        "Amount",
+        tolerance_type=TOLERANCE_DOLLAR,
+        tolerance_value=0.5,
+        backend=backend,
+        **options,
+    )
+
+
+def _assert_same_result(expected, actual) -> None:
+    expected_frame, actual_frame = expected.merged, actual.merged
+    assert list(actual_frame.columns) == list(expected_frame.columns)
+    assert actual_frame.attrs == expected_frame.attrs
+    for column in expected_frame.columns:
+        left, right = expected_frame[column], actual_frame[column]
+        if pd.api.types.is_float_dtype(left):
+            assert np.allclose(left.to_numpy(float), right.to_numpy(float), equal_nan=True), column
+        else:
+            assert left.astype(object).where(left.notna(), None).tolist() == (
+                right.astype(object).where(right.notna(), None).tolist()
+            ), column
+    assert (actual.total_records, actual.matched_records) == (expected.total_records, expected.matched_records)
+
+
+@pytest.mark.parametrize("exact_scale", [None, 2])
+def test_matches_pandas(backend, exact_scale):
+    keys = ["Company", "Account"]
+    expected = _compare(FIRST, SECOND, keys, keys, BACKEND_PANDAS, exact_scale=exact_scale)
+    _assert_same_result(expected, _compare(FIRST, SECOND, keys, keys, backend, exact_scale=exact_scale))
+
+
+def test_display_columns_match_pandas(backend):
+    keys = ["Company", "Account"]
+    options = {"display_legacy": ["Memo"], "display_converted": ["Memo"]}
+    expected = _compare(FIRST, SECOND, keys, keys, BACKEND_PANDAS, **options)
+    _assert_same_result(expected, _compare(FIRST, SECOND, keys, keys, backend, **options))
+
+
+def test_different_key_counts_match_pandas(backend):
+    second = SECOND.assign(Key=SECOND["Company"].fillna("").str.strip() + " | " + SECOND["Account"])
+    second = second.drop(columns=["Company", "Account"])
+    expected = _compare(FIRST, second, ["Company", "Account"], ["Key"], BACKEND_PANDAS)
+    _assert_same_result(expected, _compare(FIRST, second, ["Company", "Account"], ["Key"], backend))
+
+
+def test_empty_side_matches_pandas(backend):
+    keys = ["Company", "Account"]
+    expected = _compare(FIRST.iloc[:0], SECOND, keys, keys, BACKEND_PANDAS)
+    _assert_same_result(expected, _compare(FIRST.iloc[:0], SECOND, keys, keys, backend))
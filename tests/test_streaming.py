@@ -0,0 +1,37 @@
+"""Streaming reconciliation of files through the spill partitions."""
+
+import pandas as pd
+import pytest
+
+from recon_engine import compare_data
+from recon_streaming import compare_streaming
+
+FIRST = pd.DataFrame(
+    {"K": ["x", "x", "y", " y", "z"], "Amt": ["1", "1", "2", "2 ", "5"], "C": ["1", "2", "3", "4", "5"]}
+)
+SECOND = pd.DataFrame({"K": ["x", "y", "w"], "Amt": ["1", "3", "4"], "C": ["3", "7", "1"]})
+
+
+@pytest.fixture
+def sources(tmp_path):
+    FIRST.to_csv(tmp_path / "first.csv", index=False)
+    SECOND.to_csv(tmp_path / "second.csv", index=False)
+    return str(tmp_path / "first.csv"), str(tmp_path / "second.csv")
+
+
+@pytest.mark.parametrize("exact_scale", [None, 2])
+def test_matches_in_memory(sources, exact_scale):
+    result = compare_streaming(*sources, ["K"], ["K"], "C", "C", partitions=3, exact_scale=exact_scale)
+    expected = compare_data(FIRST, SECOND, ["K"], ["K"], "C", "C", exact_scale=exact_scale)
+    pd.testing.assert_frame_equal(result.merged, expected.merged, check_dtype=False)
+
+
+@pytest.mark.parametrize("exact_scale", [None, 2])
+def test_compare_column_that_is_also_a_key(sources, exact_scale):
+    keys = ["K", "Amt"]
+    result = compare_streaming(*sources, keys, keys, "Amt", "Amt", partitions=3, exact_scale=exact_scale)
+    merged = result.merged
+    assert merged["Comparison Key"].tolist() == ["w | 4", "x | 1", "y | 2", "y | 3", "z | 5"]
+    assert merged["Amt (First)"].tolist()[1:3] == [2.0, 4.0]  # duplicate and whitespace-padded rows are summed
+    assert merged.attrs["value_columns"] == ("Amt (First)", "Amt (Second)")
+    assert result.matched_records == 0
@@ -0,0 +1,61 @@
+"""Re-evaluating an alignment under a new tolerance matches a fresh comparison."""
+
+import pandas as pd
+import pytest
+
+from benchmark import TOLERANCE_CASES
+from recon_engine import TOLERANCE_DOLLAR, TOLERANCE_PERCENTAGE, alignment_of, compare_data, evaluate_alignment
+
+FIRST = pd.DataFrame(
+    {"Key": ["a", "b", "c", "d", "e", "f"], "Amount": ["100", "100", "0", "", "-50", "1.005"], "Memo": list("uvwxyz")}
+)
+SECOND = pd.DataFrame({"Key": ["a", "b", "c", "d", "e", "g"], "Amount": ["101", "110", "0.5", "3", "-49", "2"]})
+TOLERANCES = [*TOLERANCE_CASES, (TOLERANCE_DOLLAR, 1.0), (TOLERANCE_PERCENTAGE, 1.0)]
+
+
+def _compare(tolerance_type=None, tolerance_value=None, **options):
+    return compare_data(
+        FIRST, SECOND, ["Key"], ["Key"], "Amount", "Amount", tolerance_type=tolerance_type,
+        tolerance_value=tolerance_value, display_legacy=["Memo"], **options,
+    )  # fmt: skip
+
+
+def _assert_same(actual, expected) -> None:
+    pd.testing.assert_frame_equal(actual.merged, expected.merged)
+    assert actual.summary_text == expected.summary_text
+    assert (actual.total_records, actual.matched_records) == (expected.total_records, expected.matched_records)
+
+
+@pytest.mark.parametrize("exact_scale", [None, 3])
+@pytest.mark.parametrize("tolerance_type, tolerance_value", TOLERANCES)
+def test_reevaluation_matches_compare_data(tolerance_type, tolerance_value, exact_scale):
+    baseline = _compare(exact_scale=exact_scale)
+    expected = _compare(tolerance_type, tolerance_value, exact_scale=exact_scale)
+    reevaluated = evaluate_alignment(baseline.alignment, tolerance_type, tolerance_value)
+    _assert_same(reevaluated, expected)
+    assert reevaluated.alignment is baseline.alignment
+
+
+@pytest.mark.parametrize("exact_scale", [None, 3])
+@pytest.mark.parametrize("tolerance_type, tolerance_value", TOLERANCES)
+def test_alignment_recovered_from_a_result(tolerance_type, tolerance_value, exact_scale):
+    alignment = alignment_of(_compare(exact_scale=exact_scale).merged)
+    assert alignment is not None and alignment.scale == exact_scale
+    expected = _compare(tolerance_type, tolerance_value, exact_scale=exact_scale)
+    _assert_same(evaluate_alignment(alignment, tolerance_type, tolerance_value), expected)
+
+
+def test_result_without_value_columns_has_no_alignment():
+    merged = _compare().merged
+    assert alignment_of(merged.drop(columns=["Amount (First)"])) is None
+    merged.attrs.clear()
+    assert alignment_of(merged) is None
+
+
+def test_reevaluated_index_reuses_the_key_index():
+    baseline = _compare()
+    first_index = baseline.index
+    tolerance_type, tolerance_value = TOLERANCE_DOLLAR, 1.0
+    reevaluated = evaluate_alignment(baseline.alignment, tolerance_type, tolerance_value)
+    assert reevaluated.index.key_order is first_index.key_order
+    assert reevaluated.index.matched.tolist() == _compare(tolerance_type, tolerance_value).index.matched.tolist()
@@ -0,0 +1,112 @@
+"""Stage traces record nesting, rows and CPU time, and cost nothing when disabled."""
+
+import json
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from recon_engine import compare_data
+from recon_trace import StageTiming, Trace, traced
+
+
+def _spin(seconds: float) -> None:
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def test_stages_nest_in_start_order():
+    trace = Trace()
+    with trace.stage("outer", rows=3):
+        with traced(trace, "inner") as stage:
+            stage.rows = 7
+        with traced(trace, "second inner"):
+            with traced(trace, "innermost"):
+                pass
+    with trace.stage("after"):
+        pass
+    assert [(timing.stage, timing.depth, timing.rows) for timing in trace.stages] == [
+        ("outer", 0, 3),
+        ("inner", 1, 7),
+        ("second inner", 1, None),
+        ("innermost", 2, None),
+        ("after", 0, None),
+    ]
+    outer, inner = trace.stages[:2]
+    assert outer.wall_seconds >= inner.wall_seconds >= 0
+
+
+def test_failed_stage_is_recorded_and_unwinds():
+    trace = Trace()
+    with pytest.raises(KeyError):
+        with trace.stage("outer"):
+            with trace.stage("failing"):
+                raise KeyError("x")
+    with trace.stage("next"):
+        pass
+    assert [timing.depth for timing in trace.stages] == [0, 1, 0]
+    assert trace.stages[1].wall_seconds >= 0
+
+
+def test_disabled_trace_records_nothing():
+    first, second = traced(None, "a"), traced(None, "b", rows=5)
+    assert first is second
+    with first as stage:
+        stage.rows = 10
+    assert isinstance(stage, StageTiming)
+
+
+def test_thread_scope_leaves_out_other_threads():
+    process, thread = Trace(), Trace(cpu_scope="thread")
+    busy = threading.Thread(target=_spin, args=(0.3,))
+    with process.stage("wait"), thread.stage("wait"):
+        busy.start()
+        busy.join()
+    assert thread.stages[0].cpu_scope == "thread" and process.stages[0].cpu_scope == "process"
+    assert thread.stages[0].cpu_seconds < 0.1 < process.stages[0].cpu_seconds
+
+
+def test_own_cpu_time_is_counted():
+    trace = Trace(cpu_scope="thread")
+    with trace.stage("spin"):
+        _spin(0.2)
+    assert trace.stages[0].cpu_seconds > 0.1
+
+
+def test_exports():
+    trace = Trace()
+    with trace.stage("outer", rows=1_234):
+        with trace.stage("inner"):
+            pass
+    data = json.loads(trace.to_json())
+    assert [stage["stage"] for stage in data["stages"]] == ["outer", "inner"]
+    assert data["stages"][0]["rows"] == 1_234 and "python" in data
+    frame = trace.to_frame()
+    assert frame["Stage"].tolist() == ["outer", "  inner"]
+    assert frame["Rows"].tolist() == [1_234, pd.NA]
+    header, *lines = trace.text().splitlines()
+    assert header.startswith("Stage") and lines[0].startswith("outer") and lines[0].endswith("1,234")
+    assert lines[1].startswith("  inner")
+    assert len({len(line) for line in (header, *lines)}) == 1
+
+
+def test_extend_copies_stages():
+    source = Trace()
+    with source.stage("read"):
+        pass
+    trace = Trace()
+    trace.extend(source.stages)
+    trace.stages[0].rows = 5
+    assert source.stages[0].rows is None and trace.stages[0].stage == "read"
+
+
+def test_compare_data_records_its_stages():
+    frame = pd.DataFrame({"Key": ["a", "b"], "Amount": ["1", "2"]})
+    trace = Trace()
+    result = compare_data(frame, frame, ["Key"], ["Key"], "Amount", "Amount", trace=trace)
+    assert result.trace is trace
+    top = [timing.stage for timing in trace.stages if timing.depth == 0]
+    assert top == ["align", "evaluate"]
+    assert trace.stages[0].rows == 2 and any(timing.depth == 1 for timing in trace.stages)
@@ -0,0 +1,35 @@
+"""Filtering and sorting the result table."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from recon_engine import compare_data
+from recon_view import ResultView
+
+FIRST = pd.DataFrame({"Key": ["a", "b", "c", "d"], "Amount": ["1", "2", "3", "4"], "Memo": ["nancy", None, "Nan", "x"]})
+SECOND = pd.DataFrame({"Key": ["a", "b", "c", "e"], "Amount": ["1", "5", "3", "6"]})
+
+
+@pytest.fixture
+def view():
+    result = compare_data(FIRST, SECOND, ["Key"], ["Key"], "Amount", "Amount", display_legacy=["Memo"])
+    return ResultView(result.merged, result.index)
+
+
+def test_text_filter_does_not_match_missing_values(view):
+    memo = view.merged["Memo (First)"]
+    matched = view.column_mask("Memo (First)", "nan")
+    assert memo[matched].tolist() == ["nancy", "Nan"]
+
+
+def test_text_filter_is_a_case_insensitive_substring(view):
+    assert view.merged["Comparison Key"][view.column_mask("Comparison Key", "B")].tolist() == ["b"]
+
+
+def test_numeric_filters(view):
+    values = view.merged["Amount (First)"].to_numpy(dtype=float, na_value=np.nan)
+    assert (view.column_mask("Amount (First)", ">2") == (values > 2)).all()
+    assert (view.column_mask("Amount (First)", "2..3") == ((values >= 2) & (values <= 3))).all()
+    with pytest.raises(ValueError):
+        view.column_mask("Amount (First)", "abc")